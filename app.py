@@ -3,20 +3,33 @@ UPI Guard - Main Flask Application
 Real-Time UPI Fraud Detection System
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, g, Response, stream_with_context
 import sqlite3
+import hmac
 import os
+import io
 import random
 import string
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime
 import numpy as np
-import pandas as pd
-from tensorflow import keras
-import joblib
 from functools import wraps
 import hashlib
 
 from config import *
+from database import ConnectionPool, migrate, get_stats
+from inference import BatchingScorer
+from cnn_runtime import NumpyCNN, FusedCNNScorer, export_numpy_model
+from profile_cache import ProfileCache
+from velocity import VelocityFeatureStore
+from pagination import fetch_page
+from bulk_scoring import READERS, score_records, format_results
+from features import FEATURE_COLUMNS, fraud_features, payment_transaction_data, upi_id_hash
+from shadow_scoring import INSERT_LIVE_SHADOW_SQL, ModelRegistry, ShadowScorer, sklearn_predict_batch
+from transaction_ids import TransactionIdGenerator
+from otp import OTPPurger, OTPStore
+from metrics import StageTimer, prometheus_counter, prometheus_gauge, prometheus_histogram
 
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
@@ -24,37 +37,343 @@ app.secret_key = SECRET_KEY
 # Global variables for models (loaded once at startup)
 fraud_model = None
 scaler = None
+numpy_model = None
+fused_scorer = None
+batch_scorer = None
+keras_predict = None
+model_num_features = None  # Leading FEATURE_COLUMNS the served model takes
+
+# Champion (the CNN above) plus challenger models scored in the background
+model_registry = ModelRegistry(champion='cnn')
+shadow_scorer = None
+
+# Model lifecycle: not_loaded -> loading -> ready (or fallback without a model)
+model_status = 'not_loaded'
+model_load_seconds = None
+model_warmup_ms = {}
+_model_lock = threading.Lock()
+
+# Pooled SQLite connections (reused across requests in this worker)
+db_pool = ConnectionPool(
+    DATABASE_PATH,
+    max_size=DB_POOL_MAX_SIZE,
+    busy_timeout_ms=DB_BUSY_TIMEOUT_MS,
+    cache_size_kb=DB_CACHE_SIZE_KB,
+    mmap_size=DB_MMAP_SIZE
+)
+
+# Cached user/merchant attributes used to build scoring features
+profile_cache = ProfileCache(
+    max_entries=PROFILE_CACHE_MAX_ENTRIES,
+    ttl_seconds=PROFILE_CACHE_TTL_SECONDS,
+    enabled=PROFILE_CACHE_ENABLED
+)
+
+# Sliding-window payment velocity per user, merchant and pair
+velocity_store = VelocityFeatureStore(max_keys=VELOCITY_MAX_KEYS)
+
+# Where /api/process_payment spends its time, in request order. The scaler is
+# folded into the fused model, so scaling is part of 'score'.
+PAYMENT_STAGES = ['db_connect', 'user_lookup', 'merchant_lookup', 'features', 'score', 'insert', 'commit']
+PAYMENT_OUTCOMES = ['completed', 'blocked', 'rejected', 'error']
+payment_metrics = StageTimer(
+    PAYMENT_STAGES,
+    PAYMENT_OUTCOMES,
+    sample_every=round(1 / METRICS_SAMPLE_RATE) if METRICS_SAMPLE_RATE > 0 else 0
+)
+
+# Outstanding login OTPs (replicated to otp_storage for multi-worker setups)
+otp_store = OTPStore(
+    ttl_seconds=OTP_EXPIRY_MINUTES * 60,
+    replicate=OTP_REPLICATE_TO_DB,
+    max_entries=OTP_MEMORY_MAX_ENTRIES
+)
+
+# Transaction IDs; every process, forked workers included, leases its own worker id
+transaction_ids = TransactionIdGenerator(lease_dir=TRANSACTION_WORKER_ID_DIR)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=transaction_ids.reset)
 
 def get_db_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get the pooled database connection bound to the current app context"""
+    if 'db' not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+@app.before_request
+def start_background_threads():
+    """Batching, shadow scoring and OTP purge threads belong to serving processes only"""
+    ensure_worker_threads()
+
+@app.teardown_appcontext
+def release_db_connection(exception):
+    """Hand the request's connection back to the pool"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        db_pool.release(conn)
+
+def init_database():
+    """Apply pending schema migrations (indexes etc.) before serving"""
+    conn = db_pool.acquire()
+    try:
+        for version, description in migrate(conn):
+            app.logger.info(f"Applied schema migration {version}: {description}")
+    except sqlite3.Error as e:
+        app.logger.warning(f"Schema migration skipped: {e}")
+    finally:
+        db_pool.release(conn)
+        # Don't let a connection opened in the gunicorn master cross fork()
+        db_pool.close_all()
+
+def rebuild_velocity_store():
+    """Load the last day of payments into the velocity feature store"""
+    conn = db_pool.acquire()
+    try:
+        start = time.perf_counter()
+        replayed = velocity_store.rebuild(conn)
+        app.logger.info(f"Velocity store rebuilt from {replayed} transactions in {time.perf_counter() - start:.2f}s")
+    except sqlite3.Error as e:
+        app.logger.warning(f"Velocity store rebuild skipped: {e}")
+    finally:
+        db_pool.release(conn)
+        db_pool.close_all()
+
+def models_loaded():
+    """True when a scoring model (NumPy runtime or Keras + scaler) is available"""
+    return numpy_model is not None or (fraud_model is not None and scaler is not None)
+
+def model_input(features):
+    """Leading feature columns the served model was trained on"""
+    return features[:model_num_features] if model_num_features else features
+
+def predict_batch(features):
+    """Score a batch of raw feature rows with the scaler and CNN"""
+    if fused_scorer is not None:
+        return fused_scorer.predict(features)
+    
+    if numpy_model is not None:
+        return numpy_model.predict(features)
+    
+    features_scaled = scaler.transform(features)
+    
+    # Reshape for CNN (1D convolution)
+    features_cnn = features_scaled.reshape(features_scaled.shape[0], features_scaled.shape[1], 1)
+    
+    return keras_predict(features_cnn.astype(np.float32)).numpy()[:, 0]
+
+def build_keras_predict(model):
+    """
+    Fixed-signature tf.function around the Keras model
+    
+    Traced once for any batch size (batch dimension is None), so scoring
+    skips Model.predict's per-call data adapter and callback setup.
+    """
+    import tensorflow as tf
+    
+    @tf.function(input_signature=[tf.TensorSpec(shape=(None, model.input_shape[1], 1), dtype=tf.float32)])
+    def predict(features_cnn):
+        return model(features_cnn, training=False)
+    
+    return predict
+
+def warm_up_models():
+    """
+    Run warm-up inferences for the batch shapes used in serving
+    
+    Traces the compiled Keras callable and allocates the scorers'
+    buffers (per thread, including the batching worker) before the
+    process reports ready, so the first payments run at steady state.
+    """
+    if not models_loaded():
+        return
+    
+    num_features = numpy_model.num_features if numpy_model is not None else fraud_model.input_shape[1]
+    for batch_size in sorted({1, INFERENCE_MAX_BATCH_SIZE}):
+        start = time.perf_counter()
+        predict_batch(np.zeros((batch_size, num_features)))
+        model_warmup_ms[f'batch_{batch_size}'] = round((time.perf_counter() - start) * 1000, 3)
+    
+    if fused_scorer is not None:
+        start = time.perf_counter()
+        fused_scorer.score([0.0] * num_features)
+        model_warmup_ms['single'] = round((time.perf_counter() - start) * 1000, 3)
+    
+    if batch_scorer is not None:
+        start = time.perf_counter()
+        batch_scorer.score([0.0] * num_features)
+        model_warmup_ms['batching_queue'] = round((time.perf_counter() - start) * 1000, 3)
+    
+    app.logger.info(f"Model warm-up latency (ms): {model_warmup_ms}")
 
 def load_models():
     """Load trained ML models"""
-    global fraud_model, scaler
+    global fraud_model, scaler, numpy_model, fused_scorer, keras_predict, model_num_features
+    global model_status, model_load_seconds
     
+    model_status = 'loading'
+    start = time.perf_counter()
     try:
-        # Load CNN model
-        if os.path.exists(MODEL_PATH):
-            fraud_model = keras.models.load_model(MODEL_PATH)
-            app.logger.info(f"CNN model loaded from {MODEL_PATH}")
+        if os.path.exists(NUMPY_MODEL_PATH):
+            # TensorFlow-free runtime (CNN weights + scaler parameters)
+            numpy_model = NumpyCNN.load(NUMPY_MODEL_PATH)
+            app.logger.info(f"NumPy CNN runtime loaded from {NUMPY_MODEL_PATH}")
         else:
-            app.logger.info(f"Model not found at {MODEL_PATH} - running in fallback mode")
+            # Load CNN model
+            if os.path.exists(MODEL_PATH):
+                from tensorflow import keras
+                fraud_model = keras.models.load_model(MODEL_PATH)
+                keras_predict = build_keras_predict(fraud_model)
+                app.logger.info(f"CNN model loaded from {MODEL_PATH}")
+            else:
+                app.logger.info(f"Model not found at {MODEL_PATH} - running in fallback mode")
+            
+            # Load scaler
+            if os.path.exists(SCALER_PATH):
+                import joblib
+                scaler = joblib.load(SCALER_PATH)
+                app.logger.info(f"Scaler loaded from {SCALER_PATH}")
+            else:
+                app.logger.info(f"Scaler not found at {SCALER_PATH} - running in fallback mode")
         
-        # Load scaler
-        if os.path.exists(SCALER_PATH):
-            scaler = joblib.load(SCALER_PATH)
-            app.logger.info(f"Scaler loaded from {SCALER_PATH}")
-        else:
-            app.logger.info(f"Scaler not found at {SCALER_PATH} - running in fallback mode")
+        # Fold the scaler into the CNN once so scoring skips sklearn entirely
+        if models_loaded():
+            source = numpy_model
+            if source is None:
+                buffer = io.BytesIO()
+                export_numpy_model(fraud_model, scaler, buffer)
+                buffer.seek(0)
+                source = NumpyCNN.load(buffer)
+            fused_scorer = FusedCNNScorer.from_numpy_model(source)
+            model_num_features = fused_scorer.num_features
+            model_registry.register('cnn', lambda features: predict_batch(features[:, :model_num_features]))
+        
+        load_shadow_models()
+        
+        # Loaded lazily inside a serving process: restart its threads with the
+        # model. At import (possibly the gunicorn preload master) no threads
+        # are started; the first request or post_fork starts them.
+        if _worker_threads_pid == os.getpid():
+            start_worker_threads()
+        
+        # Report ready only after the first (slow) inferences have run
+        warm_up_models()
     except Exception as e:
         app.logger.warning(f"Error loading models: {e}")
+    
+    model_load_seconds = time.perf_counter() - start
+    model_status = 'ready' if models_loaded() else 'fallback'
 
-# Load models at startup
+def load_shadow_models():
+    """Register the trained challenger models listed in SHADOW_MODELS"""
+    paths = {name: SHADOW_MODEL_PATHS.get(name) for name in SHADOW_MODELS}
+    available = {name: path for name, path in paths.items() if path and os.path.exists(path)}
+    for name in sorted(set(paths) - set(available)):
+        app.logger.info(f"Shadow model {name} not found - skipped")
+    if not available:
+        return
+    
+    import joblib
+    shadow_scaler = scaler
+    if shadow_scaler is None and SHADOW_MODELS_SCALED & set(available):
+        if os.path.exists(SCALER_PATH):
+            shadow_scaler = joblib.load(SCALER_PATH)
+        else:
+            app.logger.info(f"Scaler not found at {SCALER_PATH} - scaled shadow models skipped")
+    for name, path in available.items():
+        scaled = name in SHADOW_MODELS_SCALED
+        if scaled and shadow_scaler is None:
+            continue
+        try:
+            model_registry.register(
+                name, sklearn_predict_batch(joblib.load(path), shadow_scaler if scaled else None)
+            )
+            app.logger.info(f"Shadow model {name} loaded from {path}")
+        except Exception as e:
+            app.logger.warning(f"Error loading shadow model {name}: {e}")
+
+def persist_shadow_scores(rows):
+    """Write one batch of shadow results in a single transaction"""
+    conn = db_pool.acquire()
+    try:
+        with conn:
+            conn.executemany(INSERT_LIVE_SHADOW_SQL, rows)
+    finally:
+        db_pool.release(conn)
+
+def purge_otps():
+    """One background pass dropping expired OTPs from memory and otp_storage"""
+    conn = db_pool.acquire()
+    try:
+        return otp_store.purge(conn, batch_size=OTP_PURGE_BATCH_SIZE)
+    finally:
+        db_pool.release(conn)
+
+otp_purger = OTPPurger(purge_otps, interval_seconds=OTP_PURGE_INTERVAL_SECONDS)
+
+def ensure_models_loaded():
+    """Load the models on first use (MODEL_LOADING='lazy'); no-op once loaded"""
+    if model_status in ('ready', 'fallback'):
+        return
+    with _model_lock:
+        if model_status not in ('ready', 'fallback'):
+            load_models()
+
+def warm_models_async():
+    """Start loading the models in the background if nothing has started yet"""
+    if model_status == 'not_loaded':
+        threading.Thread(target=ensure_models_loaded, name='model-warmup', daemon=True).start()
+
+_worker_threads_pid = None
+_worker_threads_lock = threading.Lock()
+
+def ensure_worker_threads():
+    """Start this process's background threads on its first request (no-op afterwards)"""
+    if _worker_threads_pid != os.getpid():
+        with _worker_threads_lock:
+            if _worker_threads_pid != os.getpid():
+                start_worker_threads()
+
+def start_worker_threads():
+    """
+    (Re)start this process's background threads
+    
+    Threads do not survive fork(), and a thread running in the gunicorn
+    preload master would be forked holding its locks and queues. So nothing
+    starts threads at import: each worker starts its own from post_fork, and
+    other servers (python app.py, uvicorn) on the first request.
+    """
+    global batch_scorer, shadow_scorer, _worker_threads_pid
+    
+    _worker_threads_pid = os.getpid()
+    
+    if models_loaded() and INFERENCE_BATCHING_ENABLED:
+        batch_scorer = BatchingScorer(
+            predict_batch,
+            max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+            max_wait_us=INFERENCE_MAX_WAIT_US
+        )
+        batch_scorer.start()
+    
+    if model_registry.shadows():
+        shadow_scorer = ShadowScorer(
+            model_registry,
+            persist_shadow_scores,
+            threshold=FRAUD_THRESHOLD,
+            max_queue=SHADOW_MAX_QUEUE,
+            max_batch_size=SHADOW_BATCH_SIZE,
+            flush_interval=SHADOW_FLUSH_SECONDS
+        )
+        shadow_scorer.start()
+    
+    otp_purger.start()
+
+# Load models at startup (heavy imports stay deferred in lazy mode)
 print("\nInitializing UPI Guard...")
-load_models()
+init_database()
+if VELOCITY_REBUILD_ON_STARTUP:
+    rebuild_velocity_store()
+if MODEL_LOADING != 'lazy':
+    load_models()
 
 def generate_otp(length=6):
     """Generate random OTP"""
@@ -73,11 +392,10 @@ def send_otp_email(mobile, otp):
         return True
 
 def generate_transaction_id():
-    """Generate unique transaction ID"""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
-    return f"TXN{timestamp}"
+    """Generate unique, time-ordered transaction ID (see transaction_ids.py)"""
+    return transaction_ids.next_id()
 
-def detect_fraud(transaction_data):
+def detect_fraud(transaction_data, transaction_id=None):
     """
     Real-time fraud detection using trained CNN model
     
@@ -85,38 +403,36 @@ def detect_fraud(transaction_data):
         transaction_data: Dictionary with transaction features
         - amount, time_hour, time_minute, user_age, merchant_age,
           state_code, zip_code, category, upi_id_hash
+        transaction_id: When given, shadow models also score the payment
+          (in the background) under this ID
     
     Returns:
         tuple: (is_fraud: bool, fraud_probability: float)
     """
-    global fraud_model, scaler
+    global fraud_model, scaler, numpy_model, fused_scorer, batch_scorer
     
-    if fraud_model is None or scaler is None:
+    ensure_models_loaded()
+    if not models_loaded():
         # If models not loaded, return safe default
         return False, 0.1
     
     try:
         # Prepare feature vector in correct order
-        features = np.array([[
-            transaction_data['amount'],
-            transaction_data['time_hour'],
-            transaction_data['time_minute'],
-            transaction_data['user_age'],
-            transaction_data['merchant_age'],
-            transaction_data['state_code'],
-            transaction_data['zip_code'],
-            transaction_data['category'],
-            transaction_data['upi_id_hash']
-        ]])
-        
-        # Scale features
-        features_scaled = scaler.transform(features)
+        features = fraud_features(transaction_data)
         
-        # Reshape for CNN (1D convolution)
-        features_cnn = features_scaled.reshape(features_scaled.shape[0], features_scaled.shape[1], 1)
+        # Predict fraud probability (batched with concurrent requests when enabled)
+        start = time.perf_counter()
+        champion_features = model_input(features)
+        if batch_scorer is not None:
+            fraud_probability = batch_scorer.score(champion_features)
+        elif fused_scorer is not None:
+            fraud_probability = fused_scorer.score(champion_features)
+        else:
+            fraud_probability = float(predict_batch(np.array([champion_features], dtype=np.float64))[0])
+        model_registry.record(model_registry.champion, (time.perf_counter() - start) * 1_000_000)
         
-        # Predict fraud probability
-        fraud_probability = float(fraud_model.predict(features_cnn, verbose=0)[0][0])
+        # Challengers score off the request path
+        submit_shadow(transaction_id, features)
         
         # Determine if fraud (threshold-based)
         is_fraud = fraud_probability > FRAUD_THRESHOLD
@@ -128,6 +444,11 @@ def detect_fraud(transaction_data):
         # On error, allow transaction (fail-safe)
         return False, 0.1
 
+def submit_shadow(transaction_id, features):
+    """Queue a scored payment for the shadow models (no-op without any)"""
+    if shadow_scorer is not None and transaction_id is not None:
+        shadow_scorer.submit(transaction_id, features)
+
 def login_required(f):
     """Decorator for routes requiring authentication"""
     @wraps(f)
@@ -150,6 +471,30 @@ def test():
     """Health check route"""
     return "App is running", 200
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: 200 once fraud scoring is loaded, 503 while warming up"""
+    warm_models_async()
+    
+    if fused_scorer is not None:
+        runtime = 'fused'
+    elif numpy_model is not None:
+        runtime = 'numpy'
+    elif models_loaded():
+        runtime = 'keras'
+    else:
+        runtime = None
+    
+    is_ready = model_status in ('ready', 'fallback')
+    return jsonify({
+        'ready': is_ready,
+        'status': model_status,
+        'runtime': runtime,
+        'batching': batch_scorer is not None,
+        'load_seconds': round(model_load_seconds, 3) if model_load_seconds is not None else None,
+        'warmup_ms': model_warmup_ms
+    }), (200 if is_ready else 503)
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     """Login page"""
@@ -163,19 +508,7 @@ def login():
         
         # Generate and store OTP
         otp = generate_otp()
-        expires_at = datetime.now() + timedelta(minutes=OTP_EXPIRY_MINUTES)
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Store OTP
-        cursor.execute('''
-            INSERT INTO otp_storage (mobile, otp, expires_at)
-            VALUES (?, ?, ?)
-        ''', (mobile, otp, expires_at))
-        
-        conn.commit()
-        conn.close()
+        otp_store.issue(mobile, otp, get_db_connection() if otp_store.replicate else None)
         
         # Send OTP (development mode)
         send_otp_email(mobile, otp)
@@ -208,24 +541,8 @@ def verify_otp():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Verify OTP
-        cursor.execute('''
-            SELECT * FROM otp_storage
-            WHERE mobile = ? AND otp = ? AND verified = 0
-            AND expires_at > datetime('now')
-            ORDER BY created_at DESC
-            LIMIT 1
-        ''', (mobile, otp))
-        
-        otp_record = cursor.fetchone()
-        
-        if otp_record:
-            # Mark OTP as verified
-            cursor.execute('''
-                UPDATE otp_storage SET verified = 1
-                WHERE id = ?
-            ''', (otp_record['id'],))
-            
+        # Verify (and consume) the OTP
+        if otp_store.verify(mobile, otp, conn if otp_store.replicate else None):
             # Handle different user types
             if user_type == 'admin':
                 cursor.execute('SELECT * FROM admins WHERE mobile = ?', (mobile,))
@@ -233,11 +550,8 @@ def verify_otp():
                 if admin:
                     session['admin_id'] = admin['id']
                     session['admin_name'] = admin['name']
-                    conn.commit()
-                    conn.close()
                     return redirect(url_for('admin_dashboard'))
                 else:
-                    conn.close()
                     flash('Admin not found', 'error')
                     return redirect(url_for('login'))
             
@@ -252,16 +566,16 @@ def verify_otp():
                     upi_id = f"{mobile}@upiguard"
                     
                     cursor.execute('''
-                        INSERT INTO merchants (mobile, business_name, merchant_age, upi_id)
-                        VALUES (?, ?, ?, ?)
-                    ''', (mobile, business_name, merchant_age, upi_id))
+                        INSERT INTO merchants (mobile, business_name, merchant_age, upi_id, upi_id_hash)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (mobile, business_name, merchant_age, upi_id, upi_id_hash(upi_id)))
                     conn.commit()
                     cursor.execute('SELECT * FROM merchants WHERE mobile = ?', (mobile,))
                     merchant = cursor.fetchone()
+                    profile_cache.invalidate_merchant(upi_id)
                 
                 session['merchant_id'] = merchant['id']
                 session['merchant_name'] = merchant['business_name']
-                conn.close()
                 return redirect(url_for('merchant_dashboard'))
             
             else:  # user
@@ -283,17 +597,54 @@ def verify_otp():
                     conn.commit()
                     cursor.execute('SELECT * FROM users WHERE mobile = ?', (mobile,))
                     user = cursor.fetchone()
+                    profile_cache.invalidate_user(user['id'])
                 
                 session['user_id'] = user['id']
                 session['user_name'] = user['name']
-                conn.close()
                 return redirect(url_for('user_dashboard'))
         else:
-            conn.close()
             flash('Invalid or expired OTP', 'error')
     
     return render_template('verify_otp.html')
 
+# Projected listing queries shared by dashboards and the paginated JSON APIs
+USER_TRANSACTIONS_SELECT = '''
+    SELECT t.id, t.transaction_id, t.amount, t.status, t.fraud_probability, t.created_at,
+           m.business_name as merchant_name
+    FROM transactions t
+    JOIN merchants m ON t.merchant_id = m.id
+'''
+
+MERCHANT_TRANSACTIONS_SELECT = '''
+    SELECT t.id, t.transaction_id, t.amount, t.status, t.created_at,
+           u.name as user_name
+    FROM transactions t
+    JOIN users u ON t.user_id = u.id
+'''
+
+ADMIN_TRANSACTIONS_SELECT = '''
+    SELECT t.id, t.transaction_id, t.amount, t.status, t.fraud_probability, t.is_fraud,
+           t.created_at, u.name as user_name, m.business_name as merchant_name
+    FROM transactions t
+    JOIN users u ON t.user_id = u.id
+    JOIN merchants m ON t.merchant_id = m.id
+'''
+
+FRAUD_LOGS_SELECT = '''
+    SELECT f.id, f.transaction_id, f.amount, f.fraud_probability, f.reason, f.action_taken,
+           f.created_at, u.name as user_name, m.business_name as merchant_name
+    FROM fraud_logs f
+    LEFT JOIN users u ON f.user_id = u.id
+    LEFT JOIN merchants m ON f.merchant_id = m.id
+'''
+
+USERS_SELECT = 'SELECT u.id, u.name, u.mobile, u.upi_id, u.age, u.created_at FROM users u'
+
+MERCHANTS_SELECT = '''
+    SELECT m.id, m.business_name, m.mobile, m.upi_id, m.merchant_age, m.created_at
+    FROM merchants m
+'''
+
 @app.route('/user/dashboard')
 @login_required
 def user_dashboard():
@@ -309,20 +660,14 @@ def user_dashboard():
     cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
     user = cursor.fetchone()
     
-    # Get transaction history
-    cursor.execute('''
-        SELECT t.*, m.business_name as merchant_name
-        FROM transactions t
-        JOIN merchants m ON t.merchant_id = m.id
-        WHERE t.user_id = ?
-        ORDER BY t.created_at DESC
-        LIMIT 20
-    ''', (user_id,))
-    transactions = cursor.fetchall()
-    
-    conn.close()
+    # Get transaction history (first page; further pages load via /api/transactions)
+    transactions, next_cursor = fetch_page(
+        cursor, USER_TRANSACTIONS_SELECT, 't',
+        where=['t.user_id = ?'], params=(user_id,), limit=DASHBOARD_PAGE_SIZE
+    )
     
-    return render_template('user_dashboard.html', user=user, transactions=transactions)
+    return render_template('user_dashboard.html', user=user, transactions=transactions,
+                           next_cursor=next_cursor)
 
 @app.route('/merchant/dashboard')
 @login_required
@@ -339,20 +684,15 @@ def merchant_dashboard():
     cursor.execute('SELECT * FROM merchants WHERE id = ?', (merchant_id,))
     merchant = cursor.fetchone()
     
-    # Get received payments
-    cursor.execute('''
-        SELECT t.*, u.name as user_name
-        FROM transactions t
-        JOIN users u ON t.user_id = u.id
-        WHERE t.merchant_id = ? AND t.status = 'completed'
-        ORDER BY t.created_at DESC
-        LIMIT 20
-    ''', (merchant_id,))
-    transactions = cursor.fetchall()
-    
-    conn.close()
+    # Get received payments (first page; further pages load via /api/transactions)
+    transactions, next_cursor = fetch_page(
+        cursor, MERCHANT_TRANSACTIONS_SELECT, 't',
+        where=['t.merchant_id = ?', "t.status = 'completed'"], params=(merchant_id,),
+        limit=DASHBOARD_PAGE_SIZE
+    )
     
-    return render_template('merchant_dashboard.html', merchant=merchant, transactions=transactions)
+    return render_template('merchant_dashboard.html', merchant=merchant, transactions=transactions,
+                           next_cursor=next_cursor)
 
 @app.route('/admin/dashboard')
 @login_required
@@ -364,56 +704,24 @@ def admin_dashboard():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Statistics
-    cursor.execute('SELECT COUNT(*) as count FROM users')
-    total_users = cursor.fetchone()['count']
-    
-    cursor.execute('SELECT COUNT(*) as count FROM merchants')
-    total_merchants = cursor.fetchone()['count']
+    # Statistics (trigger-maintained counters, see database.MIGRATIONS)
+    stats = get_stats(conn)
     
-    cursor.execute('SELECT COUNT(*) as count FROM transactions')
-    total_transactions = cursor.fetchone()['count']
+    # First page of each listing; further pages load lazily via the JSON APIs
+    transactions, transactions_cursor = fetch_page(
+        cursor, ADMIN_TRANSACTIONS_SELECT, 't', limit=DASHBOARD_PAGE_SIZE
+    )
+    fraud_logs, fraud_logs_cursor = fetch_page(
+        cursor, FRAUD_LOGS_SELECT, 'f', limit=DASHBOARD_PAGE_SIZE
+    )
+    users, users_cursor = fetch_page(cursor, USERS_SELECT, 'u', limit=DASHBOARD_PAGE_SIZE)
+    merchants, merchants_cursor = fetch_page(cursor, MERCHANTS_SELECT, 'm', limit=DASHBOARD_PAGE_SIZE)
     
-    cursor.execute('SELECT COUNT(*) as count FROM transactions WHERE is_fraud = 1')
-    fraud_count = cursor.fetchone()['count']
-    
-    # Recent transactions
-    cursor.execute('''
-        SELECT t.*, u.name as user_name, m.business_name as merchant_name
-        FROM transactions t
-        JOIN users u ON t.user_id = u.id
-        JOIN merchants m ON t.merchant_id = m.id
-        ORDER BY t.created_at DESC
-        LIMIT 50
-    ''')
-    transactions = cursor.fetchall()
-    
-    # Fraud logs
-    cursor.execute('''
-        SELECT f.*, u.name as user_name, m.business_name as merchant_name
-        FROM fraud_logs f
-        LEFT JOIN users u ON f.user_id = u.id
-        LEFT JOIN merchants m ON f.merchant_id = m.id
-        ORDER BY f.created_at DESC
-        LIMIT 50
-    ''')
-    fraud_logs = cursor.fetchall()
-    
-    # All users
-    cursor.execute('SELECT * FROM users ORDER BY created_at DESC LIMIT 100')
-    users = cursor.fetchall()
-    
-    # All merchants
-    cursor.execute('SELECT * FROM merchants ORDER BY created_at DESC LIMIT 100')
-    merchants = cursor.fetchall()
-    
-    conn.close()
-    
-    stats = {
-        'total_users': total_users,
-        'total_merchants': total_merchants,
-        'total_transactions': total_transactions,
-        'fraud_count': fraud_count
+    next_cursors = {
+        'transactions': transactions_cursor,
+        'fraud_logs': fraud_logs_cursor,
+        'users': users_cursor,
+        'merchants': merchants_cursor
     }
     
     return render_template('admin_dashboard.html', 
@@ -421,7 +729,158 @@ def admin_dashboard():
                          transactions=transactions,
                          fraud_logs=fraud_logs,
                          users=users,
-                         merchants=merchants)
+                         merchants=merchants,
+                         next_cursors=next_cursors)
+
+def json_page(select_sql, alias, where=None, params=()):
+    """Serve one keyset-paginated page of a listing as JSON"""
+    try:
+        limit = page_limit(request.args.get('limit'))
+        conn = get_db_connection()
+        rows, next_cursor = fetch_page(
+            conn.cursor(), select_sql, alias, where=where, params=params,
+            after=request.args.get('cursor'), limit=limit
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'items': [dict(row) for row in rows],
+        'next_cursor': next_cursor
+    })
+
+def listing_query(listing, session_data, role=None):
+    """
+    Query for a JSON listing, if the session may read it
+    
+    Args:
+        listing: 'transactions', 'fraud_logs', 'users' or 'merchants'
+        session_data: Session mapping (user_id / merchant_id / admin_id)
+        role: Transactions view to use; inferred as admin > merchant > user
+    
+    Returns:
+        tuple: (select_sql, alias, where, params), or None when unauthorized
+    """
+    if listing == 'transactions':
+        if role is None:
+            role = next((r for r in ('admin', 'merchant', 'user') if f'{r}_id' in session_data), None)
+        
+        if role == 'admin' and 'admin_id' in session_data:
+            return ADMIN_TRANSACTIONS_SELECT, 't', None, ()
+        if role == 'merchant' and 'merchant_id' in session_data:
+            return (MERCHANT_TRANSACTIONS_SELECT, 't',
+                    ['t.merchant_id = ?', "t.status = 'completed'"], (session_data['merchant_id'],))
+        if role == 'user' and 'user_id' in session_data:
+            return USER_TRANSACTIONS_SELECT, 't', ['t.user_id = ?'], (session_data['user_id'],)
+        return None
+    
+    # Remaining listings are admin only
+    if 'admin_id' not in session_data:
+        return None
+    return {
+        'fraud_logs': (FRAUD_LOGS_SELECT, 'f', None, ()),
+        'users': (USERS_SELECT, 'u', None, ()),
+        'merchants': (MERCHANTS_SELECT, 'm', None, ())
+    }[listing]
+
+def page_limit(value):
+    """Requested page size clamped to [1, API_MAX_PAGE_SIZE] (ValueError if not an int)"""
+    return min(max(int(value if value is not None else API_PAGE_SIZE), 1), API_MAX_PAGE_SIZE)
+
+def json_listing(listing):
+    """Serve a listing for the current session, or 401"""
+    query = listing_query(listing, session, request.args.get('role'))
+    if query is None:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    return json_page(*query)
+
+@app.route('/api/transactions')
+@login_required
+def api_transactions():
+    """Paginated transactions for the requested (or current) role"""
+    return json_listing('transactions')
+
+@app.route('/api/fraud_logs')
+@login_required
+def api_fraud_logs():
+    """Paginated fraud logs (admin only)"""
+    return json_listing('fraud_logs')
+
+@app.route('/api/users')
+@login_required
+def api_users():
+    """Paginated users (admin only)"""
+    return json_listing('users')
+
+@app.route('/api/merchants')
+@login_required
+def api_merchants():
+    """Paginated merchants (admin only)"""
+    return json_listing('merchants')
+
+# Payment write statements (prepared once and reused by sqlite3's statement cache)
+INSERT_TRANSACTION_SQL = '''
+    INSERT INTO transactions (
+        transaction_id, user_id, merchant_id, amount, category,
+        upi_id, state_code, zip_code, time_hour, time_minute,
+        fraud_probability, is_fraud, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_FRAUD_LOG_SQL = '''
+    INSERT INTO fraud_logs (
+        transaction_id, user_id, merchant_id, amount,
+        fraud_probability, reason, action_taken
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+def parse_payment_request(data):
+    """(merchant_upi, amount, category) from a payment request body"""
+    merchant_upi = data.get('merchant_upi', '').strip()
+    amount = float(data.get('amount', 0))
+    category = int(data.get('category', 1))
+    return merchant_upi, amount, category
+
+def payment_writes(transaction_id, user_id, user, merchant, transaction_data, is_fraud, fraud_probability):
+    """Statements recording a scored payment (written once, with the final status)"""
+    # Final status is decided before anything is written
+    status = 'blocked' if is_fraud else 'completed'
+    
+    writes = [(INSERT_TRANSACTION_SQL, (
+        transaction_id, user_id, merchant.id, transaction_data['amount'], transaction_data['category'],
+        merchant.upi_id, user.state_code, user.zip_code,
+        transaction_data['time_hour'], transaction_data['time_minute'],
+        fraud_probability, 1 if is_fraud else 0, status
+    ))]
+    
+    # If fraud detected, log it
+    if is_fraud:
+        writes.append((INSERT_FRAUD_LOG_SQL, (
+            transaction_id, user_id, merchant.id, transaction_data['amount'],
+            fraud_probability,
+            f'Fraud probability: {fraud_probability:.2%}',
+            'Transaction blocked'
+        )))
+    return writes
+
+def payment_result(transaction_id, is_fraud, fraud_probability):
+    """(response body, HTTP status) for a scored payment"""
+    if is_fraud:
+        return {
+            'success': False,
+            'fraud_detected': True,
+            'message': f'Transaction blocked due to fraud risk ({fraud_probability:.2%})',
+            'transaction_id': transaction_id
+        }, 403
+    
+    return {
+        'success': True,
+        'fraud_detected': False,
+        'message': 'Payment successful',
+        'transaction_id': transaction_id,
+        'fraud_probability': fraud_probability
+    }, 200
 
 @app.route('/api/process_payment', methods=['POST'])
 @login_required
@@ -430,114 +889,94 @@ def process_payment():
     if 'user_id' not in session:
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     
+    trace = payment_metrics.trace()
     try:
-        data = request.json
-        merchant_upi = data.get('merchant_upi', '').strip()
-        amount = float(data.get('amount', 0))
-        category = int(data.get('category', 1))
+        merchant_upi, amount, category = parse_payment_request(request.json)
         
         if amount <= 0:
+            trace.finish('rejected')
             return jsonify({'success': False, 'message': 'Invalid amount'}), 400
         
         user_id = session['user_id']
         conn = get_db_connection()
         cursor = conn.cursor()
+        trace.mark('db_connect')
         
-        # Get user info
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        user = cursor.fetchone()
+        # Get user info (cached profile)
+        user = profile_cache.get_user(cursor, user_id)
+        trace.mark('user_lookup')
         
-        # Get merchant info
-        cursor.execute('SELECT * FROM merchants WHERE upi_id = ?', (merchant_upi,))
-        merchant = cursor.fetchone()
+        # Get merchant info (cached profile)
+        merchant = profile_cache.get_merchant(cursor, merchant_upi)
+        trace.mark('merchant_lookup')
         
         if not merchant:
-            conn.close()
+            trace.finish('rejected')
             return jsonify({'success': False, 'message': 'Merchant not found'}), 404
         
-        # Get current time
-        now = datetime.now()
-        time_hour = now.hour
-        time_minute = now.minute
-        
         # Generate transaction ID
         transaction_id = generate_transaction_id()
         
+        # Recent activity before this payment, as committed by every worker
+        velocity_store.sync(conn)
+        velocity = velocity_store.features(user_id, merchant.id)
+        
         # Prepare transaction data for fraud detection
-        transaction_data = {
-            'amount': amount,
-            'time_hour': time_hour,
-            'time_minute': time_minute,
-            'user_age': user['age'],
-            'merchant_age': merchant['merchant_age'],
-            'state_code': user['state_code'],
-            'zip_code': user['zip_code'],
-            'category': category,
-            'upi_id_hash': hash(merchant_upi) % 100000  # Simple hash
-        }
+        transaction_data = payment_transaction_data(user, merchant, amount, category, datetime.now(), velocity)
+        trace.mark('features')
         
         # REAL-TIME FRAUD DETECTION (BEFORE TRANSACTION)
-        is_fraud, fraud_probability = detect_fraud(transaction_data)
+        is_fraud, fraud_probability = detect_fraud(transaction_data, transaction_id)
+        trace.mark('score')
         
-        # Create transaction record
-        status = 'blocked' if is_fraud else 'pending'
+        # Single transaction: each row is written once, with one commit
+        with conn:
+            for sql, params in payment_writes(transaction_id, user_id, user, merchant,
+                                              transaction_data, is_fraud, fraud_probability):
+                cursor.execute(sql, params)
+            trace.mark('insert')
+        trace.mark('commit')
         
-        cursor.execute('''
-            INSERT INTO transactions (
-                transaction_id, user_id, merchant_id, amount, category,
-                upi_id, state_code, zip_code, time_hour, time_minute,
-                fraud_probability, is_fraud, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            transaction_id, user_id, merchant['id'], amount, category,
-            merchant_upi, user['state_code'], user['zip_code'],
-            time_hour, time_minute, fraud_probability, 1 if is_fraud else 0, status
-        ))
-        
-        # If fraud detected, log it
-        if is_fraud:
-            cursor.execute('''
-                INSERT INTO fraud_logs (
-                    transaction_id, user_id, merchant_id, amount,
-                    fraud_probability, reason, action_taken
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                transaction_id, user_id, merchant['id'], amount,
-                fraud_probability,
-                f'Fraud probability: {fraud_probability:.2%}',
-                'Transaction blocked'
-            ))
-            conn.commit()
-            conn.close()
-            
-            return jsonify({
-                'success': False,
-                'fraud_detected': True,
-                'message': f'Transaction blocked due to fraud risk ({fraud_probability:.2%})',
-                'transaction_id': transaction_id
-            }), 403
-        
-        # If safe, complete transaction
-        cursor.execute('''
-            UPDATE transactions SET status = 'completed'
-            WHERE transaction_id = ?
-        ''', (transaction_id,))
-        
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'fraud_detected': False,
-            'message': 'Payment successful',
-            'transaction_id': transaction_id,
-            'fraud_probability': fraud_probability
-        })
+        body, status = payment_result(transaction_id, is_fraud, fraud_probability)
+        trace.finish('blocked' if is_fraud else 'completed')
+        return jsonify(body), status
         
     except Exception as e:
-        print(f"Error processing payment: {e}")
+        trace.finish('error')
+        app.logger.exception(f"Error processing payment: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/bulk_score', methods=['POST'])
+def bulk_score():
+    """
+    Score many transactions in one streamed request (admin or API token)
+    
+    Body: CSV with a header row (text/csv) or NDJSON (application/x-ndjson)
+    in the upi_transactions.csv column layout. Results stream back in the
+    same format (or ?format=csv|ndjson) as they are scored, one record per
+    input row: transaction_id, fraud_probability, is_fraud.
+    """
+    authorization = request.headers.get('Authorization', '')
+    has_token = BULK_SCORING_TOKEN and hmac.compare_digest(authorization, f'Bearer {BULK_SCORING_TOKEN}')
+    if 'admin_id' not in session and not has_token:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    ensure_models_loaded()
+    if not models_loaded():
+        return jsonify({'success': False, 'message': 'Fraud model not loaded'}), 503
+    
+    input_format = 'ndjson' if request.mimetype in ('application/x-ndjson', 'application/jsonl') else 'csv'
+    output_format = request.args.get('format', input_format)
+    if output_format not in READERS:
+        return jsonify({'success': False, 'message': 'format must be csv or ndjson'}), 400
+    
+    # Read the body incrementally: neither request nor response is buffered whole
+    lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    results = score_records(READERS[input_format](lines), predict_batch, BULK_SCORING_BATCH_SIZE,
+                            columns=FEATURE_COLUMNS[:model_num_features])
+    mimetype = 'application/x-ndjson' if output_format == 'ndjson' else 'text/csv'
+    return Response(stream_with_context(format_results(results, output_format)), mimetype=mimetype)
+
 @app.route('/api/generate_qr', methods=['POST'])
 @login_required
 def generate_qr():
@@ -553,7 +992,6 @@ def generate_qr():
     merchant = cursor.fetchone()
     
     if not merchant:
-        conn.close()
         return jsonify({'success': False, 'message': 'Merchant not found'}), 404
     
     qr_data = merchant['upi_id']
@@ -565,7 +1003,7 @@ def generate_qr():
     ''', (qr_data, merchant_id))
     
     conn.commit()
-    conn.close()
+    profile_cache.invalidate_merchant(qr_data)
     
     return jsonify({
         'success': True,
@@ -573,6 +1011,75 @@ def generate_qr():
         'upi_id': qr_data
     })
 
+@app.route('/api/inference_stats')
+@login_required
+def inference_stats():
+    """Batched inference latency and occupancy counters (admin only)"""
+    if 'admin_id' not in session:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    if batch_scorer is None:
+        return jsonify({'success': True, 'batching': False})
+    
+    return jsonify({'success': True, 'batching': True, 'stats': batch_scorer.stats()})
+
+@app.route('/api/model_stats')
+@login_required
+def model_stats():
+    """Champion/challenger latency histograms and shadow queue counters (admin only)"""
+    if 'admin_id' not in session:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    return jsonify({
+        'success': True,
+        'models': model_registry.stats(),
+        'shadow': shadow_scorer.stats() if shadow_scorer is not None else None
+    })
+
+@app.route('/api/cache_stats')
+@login_required
+def cache_stats():
+    """Profile cache, velocity store and OTP store counters (admin only)"""
+    if 'admin_id' not in session:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    return jsonify({
+        'success': True,
+        'profile_cache': profile_cache.stats(),
+        'velocity': velocity_store.stats(),
+        'otp': dict(otp_store.stats(), purger=otp_purger.stats())
+    })
+
+def render_metrics():
+    """This process's payment, model and queue metrics in Prometheus text format"""
+    payment_metrics.flush()
+    lines = []
+    lines += prometheus_counter('upi_guard_payments_total', 'Payments handled by outcome',
+                                payment_metrics.outcomes, label='outcome')
+    lines += prometheus_histogram('upi_guard_payment_seconds', 'Sampled end-to-end payment latency',
+                                  payment_metrics.total)
+    lines += prometheus_histogram('upi_guard_payment_stage_seconds', 'Sampled payment latency per stage',
+                                  payment_metrics.stages, label='stage')
+    lines += prometheus_histogram('upi_guard_model_seconds', 'Scoring call latency per model',
+                                  model_registry.latency, label='model')
+    if batch_scorer is not None:
+        lines += prometheus_histogram('upi_guard_inference_queue_seconds',
+                                      'Time from enqueue to batched score', batch_scorer.latency)
+    if shadow_scorer is not None:
+        lines += prometheus_counter('upi_guard_shadow_dropped_total', 'Payments not shadow scored (queue full)',
+                                    shadow_scorer.dropped)
+    lines += prometheus_gauge('upi_guard_model_ready', 'Fraud model loaded and warm',
+                              int(model_status in ('ready', 'fallback')))
+    return '\n'.join(lines) + '\n'
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint (per worker process; bearer METRICS_TOKEN when set)"""
+    authorization = request.headers.get('Authorization', '')
+    if METRICS_TOKEN and not hmac.compare_digest(authorization, f'Bearer {METRICS_TOKEN}'):
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/logout')
 def logout():
     """Logout user"""
@@ -0,0 +1,406 @@
+"""
+UPI Guard - Async Payment & Dashboard API
+asyncio (ASGI) entry point for the JSON APIs, alongside the Flask app
+
+The Flask app (app:app) keeps serving the HTML pages and login. This module
+serves the same /api/process_payment and listing endpoints from an event
+loop, so a slow SQLite commit or model call no longer pins a worker thread
+per request:
+
+- SQLite calls run on a dedicated thread pool over the shared connection pool
+- scoring goes through the micro-batching queue without blocking a thread
+  (or a thread pool when batching is off), and requests are rejected with
+  503 + Retry-After once ASYNC_MAX_PENDING_SCORES are in flight
+- sessions are the Flask session cookies, so a browser logged in on the
+  Flask side can call these endpoints directly
+
+Run with any ASGI server, e.g.: uvicorn asgi:app --port 10001
+"""
+
+import asyncio
+import hmac
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+import numpy as np
+
+import app as flask_app
+from config import *
+from pagination import fetch_page
+
+
+class Overloaded(Exception):
+    """Raised when the scoring queue is full (back-pressure)"""
+
+
+class AsyncDatabase:
+    """
+    Awaitable access to the SQLite connection pool
+
+    Each call borrows a pooled connection on a worker thread, runs a plain
+    function with it, and returns the result to the event loop.
+    """
+
+    def __init__(self, pool, max_workers=16):
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='async-sqlite')
+
+    def _call(self, fn, args):
+        conn = self.pool.acquire()
+        try:
+            return fn(conn, *args)
+        finally:
+            self.pool.release(conn)
+
+    async def run(self, fn, *args):
+        """Await fn(conn, *args) executed on a database thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class AsyncScorer:
+    """
+    Awaitable fraud scoring with a bound on requests in flight
+
+    Uses the process's BatchingScorer when it is running (the event loop is
+    woken from its worker thread); otherwise scoring runs on a small thread
+    pool.
+    """
+
+    def __init__(self, max_pending=256, max_workers=4):
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='async-scoring')
+
+    async def score(self, features):
+        """Fraud probability for one raw feature vector"""
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded('Scoring queue is full')
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            batch_scorer = flask_app.batch_scorer
+            if batch_scorer is None:
+                return await loop.run_in_executor(self._executor, self._score_now, features)
+
+            future = loop.create_future()
+
+            def resolve(result, error):
+                if future.done():
+                    return
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+            batch_scorer.submit(features, lambda result, error: loop.call_soon_threadsafe(resolve, result, error))
+            return await future
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _score_now(features):
+        if flask_app.fused_scorer is not None:
+            return flask_app.fused_scorer.score(features)
+        return float(flask_app.predict_batch(np.array([features], dtype=np.float64))[0])
+
+    async def detect_fraud(self, transaction_data, transaction_id=None):
+        """
+        Async counterpart of app.detect_fraud: (is_fraud, fraud_probability)
+
+        Overloaded propagates; any other failure is fail-safe as in detect_fraud.
+        """
+        if flask_app.model_status not in ('ready', 'fallback'):
+            await asyncio.get_running_loop().run_in_executor(self._executor, flask_app.ensure_models_loaded)
+
+        if not flask_app.models_loaded():
+            # If models not loaded, return safe default
+            return False, 0.1
+
+        features = flask_app.fraud_features(transaction_data)
+        try:
+            start = time.perf_counter()
+            fraud_probability = await self.score(flask_app.model_input(features))
+            registry = flask_app.model_registry
+            registry.record(registry.champion, (time.perf_counter() - start) * 1_000_000)
+        except Overloaded:
+            raise
+        except Exception as e:
+            print(f"Error in fraud detection: {e}")
+            # On error, allow transaction (fail-safe)
+            return False, 0.1
+
+        flask_app.submit_shadow(transaction_id, features)
+        return fraud_probability > FRAUD_THRESHOLD, fraud_probability
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+db = AsyncDatabase(flask_app.db_pool, max_workers=ASYNC_DB_WORKERS)
+scorer = AsyncScorer(max_pending=ASYNC_MAX_PENDING_SCORES)
+
+
+# ==================== Request / Response ====================
+
+class Request:
+    """Minimal HTTP request view over an ASGI scope and body"""
+
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query = {k: v[0] for k, v in parse_qs(scope.get('query_string', b'').decode()).items()}
+        self.headers = {k.decode().lower(): v.decode() for k, v in scope.get('headers', [])}
+        self.body = body
+        self._session = None
+
+    @property
+    def session(self):
+        """Flask session contents (empty when missing, expired or tampered)"""
+        if self._session is None:
+            self._session = {}
+            cookie = SimpleCookie(self.headers.get('cookie', ''))
+            name = flask_app.app.config['SESSION_COOKIE_NAME']
+            if name in cookie:
+                serializer = flask_app.app.session_interface.get_signing_serializer(flask_app.app)
+                try:
+                    self._session = serializer.loads(
+                        cookie[name].value,
+                        max_age=int(flask_app.app.permanent_session_lifetime.total_seconds())
+                    )
+                except Exception:
+                    pass
+        return self._session
+
+    def json(self):
+        return json.loads(self.body or b'null')
+
+
+class PlainText:
+    """Handler result sent as-is instead of as JSON"""
+
+    def __init__(self, text, content_type='text/plain'):
+        self.text = text
+        self.content_type = content_type
+
+
+async def send_text(send, body, status=200):
+    payload = body.text.encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', body.content_type.encode()),
+                    (b'content-length', str(len(payload)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+async def send_json(send, body, status=200, headers=()):
+    payload = json.dumps(body).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(payload)).encode()), *headers]
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+# ==================== Handlers ====================
+
+def _load_profiles(conn, user_id, merchant_upi, trace):
+    # 'db_connect' here is the wait for a database thread and connection
+    trace.mark('db_connect')
+    cursor = conn.cursor()
+    user = flask_app.profile_cache.get_user(cursor, user_id)
+    trace.mark('user_lookup')
+    merchant = flask_app.profile_cache.get_merchant(cursor, merchant_upi)
+    trace.mark('merchant_lookup')
+    return user, merchant
+
+
+def _velocity_features(conn, user_id, merchant_id):
+    # Recent activity before this payment, as committed by every worker
+    flask_app.velocity_store.sync(conn)
+    return flask_app.velocity_store.features(user_id, merchant_id)
+
+
+def _write_payment(conn, writes, trace):
+    # Single transaction: each row is written once, with one commit
+    with conn:
+        for sql, params in writes:
+            conn.execute(sql, params)
+        trace.mark('insert')
+    trace.mark('commit')
+
+
+async def process_payment(request):
+    """Process payment with real-time fraud detection"""
+    if 'user_id' not in request.session:
+        return {'success': False, 'message': 'Unauthorized'}, 401
+
+    trace = flask_app.payment_metrics.trace()
+    try:
+        merchant_upi, amount, category = flask_app.parse_payment_request(request.json())
+
+        if amount <= 0:
+            trace.finish('rejected')
+            return {'success': False, 'message': 'Invalid amount'}, 400
+
+        user_id = request.session['user_id']
+        user, merchant = await db.run(_load_profiles, user_id, merchant_upi, trace)
+
+        if not merchant:
+            trace.finish('rejected')
+            return {'success': False, 'message': 'Merchant not found'}, 404
+
+        transaction_id = flask_app.generate_transaction_id()
+        velocity = await db.run(_velocity_features, user_id, merchant.id)
+        transaction_data = flask_app.payment_transaction_data(
+            user, merchant, amount, category, datetime.now(), velocity
+        )
+        trace.mark('features')
+
+        # REAL-TIME FRAUD DETECTION (BEFORE TRANSACTION)
+        is_fraud, fraud_probability = await scorer.detect_fraud(transaction_data, transaction_id)
+        trace.mark('score')
+
+        await db.run(_write_payment, flask_app.payment_writes(
+            transaction_id, user_id, user, merchant, transaction_data, is_fraud, fraud_probability
+        ), trace)
+
+        trace.finish('blocked' if is_fraud else 'completed')
+        return flask_app.payment_result(transaction_id, is_fraud, fraud_probability)
+
+    except Overloaded:
+        trace.finish('error')
+        raise
+    except Exception as e:
+        trace.finish('error')
+        print(f"Error processing payment: {e}")
+        return {'success': False, 'message': str(e)}, 500
+
+
+def _fetch_listing(conn, query, after, limit):
+    select_sql, alias, where, params = query
+    rows, next_cursor = fetch_page(conn.cursor(), select_sql, alias, where=where, params=params,
+                                   after=after, limit=limit)
+    return [dict(row) for row in rows], next_cursor
+
+
+def listing(name):
+    """Handler serving one keyset-paginated listing as JSON"""
+    async def handler(request):
+        query = flask_app.listing_query(name, request.session, request.query.get('role'))
+        if query is None:
+            return {'success': False, 'message': 'Unauthorized'}, 401
+
+        try:
+            items, next_cursor = await db.run(
+                _fetch_listing, query, request.query.get('cursor'), flask_app.page_limit(request.query.get('limit'))
+            )
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}, 400
+
+        return {'success': True, 'items': items, 'next_cursor': next_cursor}, 200
+    return handler
+
+
+async def ready(request):
+    """Readiness probe: scoring loaded and the async scoring queue not saturated"""
+    is_ready = flask_app.model_status in ('ready', 'fallback')
+    return {
+        'ready': is_ready,
+        'status': flask_app.model_status,
+        'in_flight': scorer.in_flight,
+        'max_pending': scorer.max_pending,
+        'rejected': scorer.rejected
+    }, (200 if is_ready else 503)
+
+
+async def metrics(request):
+    """Prometheus scrape endpoint (bearer METRICS_TOKEN when set)"""
+    authorization = request.headers.get('authorization', '')
+    if METRICS_TOKEN and not hmac.compare_digest(authorization, f'Bearer {METRICS_TOKEN}'):
+        return {'success': False, 'message': 'Unauthorized'}, 401
+    return PlainText(flask_app.render_metrics(), 'text/plain; version=0.0.4'), 200
+
+
+ROUTES = {
+    ('POST', '/api/process_payment'): process_payment,
+    ('GET', '/api/transactions'): listing('transactions'),
+    ('GET', '/api/fraud_logs'): listing('fraud_logs'),
+    ('GET', '/api/users'): listing('users'),
+    ('GET', '/api/merchants'): listing('merchants'),
+    ('GET', '/ready'): ready,
+    ('GET', '/metrics'): metrics
+}
+
+
+# ==================== ASGI Application ====================
+
+async def _read_body(receive):
+    """Request body, or None once it exceeds ASYNC_MAX_BODY_BYTES"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > ASYNC_MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Load (and warm) the model before accepting traffic in lazy mode
+            await asyncio.get_running_loop().run_in_executor(None, flask_app.ensure_models_loaded)
+            flask_app.ensure_worker_threads()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if flask_app.shadow_scorer is not None:
+                flask_app.shadow_scorer.stop()
+            db.close()
+            scorer.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        return await send_json(send, {'success': False, 'message': 'Not found'}, 404)
+
+    body = await _read_body(receive)
+    if body is None:
+        return await send_json(send, {'success': False, 'message': 'Request body too large'}, 413)
+
+    try:
+        response, status = await handler(Request(scope, body))
+    except Overloaded:
+        return await send_json(send, {'success': False, 'message': 'Server busy, retry shortly'}, 503,
+                               headers=[(b'retry-after', b'1')])
+    if isinstance(response, PlainText):
+        return await send_text(send, response, status)
+    await send_json(send, response, status)
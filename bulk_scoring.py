@@ -0,0 +1,216 @@
+"""
+Bulk Transaction Scoring
+Streams CSV or NDJSON transactions (upi_transactions.csv column layout)
+through the fraud model in large vectorized batches
+
+Input rows need the feature columns the model was trained on (the static
+columns, plus the velocity columns for models trained with them);
+transaction_id is echoed back when present and any other column (e.g.
+fraud) is ignored. Output has one
+record per input row, in order:
+
+    transaction_id, fraud_probability, is_fraud   (FRAUD_THRESHOLD decision)
+
+Rows that cannot be parsed produce a record with an `error` field instead
+of stopping the stream. Memory is bounded by one batch on both ends.
+
+CLI:
+    python bulk_scoring.py data/upi_transactions.csv -o scores.csv
+    cat rows.ndjson | python bulk_scoring.py - --format ndjson
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from config import FRAUD_THRESHOLD, MODEL_PATH, NUMPY_MODEL_PATH, SCALER_PATH
+from features import FEATURE_COLUMNS
+OUTPUT_COLUMNS = ['transaction_id', 'fraud_probability', 'is_fraud', 'error']
+DEFAULT_BATCH_SIZE = 8192
+
+
+# ==================== Input ====================
+
+def iter_csv_records(lines):
+    """Dict per CSV data row (header row required)"""
+    return csv.DictReader(lines)
+
+
+def iter_ndjson_records(lines):
+    """Dict per non-blank NDJSON line (malformed lines yield the exception)"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+READERS = {'csv': iter_csv_records, 'ndjson': iter_ndjson_records}
+
+
+def iter_batches(records, batch_size=DEFAULT_BATCH_SIZE, columns=FEATURE_COLUMNS):
+    """
+    Group records into (rows, features) batches
+
+    rows holds (transaction_id, error) per input record; features holds one
+    float row of `columns` per record without an error, in the same order.
+    """
+    rows = []
+    features = []
+    for record in records:
+        if isinstance(record, Exception):
+            rows.append((None, f'Invalid JSON: {record}'))
+        else:
+            transaction_id = record.get('transaction_id')
+            try:
+                features.append([float(record[column]) for column in columns])
+                rows.append((transaction_id, None))
+            except (KeyError, TypeError, ValueError) as e:
+                rows.append((transaction_id, f'Invalid row: {e!r}'))
+
+        if len(rows) >= batch_size:
+            yield rows, np.asarray(features, dtype=np.float64).reshape(-1, len(columns))
+            rows, features = [], []
+
+    if rows:
+        yield rows, np.asarray(features, dtype=np.float64).reshape(-1, len(columns))
+
+
+# ==================== Scoring ====================
+
+def score_records(records, predict_batch, batch_size=DEFAULT_BATCH_SIZE, threshold=FRAUD_THRESHOLD,
+                  columns=FEATURE_COLUMNS):
+    """
+    Yield one result dict per input record, scoring a batch at a time
+
+    Args:
+        records: Iterable of feature dicts (or exceptions for unparsable rows)
+        predict_batch: Callable mapping an (n, len(columns)) raw feature array to n probabilities
+        batch_size: Rows per model call
+        threshold: Probability above which a row is flagged
+        columns: Feature columns the model takes, in order
+    """
+    for rows, features in iter_batches(records, batch_size, columns):
+        probabilities = iter(np.asarray(predict_batch(features)).reshape(-1)) if len(features) else iter(())
+        for transaction_id, error in rows:
+            if error is not None:
+                yield {'transaction_id': transaction_id, 'error': error}
+                continue
+            probability = float(next(probabilities))
+            yield {
+                'transaction_id': transaction_id,
+                'fraud_probability': round(probability, 6),
+                'is_fraud': int(probability > threshold)
+            }
+
+
+def format_results(results, fmt='csv'):
+    """Serialize result dicts to CSV (with header) or NDJSON text chunks"""
+    if fmt == 'ndjson':
+        for result in results:
+            yield json.dumps(result) + '\n'
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=OUTPUT_COLUMNS, lineterminator='\n')
+    writer.writeheader()
+    for result in results:
+        writer.writerow(result)
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def load_scorer(numpy_model_path=NUMPY_MODEL_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """
+    Vectorized scorer from the trained model files (same preference as the app)
+
+    Returns:
+        FusedCNNScorer: .predict maps (n, .num_features) raw features to n
+        fraud probabilities
+    """
+    from cnn_runtime import NumpyCNN, FusedCNNScorer, export_numpy_model
+
+    if numpy_model_path and os.path.exists(numpy_model_path):
+        model = NumpyCNN.load(numpy_model_path)
+    elif os.path.exists(model_path) and os.path.exists(scaler_path):
+        import joblib
+        from tensorflow import keras
+
+        buffer = io.BytesIO()
+        export_numpy_model(keras.models.load_model(model_path), joblib.load(scaler_path), buffer)
+        buffer.seek(0)
+        model = NumpyCNN.load(buffer)
+    else:
+        raise FileNotFoundError(f"No model at {numpy_model_path} or {model_path}; run models/train_models.py")
+
+    return FusedCNNScorer.from_numpy_model(model)
+
+
+def load_predict_batch(numpy_model_path=NUMPY_MODEL_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """load_scorer(...).predict"""
+    return load_scorer(numpy_model_path, model_path, scaler_path).predict
+
+
+def detect_format(path, explicit=None):
+    """csv / ndjson from --format or the file extension"""
+    if explicit:
+        return explicit
+    return 'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UPI Guard - Bulk Transaction Scoring')
+    parser.add_argument('input', help="CSV or NDJSON file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Output file ('-' for stdout)")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default=None,
+                        help='Input format (default: from extension, else csv)')
+    parser.add_argument('--output-format', choices=['csv', 'ndjson'], default=None,
+                        help='Output format (default: same as input)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = detect_format(args.input, args.format)
+    scorer = load_scorer()
+    columns = FEATURE_COLUMNS[:scorer.num_features]
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    counts = {'rows': 0, 'flagged': 0, 'errors': 0}
+
+    def counted(results):
+        for result in results:
+            counts['rows'] += 1
+            counts['flagged'] += result.get('is_fraud', 0)
+            counts['errors'] += 'error' in result
+            yield result
+
+    start = time.perf_counter()
+    try:
+        results = score_records(READERS[fmt](source), scorer.predict, args.batch_size, columns=columns)
+        for chunk in format_results(counted(results), args.output_format or fmt):
+            sink.write(chunk)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {counts['rows']:,} rows in {elapsed:.2f}s "
+          f"({counts['rows'] / max(elapsed, 1e-9):,.0f} rows/sec): "
+          f"{counts['flagged']:,} flagged, {counts['errors']:,} errors", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
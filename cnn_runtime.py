@@ -0,0 +1,351 @@
+"""
+TensorFlow-free CNN Scoring Runtime
+Runs the exported Conv1D/Dense fraud model with pure NumPy
+"""
+
+import json
+import threading
+
+import numpy as np
+
+
+def _activation(name):
+    """Return a NumPy implementation of a Keras activation"""
+    if name in (None, 'linear'):
+        return lambda x: x
+    if name == 'relu':
+        return lambda x: np.maximum(x, 0.0)
+    if name == 'sigmoid':
+        return lambda x: 1.0 / (1.0 + np.exp(-x))
+    if name == 'tanh':
+        return np.tanh
+    raise ValueError(f"Unsupported activation: {name}")
+
+
+def export_numpy_model(model, scaler, path):
+    """
+    Export a trained Keras CNN and its StandardScaler to a compact .npz
+
+    Only the layer types used by the training script are supported
+    (Conv1D, MaxPooling1D, Dropout, Flatten, Dense). Dropout is an identity
+    at inference time and is therefore dropped from the export.
+
+    Args:
+        model: Trained keras Sequential model
+        scaler: Fitted sklearn StandardScaler
+        path: Output .npz file path
+    """
+    layers = []
+    arrays = {
+        'scaler_mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scaler_scale': np.asarray(scaler.scale_, dtype=np.float64)
+    }
+
+    for layer in model.layers:
+        kind = type(layer).__name__
+        config = layer.get_config()
+
+        if kind == 'Dropout':
+            continue
+        elif kind in ('Conv1D', 'Dense'):
+            kernel, bias = layer.get_weights()
+            index = len(layers)
+            arrays[f'kernel_{index}'] = kernel.astype(np.float32)
+            arrays[f'bias_{index}'] = bias.astype(np.float32)
+            spec = {'type': kind, 'activation': config.get('activation')}
+            if kind == 'Conv1D':
+                spec['strides'] = int(np.ravel(config['strides'])[0])
+                spec['padding'] = config['padding']
+            layers.append(spec)
+        elif kind == 'MaxPooling1D':
+            layers.append({
+                'type': kind,
+                'pool_size': int(np.ravel(config['pool_size'])[0]),
+                'strides': int(np.ravel(config['strides'] or config['pool_size'])[0]),
+                'padding': config['padding']
+            })
+        elif kind == 'Flatten':
+            layers.append({'type': kind})
+        else:
+            raise ValueError(f"Unsupported layer for NumPy export: {kind}")
+
+    arrays['layers'] = np.array(json.dumps(layers))
+    np.savez_compressed(path, **arrays)
+
+
+def _same_padding(length, window, stride):
+    """Left/right padding Keras uses for padding='same'"""
+    out_length = -(-length // stride)
+    total = max((out_length - 1) * stride + window - length, 0)
+    return total // 2, total - total // 2
+
+
+def conv1d(x, kernel, bias, strides=1, padding='valid'):
+    """1D convolution over (batch, steps, channels) input"""
+    window = kernel.shape[0]
+    if padding == 'same':
+        left, right = _same_padding(x.shape[1], window, strides)
+        x = np.pad(x, ((0, 0), (left, right), (0, 0)))
+
+    out_length = (x.shape[1] - window) // strides + 1
+    if out_length <= 0:
+        return np.zeros((x.shape[0], 0, kernel.shape[2]), dtype=x.dtype)
+
+    # (batch, out_steps, channels, window) -> contract with (window, channels, filters)
+    windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=1)[:, ::strides]
+    return np.einsum('bsck,kcf->bsf', windows, kernel, optimize=True) + bias
+
+
+def max_pool1d(x, pool_size, strides, padding='valid'):
+    """1D max pooling over (batch, steps, channels) input"""
+    if padding == 'same':
+        left, right = _same_padding(x.shape[1], pool_size, strides)
+        x = np.pad(x, ((0, 0), (left, right), (0, 0)), constant_values=-np.inf)
+
+    out_length = (x.shape[1] - pool_size) // strides + 1
+    if out_length <= 0:
+        return np.zeros((x.shape[0], 0, x.shape[2]), dtype=x.dtype)
+
+    windows = np.lib.stride_tricks.sliding_window_view(x, pool_size, axis=1)[:, ::strides]
+    return windows.max(axis=-1)
+
+
+class NumpyCNN:
+    """
+    Pure-NumPy forward pass of the exported fraud detection CNN
+
+    Scaling is applied inside `predict`, so callers pass raw feature rows
+    in the same column order used for training.
+    """
+
+    def __init__(self, layers, weights, scaler_mean, scaler_scale):
+        self.layers = layers
+        self.weights = weights
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+        self.num_features = len(scaler_mean)
+        self._activations = [_activation(layer.get('activation')) for layer in layers]
+
+    @classmethod
+    def load(cls, path):
+        """Load a model exported with `export_numpy_model`"""
+        with np.load(path, allow_pickle=False) as data:
+            layers = json.loads(str(data['layers']))
+            weights = {
+                index: (data[f'kernel_{index}'], data[f'bias_{index}'])
+                for index, layer in enumerate(layers)
+                if layer['type'] in ('Conv1D', 'Dense')
+            }
+            return cls(layers, weights, data['scaler_mean'], data['scaler_scale'])
+
+    def forward(self, x_scaled):
+        """Run the layer stack on already-scaled (batch, features) input"""
+        x = x_scaled.astype(np.float32).reshape(x_scaled.shape[0], x_scaled.shape[1], 1)
+
+        for index, layer in enumerate(self.layers):
+            kind = layer['type']
+            if kind == 'Conv1D':
+                kernel, bias = self.weights[index]
+                x = conv1d(x, kernel, bias, layer['strides'], layer['padding'])
+            elif kind == 'MaxPooling1D':
+                x = max_pool1d(x, layer['pool_size'], layer['strides'], layer['padding'])
+            elif kind == 'Flatten':
+                x = x.reshape(x.shape[0], -1)
+            elif kind == 'Dense':
+                kernel, bias = self.weights[index]
+                x = x @ kernel + bias
+            x = self._activations[index](x)
+
+        return x
+
+    def predict(self, features):
+        """
+        Score raw feature rows
+
+        Args:
+            features: (batch, num_features) array of unscaled features
+
+        Returns:
+            np.ndarray: fraud probability per row
+        """
+        features = np.asarray(features, dtype=np.float64)
+        x_scaled = (features - self.scaler_mean) / self.scaler_scale
+        return self.forward(x_scaled)[:, 0]
+
+
+def _apply_activation_inplace(name, x):
+    """Apply an activation in place on a preallocated buffer"""
+    if name in (None, 'linear'):
+        return
+    if name == 'relu':
+        np.maximum(x, 0.0, out=x)
+    elif name == 'sigmoid':
+        np.negative(x, out=x)
+        np.exp(x, out=x)
+        x += 1.0
+        np.reciprocal(x, out=x)
+    elif name == 'tanh':
+        np.tanh(x, out=x)
+    else:
+        raise ValueError(f"Unsupported activation: {name}")
+
+
+def _conv_as_dense(kernel, bias, length, strides, padding):
+    """Expand a Conv1D over a flattened (steps * channels) input into a dense matrix"""
+    window, channels, filters = kernel.shape
+    left = _same_padding(length, window, strides)[0] if padding == 'same' else 0
+    padded = length + sum(_same_padding(length, window, strides)) if padding == 'same' else length
+    out_length = max((padded - window) // strides + 1, 0)
+
+    dense = np.zeros((length * channels, out_length * filters), dtype=np.float64)
+    for step in range(out_length):
+        for k in range(window):
+            position = step * strides + k - left
+            if 0 <= position < length:
+                dense[position * channels:(position + 1) * channels,
+                      step * filters:(step + 1) * filters] += kernel[k]
+
+    return dense, np.tile(bias.astype(np.float64), out_length), out_length
+
+
+def _pool_indices(length, channels, pool_size, strides, padding):
+    """Gather indices implementing MaxPooling1D over a flattened input"""
+    left, right = _same_padding(length, pool_size, strides) if padding == 'same' else (0, 0)
+    out_length = max((length + left + right - pool_size) // strides + 1, 0)
+
+    indices = np.zeros((out_length * channels, pool_size), dtype=np.intp)
+    for step in range(out_length):
+        # Clamp 'same' padding onto the nearest real step; max() is unaffected
+        positions = np.clip(np.arange(pool_size) + step * strides - left, 0, length - 1)
+        for channel in range(channels):
+            indices[step * channels + channel] = positions * channels + channel
+
+    return indices, out_length
+
+
+class FusedCNNScorer:
+    """
+    Fused scaler + CNN scorer for the single-payment hot path
+
+    Every convolution is expanded into an equivalent dense matrix and the
+    StandardScaler mean/scale are folded into the first layer, so scoring a
+    payment is a short chain of matmuls on raw features. Single-row scoring
+    reuses per-thread preallocated buffers: no sklearn validation and no
+    per-request array allocations.
+    """
+
+    def __init__(self, ops, num_features):
+        self.ops = ops
+        self.num_features = num_features
+        self._local = threading.local()
+
+    @classmethod
+    def from_numpy_model(cls, model):
+        """Compile a loaded NumpyCNN into fused dense/pool operations"""
+        ops = []
+        length, channels = model.num_features, 1
+        flat = False
+
+        for index, layer in enumerate(model.layers):
+            kind = layer['type']
+            if kind == 'Conv1D':
+                kernel, bias = model.weights[index]
+                dense, dense_bias, length = _conv_as_dense(
+                    kernel.astype(np.float64), bias, length, layer['strides'], layer['padding']
+                )
+                channels = kernel.shape[2]
+                ops.append(['dense', dense, dense_bias, layer.get('activation')])
+            elif kind == 'MaxPooling1D':
+                indices, length = _pool_indices(
+                    length, channels, layer['pool_size'], layer['strides'], layer['padding']
+                )
+                ops.append(['pool', indices])
+            elif kind == 'Flatten':
+                flat = True
+            elif kind == 'Dense':
+                kernel, bias = model.weights[index]
+                ops.append(['dense', kernel.astype(np.float64), bias.astype(np.float64),
+                            layer.get('activation')])
+
+        if not flat:
+            raise ValueError('Fused scorer expects a Flatten layer before the Dense stack')
+
+        # Fold the scaler into the first dense op: W' = W / scale, b' = b - (mean / scale) @ W
+        first = ops[0]
+        if first[0] != 'dense':
+            raise ValueError('Fused scorer expects the first layer to be Conv1D or Dense')
+        scale = np.asarray(model.scaler_scale, dtype=np.float64)
+        mean = np.asarray(model.scaler_mean, dtype=np.float64)
+        first[2] = first[2] - (mean / scale) @ first[1]
+        first[1] = first[1] / scale[:, None]
+
+        return cls([tuple(op) for op in ops], model.num_features)
+
+    def _buffers(self):
+        """Per-thread preallocated input/intermediate buffers for one row"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = [np.zeros((1, self.num_features))]
+            for op in self.ops:
+                if op[0] == 'dense':
+                    buffers.append(np.zeros((1, op[1].shape[1])))
+                else:
+                    gathered = np.zeros((1,) + op[1].shape)
+                    buffers.append((gathered, np.zeros((1, op[1].shape[0]))))
+            self._local.buffers = buffers
+        return buffers
+
+    def score(self, features):
+        """
+        Score one payment's raw features without allocating arrays
+
+        Args:
+            features: Sequence of num_features raw values (training column order)
+
+        Returns:
+            float: fraud probability
+        """
+        buffers = self._buffers()
+        x = buffers[0]
+        x[0] = features
+
+        for op, out in zip(self.ops, buffers[1:]):
+            if op[0] == 'dense':
+                np.matmul(x, op[1], out=out)
+                out += op[2]
+                _apply_activation_inplace(op[3], out)
+                x = out
+            else:
+                gathered, pooled = out
+                np.take(x, op[1], axis=1, out=gathered)
+                np.max(gathered, axis=2, out=pooled)
+                x = pooled
+
+        return float(x[0, 0])
+
+    # Rows per pass in predict: keeps the widest intermediate (rows x 448
+    # float64) in L2 instead of streaming multi-MB activations through memory
+    PREDICT_CHUNK_ROWS = 512
+
+    def predict(self, features):
+        """Score a (batch, num_features) array of raw features"""
+        x = np.asarray(features, dtype=np.float64)
+        if len(x) <= self.PREDICT_CHUNK_ROWS:
+            return self._predict_chunk(x)
+        return np.concatenate([self._predict_chunk(x[i:i + self.PREDICT_CHUNK_ROWS])
+                               for i in range(0, len(x), self.PREDICT_CHUNK_ROWS)])
+
+    def _predict_chunk(self, x):
+        for op in self.ops:
+            if op[0] == 'dense':
+                x = x @ op[1] + op[2]
+                _apply_activation_inplace(op[3], x)
+            else:
+                # Elementwise max over the pool window: much faster than a
+                # reduce over a length-2 axis for large batches
+                indices = op[1]
+                pooled = x[:, indices[:, 0]]
+                for k in range(1, indices.shape[1]):
+                    np.maximum(pooled, x[:, indices[:, k]], out=pooled)
+                x = pooled
+        return x[:, 0]
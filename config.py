@@ -10,11 +10,26 @@ DEBUG = os.environ.get('DEBUG', 'False').lower() in ('1', 'true', 'yes')
 PORT = int(os.environ.get('PORT', '10000'))
 
 # Database Configuration
-DATABASE_PATH = 'upi_guard.db'
+DATABASE_PATH = os.environ.get('DATABASE_PATH', 'upi_guard.db')
+# transaction_ids.py: every process writing to DATABASE_PATH leases its
+# transaction ID worker id from a lock file in this directory
+TRANSACTION_WORKER_ID_DIR = os.environ.get('TRANSACTION_WORKER_ID_DIR', DATABASE_PATH + '.worker-ids')
+
+# SQLite connection pool tuning
+DB_POOL_MAX_SIZE = 16  # Idle connections kept per worker process
+DB_BUSY_TIMEOUT_MS = 5000
+DB_CACHE_SIZE_KB = 16384  # Page cache per connection
+DB_MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the database file memory-mapped
 
 # OTP Configuration (Development Mode - Email Based)
 OTP_EXPIRY_MINUTES = 10
 OTP_LENGTH = 6
+# otp.py: OTPs are kept in memory; replicate them to otp_storage whenever more
+# than one worker process serves logins (gunicorn WEB_CONCURRENCY > 1)
+OTP_REPLICATE_TO_DB = os.environ.get('OTP_REPLICATE_TO_DB', 'True').lower() in ('1', 'true', 'yes')
+OTP_MEMORY_MAX_ENTRIES = 100000  # Mobiles with outstanding OTPs held per process
+OTP_PURGE_INTERVAL_SECONDS = 60
+OTP_PURGE_BATCH_SIZE = 1000  # Expired rows deleted per transaction
 
 # Email Configuration (for OTP - Development)
 SMTP_SERVER = 'smtp.gmail.com'
@@ -28,8 +43,74 @@ DEV_MODE = True  # Set to False in production
 
 # Fraud Detection Configuration
 FRAUD_THRESHOLD = 0.5  # Probability threshold (0-1) for blocking transaction
-MODEL_PATH = 'models/fraud_detection_cnn.h5'
-SCALER_PATH = 'models/scaler.pkl'
+MODEL_PATH = os.environ.get('MODEL_PATH', 'models/fraud_detection_cnn.h5')
+SCALER_PATH = os.environ.get('SCALER_PATH', 'models/scaler.pkl')
+# TensorFlow-free export of the CNN + scaler (preferred when present)
+NUMPY_MODEL_PATH = os.environ.get('NUMPY_MODEL_PATH', 'models/fraud_detection_cnn.npz')
+# 'eager': load at import (once in the gunicorn master with preload_app)
+# 'lazy': defer until the first /ready probe or scoring call
+MODEL_LOADING = os.environ.get('MODEL_LOADING', 'eager').lower()
+
+# Batched Inference Configuration
+# Concurrent payments (gunicorn gthread workers, see gunicorn.conf.py) are
+# coalesced into one model call per flush. A lone payment is scored at once;
+# INFERENCE_MAX_WAIT_US is only spent waiting when others are queued with it
+INFERENCE_BATCHING_ENABLED = True
+INFERENCE_MAX_BATCH_SIZE = int(os.environ.get('INFERENCE_MAX_BATCH_SIZE', '32'))
+INFERENCE_MAX_WAIT_US = int(os.environ.get('INFERENCE_MAX_WAIT_US', '2000'))  # Microseconds
+
+# Payment Metrics (metrics.py, served at /metrics in Prometheus text format)
+# Outcomes are counted for every payment; stage latencies for 1 in
+# round(1 / METRICS_SAMPLE_RATE) payments (0 disables stage timing). Timing
+# costs ~6 us per timed payment, counting alone ~1 us
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '0.1'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Bearer token required by /metrics when set
+
+# Velocity Feature Store (velocity.py)
+# Per-process sliding windows of recent payments per user, merchant and pair.
+# Every worker replays the payments committed by all workers (transactions
+# table) before scoring, so counts do not depend on which worker served them
+VELOCITY_MAX_KEYS = 100000  # Per key kind; least recently active evicted beyond this
+VELOCITY_REBUILD_ON_STARTUP = True  # Replay the last day of transactions at startup
+
+# Champion / Challenger Configuration (shadow_scoring.py)
+# The served CNN is the champion and decides; the listed challengers score
+# the same payments in the background into live_shadow_scores
+SHADOW_MODELS = [name.strip() for name in os.environ.get('SHADOW_MODELS', 'lr,rf,svm').split(',') if name.strip()]
+SHADOW_MODEL_PATHS = {
+    'lr': 'models/fraud_detection_lr.pkl',
+    'rf': 'models/fraud_detection_rf.pkl',
+    'svm': 'models/fraud_detection_svm.pkl'
+}
+# Challengers fitted on standardized features (scaler.pkl); RF is fitted on raw ones
+SHADOW_MODELS_SCALED = {'lr', 'svm'}
+SHADOW_MAX_QUEUE = 10000  # Payments waiting for shadow scoring; newer ones are dropped beyond this
+SHADOW_BATCH_SIZE = 256  # Payments scored and persisted per batch
+SHADOW_FLUSH_SECONDS = 1.0  # Longest a partial batch waits
+
+# Profile Cache Configuration
+# User/merchant scoring attributes cached in-process for the payment path
+PROFILE_CACHE_ENABLED = os.environ.get('PROFILE_CACHE_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+PROFILE_CACHE_MAX_ENTRIES = 10000  # Per profile kind (users, merchants)
+PROFILE_CACHE_TTL_SECONDS = 300
+
+# Bulk Scoring Configuration (/api/bulk_score, bulk_scoring.py)
+BULK_SCORING_BATCH_SIZE = 8192  # Rows per vectorized model call
+BULK_SCORING_TOKEN = os.environ.get('BULK_SCORING_TOKEN')  # Bearer token for batch jobs (admin session otherwise)
+
+# Offline Re-scoring Configuration (rescoring.py)
+RESCORE_CHUNK_SIZE = 5000  # Transactions read, scored and checkpointed together
+RESCORE_WORKERS = int(os.environ.get('RESCORE_WORKERS', str(os.cpu_count() or 1)))
+
+# Async (ASGI) API Configuration (asgi.py)
+ASYNC_DB_WORKERS = DB_POOL_MAX_SIZE  # Threads running SQLite calls for the event loop
+ASYNC_MAX_PENDING_SCORES = int(os.environ.get('ASYNC_MAX_PENDING_SCORES', '256'))  # 503 beyond this
+ASYNC_MAX_BODY_BYTES = 64 * 1024
+
+# Dashboard / API Pagination (keyset cursors on created_at, id)
+DASHBOARD_PAGE_SIZE = 20  # Rows rendered server-side per listing
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
 
 # Transaction Categories
 CATEGORIES = {
@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+# Importing app runs migrations and the velocity rebuild against DATABASE_PATH:
+# point it at a scratch database before any test module loads, so a test run
+# never touches the committed upi_guard.db
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(prefix='upi_guard_tests_'), 'upi_guard.db'))
+
+import database  # noqa: E402
+
+database.create_tables()
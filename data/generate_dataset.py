@@ -1,293 +1,381 @@
-<<<<<<< HEAD
-"""
-Dataset Generator for UPI Transaction Fraud Detection
-Generates synthetic but realistic UPI transaction data
-"""
-
-import pandas as pd
-import numpy as np
-import random
-from datetime import datetime
-
-def generate_dataset(num_transactions=50000, fraud_ratio=0.1):
-    """
-    Generate synthetic UPI transaction dataset
-    
-    Args:
-        num_transactions: Total number of transactions to generate
-        fraud_ratio: Ratio of fraudulent transactions (default 10%)
-    """
-    
-    np.random.seed(42)  # For reproducibility
-    random.seed(42)
-    
-    # Calculate number of fraud cases
-    num_fraud = int(num_transactions * fraud_ratio)
-    num_legitimate = num_transactions - num_fraud
-    
-    data = []
-    
-    # Generate Legitimate Transactions
-    print("Generating legitimate transactions...")
-    for i in range(num_legitimate):
-        # Legitimate transaction patterns
-        amount = np.random.lognormal(mean=5.5, sigma=1.2)  # Right-skewed (most transactions are small)
-        amount = min(max(round(amount, 2), 1.0), 100000)  # Clamp between ₹1 and ₹1,00,000
-        
-        time_hour = np.random.choice(range(24), p=[
-            0.02, 0.01, 0.01, 0.01, 0.01, 0.02,  # 12 AM - 5 AM (low activity)
-            0.03, 0.05, 0.08, 0.10, 0.12, 0.15,  # 6 AM - 11 AM (increasing)
-            0.18, 0.20, 0.18, 0.15, 0.12, 0.10,  # 12 PM - 5 PM (peak hours)
-            0.08, 0.12, 0.15, 0.18, 0.15, 0.08   # 6 PM - 11 PM (evening peak)
-        ])
-        
-        time_minute = random.randint(0, 59)
-        user_age = random.randint(18, 80)
-        merchant_age = random.randint(30, 3650)  # Established merchants
-        state_code = random.randint(1, 36)
-        zip_code = random.randint(100, 999)
-        category = random.choices(range(1, 11), weights=[15, 20, 15, 10, 10, 8, 5, 5, 7, 5])[0]
-        upi_id_hash = random.randint(1000, 99999)
-        
-        data.append({
-            'transaction_id': i + 1,
-            'amount': amount,
-            'time_hour': time_hour,
-            'time_minute': time_minute,
-            'user_age': user_age,
-            'merchant_age': merchant_age,
-            'state_code': state_code,
-            'zip_code': zip_code,
-            'category': category,
-            'upi_id_hash': upi_id_hash,
-            'fraud': 0
-        })
-    
-    # Generate Fraudulent Transactions
-    print("Generating fraudulent transactions...")
-    for i in range(num_fraud):
-        # Fraud patterns: unusual amounts, times, locations
-        amount = np.random.choice([
-            np.random.lognormal(mean=7, sigma=1.5),  # High amount
-            np.random.lognormal(mean=3, sigma=0.5),  # Very low amount (test transaction)
-            random.choice([999, 1999, 4999, 9999])  # Round numbers (suspicious)
-        ])
-        amount = min(max(round(amount, 2), 1.0), 100000)
-        
-        # Fraud more common at odd hours
-        time_hour = np.random.choice(range(24), p=[
-            0.10, 0.08, 0.06, 0.05, 0.04, 0.03,  # Midnight hours (higher fraud)
-            0.02, 0.02, 0.02, 0.02, 0.02, 0.02,  # Morning (lower)
-            0.02, 0.02, 0.02, 0.02, 0.02, 0.02,  # Afternoon
-            0.03, 0.04, 0.05, 0.06, 0.08, 0.10   # Evening/night (higher fraud)
-        ])
-        
-        time_minute = random.randint(0, 59)
-        user_age = random.choice([
-            random.randint(18, 25),  # Younger users (higher risk)
-            random.randint(65, 80),  # Elderly users (targeted)
-            random.randint(18, 80)   # Random
-        ])
-        
-        merchant_age = random.choice([
-            random.randint(1, 30),   # New merchant (high risk)
-            random.randint(30, 365)  # Recently created
-        ])
-        
-        state_code = random.randint(1, 36)
-        zip_code = random.randint(100, 999)
-        
-        # Fraud more common in certain categories
-        category = random.choices(range(1, 11), weights=[5, 5, 20, 15, 10, 15, 5, 5, 15, 5])[0]
-        
-        upi_id_hash = random.randint(1000, 99999)
-        
-        data.append({
-            'transaction_id': num_legitimate + i + 1,
-            'amount': amount,
-            'time_hour': time_hour,
-            'time_minute': time_minute,
-            'user_age': user_age,
-            'merchant_age': merchant_age,
-            'state_code': state_code,
-            'zip_code': zip_code,
-            'category': category,
-            'upi_id_hash': upi_id_hash,
-            'fraud': 1
-        })
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    
-    # Shuffle the dataset
-    df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-    df['transaction_id'] = range(1, len(df) + 1)
-    
-    # Save to CSV
-    output_path = 'data/upi_transactions.csv'
-    df.to_csv(output_path, index=False)
-    
-    print(f"\nDataset generated successfully!")
-    print(f"Total transactions: {len(df)}")
-    print(f"Legitimate: {len(df[df['fraud'] == 0])} ({len(df[df['fraud'] == 0])/len(df)*100:.1f}%)")
-    print(f"Fraudulent: {len(df[df['fraud'] == 1])} ({len(df[df['fraud'] == 1])/len(df)*100:.1f}%)")
-    print(f"Saved to: {output_path}")
-    
-    # Display sample
-    print("\nSample of generated data:")
-    print(df.head(10))
-    
-    return df
-
-if __name__ == '__main__':
-    print("=" * 50)
-    print("UPI Transaction Dataset Generator")
-    print("=" * 50)
-    generate_dataset(num_transactions=50000, fraud_ratio=0.1)
-=======
 """
 Dataset Generator for UPI Transaction Fraud Detection
 Generates synthetic but realistic UPI transaction data
 """
 
-import pandas as pd
+import argparse
+import os
+import sys
+from functools import lru_cache
+
 import numpy as np
-import random
-from datetime import datetime
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from features import upi_id_hash  # noqa: E402
+
+# Static payment attributes, then the velocity features (velocity.VELOCITY_FEATURES)
+COLUMNS = [
+    'transaction_id', 'amount', 'time_hour', 'time_minute', 'user_age',
+    'merchant_age', 'state_code', 'zip_code', 'category', 'upi_id_hash',
+    'user_txn_1m', 'user_txn_1h', 'user_amount_1h', 'user_merchants_1h',
+    'merchant_txn_1h', 'merchant_amount_1d', 'merchant_users_1d',
+    'pair_txn_1d', 'pair_amount_1d', 'fraud'
+]
+
+# Narrowest dtypes covering the ranges in data/dataset_info.txt (binary formats)
+COLUMN_DTYPES = {
+    'transaction_id': np.int64,
+    'amount': np.float64,      # ₹1.00 - ₹1,00,000 to the paisa; float32 does not hold 2-decimal values exactly
+    'time_hour': np.int8,      # 0 - 23
+    'time_minute': np.int8,    # 0 - 59
+    'user_age': np.int8,       # 18 - 80
+    'merchant_age': np.int16,  # 1 - 3650
+    'state_code': np.int8,     # 1 - 36
+    'zip_code': np.int16,      # 100 - 999
+    'category': np.int8,       # 1 - 10
+    'upi_id_hash': np.int32,   # 1000 - 99999
+    'user_txn_1m': np.int16,
+    'user_txn_1h': np.int16,
+    'user_amount_1h': np.float32,  # Velocity sums: ~7 significant digits is enough for features
+    'user_merchants_1h': np.int16,
+    'merchant_txn_1h': np.int16,
+    'merchant_amount_1d': np.float32,
+    'merchant_users_1d': np.int16,
+    'pair_txn_1d': np.int16,
+    'pair_amount_1d': np.float32,
+    'fraud': np.int8
+}
+
+# Hour-of-day activity weights (normalized to probabilities below)
+LEGIT_HOUR_WEIGHTS = np.array([
+    0.02, 0.01, 0.01, 0.01, 0.01, 0.02,  # 12 AM - 5 AM (low activity)
+    0.03, 0.05, 0.08, 0.10, 0.12, 0.15,  # 6 AM - 11 AM (increasing)
+    0.18, 0.20, 0.18, 0.15, 0.12, 0.10,  # 12 PM - 5 PM (peak hours)
+    0.08, 0.12, 0.15, 0.18, 0.15, 0.08   # 6 PM - 11 PM (evening peak)
+])
+FRAUD_HOUR_WEIGHTS = np.array([
+    0.10, 0.08, 0.06, 0.05, 0.04, 0.03,  # Midnight hours (higher fraud)
+    0.02, 0.02, 0.02, 0.02, 0.02, 0.02,  # Morning (lower)
+    0.02, 0.02, 0.02, 0.02, 0.02, 0.02,  # Afternoon
+    0.03, 0.04, 0.05, 0.06, 0.08, 0.10   # Evening/night (higher fraud)
+])
+LEGIT_HOUR_P = LEGIT_HOUR_WEIGHTS / LEGIT_HOUR_WEIGHTS.sum()
+FRAUD_HOUR_P = FRAUD_HOUR_WEIGHTS / FRAUD_HOUR_WEIGHTS.sum()
+
+# Category weights (1-10)
+LEGIT_CATEGORY_WEIGHTS = np.array([15, 20, 15, 10, 10, 8, 5, 5, 7, 5])
+FRAUD_CATEGORY_WEIGHTS = np.array([5, 5, 20, 15, 10, 15, 5, 5, 15, 5])
+
+# Suspicious round-number amounts used by fraudsters
+ROUND_AMOUNTS = np.array([999, 1999, 4999, 9999])
+
+# Synthetic merchants payments are drawn from (upi_id_hash via features.upi_id_hash)
+MERCHANT_POOL_SIZE = 20000
+
+
+def _clamp_amount(amount):
+    """Round to paise and clamp between ₹1 and ₹1,00,000"""
+    return np.clip(np.round(amount, 2), 1.0, 100000)
+
+
+def _uniform_int(rng, low, high, size):
+    """Integers in [low, high] inclusive (like random.randint)"""
+    return rng.integers(low, high + 1, size=size)
+
+
+@lru_cache(maxsize=1)
+def _merchant_upi_hashes():
+    """upi_id_hash of the synthetic merchant pool, hashed as the server does"""
+    return np.array([upi_id_hash(f'merchant{i}@upiguard') for i in range(MERCHANT_POOL_SIZE)], dtype=np.int32)
+
+
+def _merchant_upi_hash(rng, n):
+    """upi_id_hash column for n payments to random merchants from the pool"""
+    hashes = _merchant_upi_hashes()
+    return hashes[rng.integers(0, len(hashes), size=n)]
 
-def generate_dataset(num_transactions=50000, fraud_ratio=0.1):
+
+def _velocity(rng, user_txn_1m, user_txn_1h, user_payment, merchant_txn_1h, merchant_users_1d,
+              merchant_payment, pair_txn_1d, distinct_ratio):
+    """Velocity feature columns from sampled counts and per-payment amounts"""
+    return {
+        'user_txn_1m': user_txn_1m,
+        'user_txn_1h': user_txn_1h,
+        'user_amount_1h': np.round(user_txn_1h * user_payment, 2),
+        'user_merchants_1h': rng.binomial(user_txn_1h, distinct_ratio),
+        'merchant_txn_1h': merchant_txn_1h,
+        'merchant_amount_1d': np.round(merchant_users_1d * merchant_payment, 2),
+        'merchant_users_1d': merchant_users_1d,
+        'pair_txn_1d': pair_txn_1d,
+        'pair_amount_1d': np.round(pair_txn_1d * user_payment, 2)
+    }
+
+
+def _merchant_traffic(rng, n, scale):
+    """Hourly payment rate per merchant: most are quiet, a few are busy"""
+    return rng.gamma(shape=0.5, scale=scale, size=n)
+
+
+def sample_legitimate_velocity(rng, n):
+    """Occasional payments; merchant traffic from quiet shops to busy ones"""
+    user_txn_1m = rng.poisson(0.05, size=n)
+    merchant_rate = _merchant_traffic(rng, n, scale=8)
+    return _velocity(
+        rng,
+        user_txn_1m=user_txn_1m,
+        user_txn_1h=user_txn_1m + rng.poisson(0.6, size=n),
+        user_payment=rng.lognormal(mean=5.5, sigma=0.8, size=n),
+        merchant_txn_1h=rng.poisson(merchant_rate),
+        merchant_users_1d=rng.poisson(merchant_rate * 10),
+        merchant_payment=rng.lognormal(mean=5.5, sigma=0.5, size=n),
+        pair_txn_1d=rng.poisson(0.4, size=n),
+        distinct_ratio=0.7
+    )
+
+
+def sample_fraud_velocity(rng, n):
+    """Half the fraud comes in bursts fanned out to many merchants (account takeover)"""
+    burst = rng.integers(0, 2, size=n) == 1
+    user_txn_1m = np.where(burst, rng.poisson(2, size=n), rng.poisson(0.05, size=n))
+    user_txn_1h = user_txn_1m + np.where(burst, rng.poisson(5, size=n), rng.poisson(0.6, size=n))
+    merchant_rate = _merchant_traffic(rng, n, scale=12)
+    return _velocity(
+        rng,
+        user_txn_1m=user_txn_1m,
+        user_txn_1h=user_txn_1h,
+        user_payment=rng.lognormal(mean=6.5, sigma=1.2, size=n),
+        merchant_txn_1h=rng.poisson(merchant_rate),
+        merchant_users_1d=rng.poisson(merchant_rate * 6),
+        merchant_payment=rng.lognormal(mean=6.5, sigma=1.0, size=n),
+        pair_txn_1d=rng.poisson(0.8, size=n),
+        distinct_ratio=0.8
+    )
+
+
+def sample_legitimate(rng, n):
+    """Vectorized legitimate transaction features (dict of arrays)"""
+    return {
+        'amount': _clamp_amount(rng.lognormal(mean=5.5, sigma=1.2, size=n)),  # Right-skewed
+        'time_hour': rng.choice(24, size=n, p=LEGIT_HOUR_P),
+        'time_minute': _uniform_int(rng, 0, 59, n),
+        'user_age': _uniform_int(rng, 18, 80, n),
+        'merchant_age': _uniform_int(rng, 30, 3650, n),  # Established merchants
+        'state_code': _uniform_int(rng, 1, 36, n),
+        'zip_code': _uniform_int(rng, 100, 999, n),
+        'category': rng.choice(np.arange(1, 11), size=n, p=LEGIT_CATEGORY_WEIGHTS / LEGIT_CATEGORY_WEIGHTS.sum()),
+        'upi_id_hash': _merchant_upi_hash(rng, n),
+        'fraud': np.zeros(n, dtype=np.int64)
+    } | sample_legitimate_velocity(rng, n)
+
+
+def sample_fraud(rng, n):
+    """Vectorized fraudulent transaction features (dict of arrays)"""
+    # Fraud amounts: equal mix of high amounts, tiny test amounts and round numbers
+    amount_kind = rng.integers(0, 3, size=n)
+    amount = np.select(
+        [amount_kind == 0, amount_kind == 1],
+        [rng.lognormal(mean=7, sigma=1.5, size=n),  # High amount
+         rng.lognormal(mean=3, sigma=0.5, size=n)],  # Very low amount (test transaction)
+        default=rng.choice(ROUND_AMOUNTS, size=n)  # Round numbers (suspicious)
+    )
+
+    # Younger users, elderly (targeted) users, or anyone
+    age_kind = rng.integers(0, 3, size=n)
+    user_age = np.select(
+        [age_kind == 0, age_kind == 1],
+        [_uniform_int(rng, 18, 25, n), _uniform_int(rng, 65, 80, n)],
+        default=_uniform_int(rng, 18, 80, n)
+    )
+
+    # New (high risk) or recently created merchants
+    merchant_age = np.where(
+        rng.integers(0, 2, size=n) == 0,
+        _uniform_int(rng, 1, 30, n),
+        _uniform_int(rng, 30, 365, n)
+    )
+
+    return {
+        'amount': _clamp_amount(amount),
+        'time_hour': rng.choice(24, size=n, p=FRAUD_HOUR_P),  # Odd hours
+        'time_minute': _uniform_int(rng, 0, 59, n),
+        'user_age': user_age,
+        'merchant_age': merchant_age,
+        'state_code': _uniform_int(rng, 1, 36, n),
+        'zip_code': _uniform_int(rng, 100, 999, n),
+        'category': rng.choice(np.arange(1, 11), size=n, p=FRAUD_CATEGORY_WEIGHTS / FRAUD_CATEGORY_WEIGHTS.sum()),
+        'upi_id_hash': _merchant_upi_hash(rng, n),
+        'fraud': np.ones(n, dtype=np.int64)
+    } | sample_fraud_velocity(rng, n)
+
+
+def generate_chunk(rng, first_id, num_legitimate, num_fraud):
+    """
+    Generate one shuffled block of transactions
+
+    Args:
+        rng: numpy Generator used for every draw in this block
+        first_id: transaction_id of the first row
+        num_legitimate: Legitimate rows in the block
+        num_fraud: Fraudulent rows in the block
+    """
+    legit = sample_legitimate(rng, num_legitimate)
+    fraud = sample_fraud(rng, num_fraud)
+    order = rng.permutation(num_legitimate + num_fraud)
+
+    columns = {'transaction_id': np.arange(first_id, first_id + len(order))}
+    for name in COLUMNS[1:]:
+        columns[name] = np.concatenate([legit[name], fraud[name]])[order]
+
+    return pd.DataFrame(columns, columns=COLUMNS)
+
+
+def iter_chunks(num_transactions, fraud_ratio=0.1, seed=42, chunk_size=1_000_000):
+    """
+    Yield DataFrame chunks of at most chunk_size rows
+
+    Each chunk draws from its own generator seeded by (seed, chunk index),
+    so output is identical for a given seed and chunk size no matter how it
+    is consumed. Fraud rows are spread so that every prefix of chunks holds
+    the target ratio and the total is exactly int(num_transactions * fraud_ratio).
+    """
+    total_fraud = int(num_transactions * fraud_ratio)
+
+    for index, start in enumerate(range(0, num_transactions, chunk_size)):
+        end = min(start + chunk_size, num_transactions)
+        num_fraud = end * total_fraud // num_transactions - start * total_fraud // num_transactions
+        rng = np.random.default_rng([seed, index])
+        yield generate_chunk(rng, start + 1, end - start - num_fraud, num_fraud)
+
+
+def write_chunks(chunks, output_path, fmt='csv', num_rows=None):
+    """
+    Stream chunks to CSV, Parquet or per-column .npy files with memory
+    bounded by one chunk
+
+    Parquet and npy store each column with its COLUMN_DTYPES type. The npy
+    format writes a directory holding one <column>.npy per column, which
+    load_columns memory-maps; its row count must be known up front.
+
+    Returns:
+        tuple: (rows written, fraud rows written)
+    """
+    rows = frauds = 0
+    writer = None
+    columns = None
+
+    if fmt == 'npy':
+        if num_rows is None:
+            raise ValueError("num_rows is required for the npy format")
+        os.makedirs(output_path, exist_ok=True)
+        columns = {
+            name: np.lib.format.open_memmap(os.path.join(output_path, f'{name}.npy'), mode='w+',
+                                            dtype=dtype, shape=(num_rows,))
+            for name, dtype in COLUMN_DTYPES.items()
+        }
+    elif os.path.exists(output_path):
+        os.remove(output_path)
+
+    try:
+        for chunk in chunks:
+            if fmt == 'npy':
+                for name, column in columns.items():
+                    column[rows:rows + len(chunk)] = chunk[name].to_numpy()
+            elif fmt == 'parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq  # Optional dependency for Parquet output
+
+                table = pa.Table.from_pandas(chunk.astype(COLUMN_DTYPES), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(output_path, mode='a', header=rows == 0, index=False)
+            rows += len(chunk)
+            frauds += int(chunk['fraud'].sum())
+    finally:
+        if writer is not None:
+            writer.close()
+        for column in (columns or {}).values():
+            column.flush()
+
+    if columns is not None and rows != num_rows:
+        raise ValueError(f"Expected {num_rows} rows, got {rows}")
+    return rows, frauds
+
+
+def load_columns(path, mmap_mode='r'):
+    """
+    Open a per-column .npy dataset written by write_chunks(fmt='npy')
+
+    Returns:
+        dict: column name -> array (memory-mapped, zero-copy, by default)
+    """
+    return {
+        name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+        for name in COLUMNS
+    }
+
+
+def generate_dataset(num_transactions=50000, fraud_ratio=0.1, seed=42,
+                     output_path='data/upi_transactions.csv'):
     """
     Generate synthetic UPI transaction dataset
-    
+
     Args:
         num_transactions: Total number of transactions to generate
         fraud_ratio: Ratio of fraudulent transactions (default 10%)
+        seed: Random seed (output is deterministic per seed)
+        output_path: CSV file to write
     """
-    
-    np.random.seed(42)  # For reproducibility
-    random.seed(42)
-    
-    # Calculate number of fraud cases
-    num_fraud = int(num_transactions * fraud_ratio)
-    num_legitimate = num_transactions - num_fraud
-    
-    data = []
-    
-    # Generate Legitimate Transactions
-    print("Generating legitimate transactions...")
-    for i in range(num_legitimate):
-        # Legitimate transaction patterns
-        amount = np.random.lognormal(mean=5.5, sigma=1.2)  # Right-skewed (most transactions are small)
-        amount = min(max(round(amount, 2), 1.0), 100000)  # Clamp between ₹1 and ₹1,00,000
-        
-        time_hour = np.random.choice(range(24), p=[
-            0.02, 0.01, 0.01, 0.01, 0.01, 0.02,  # 12 AM - 5 AM (low activity)
-            0.03, 0.05, 0.08, 0.10, 0.12, 0.15,  # 6 AM - 11 AM (increasing)
-            0.18, 0.20, 0.18, 0.15, 0.12, 0.10,  # 12 PM - 5 PM (peak hours)
-            0.08, 0.12, 0.15, 0.18, 0.15, 0.08   # 6 PM - 11 PM (evening peak)
-        ])
-        
-        time_minute = random.randint(0, 59)
-        user_age = random.randint(18, 80)
-        merchant_age = random.randint(30, 3650)  # Established merchants
-        state_code = random.randint(1, 36)
-        zip_code = random.randint(100, 999)
-        category = random.choices(range(1, 11), weights=[15, 20, 15, 10, 10, 8, 5, 5, 7, 5])[0]
-        upi_id_hash = random.randint(1000, 99999)
-        
-        data.append({
-            'transaction_id': i + 1,
-            'amount': amount,
-            'time_hour': time_hour,
-            'time_minute': time_minute,
-            'user_age': user_age,
-            'merchant_age': merchant_age,
-            'state_code': state_code,
-            'zip_code': zip_code,
-            'category': category,
-            'upi_id_hash': upi_id_hash,
-            'fraud': 0
-        })
-    
-    # Generate Fraudulent Transactions
-    print("Generating fraudulent transactions...")
-    for i in range(num_fraud):
-        # Fraud patterns: unusual amounts, times, locations
-        amount = np.random.choice([
-            np.random.lognormal(mean=7, sigma=1.5),  # High amount
-            np.random.lognormal(mean=3, sigma=0.5),  # Very low amount (test transaction)
-            random.choice([999, 1999, 4999, 9999])  # Round numbers (suspicious)
-        ])
-        amount = min(max(round(amount, 2), 1.0), 100000)
-        
-        # Fraud more common at odd hours
-        time_hour = np.random.choice(range(24), p=[
-            0.10, 0.08, 0.06, 0.05, 0.04, 0.03,  # Midnight hours (higher fraud)
-            0.02, 0.02, 0.02, 0.02, 0.02, 0.02,  # Morning (lower)
-            0.02, 0.02, 0.02, 0.02, 0.02, 0.02,  # Afternoon
-            0.03, 0.04, 0.05, 0.06, 0.08, 0.10   # Evening/night (higher fraud)
-        ])
-        
-        time_minute = random.randint(0, 59)
-        user_age = random.choice([
-            random.randint(18, 25),  # Younger users (higher risk)
-            random.randint(65, 80),  # Elderly users (targeted)
-            random.randint(18, 80)   # Random
-        ])
-        
-        merchant_age = random.choice([
-            random.randint(1, 30),   # New merchant (high risk)
-            random.randint(30, 365)  # Recently created
-        ])
-        
-        state_code = random.randint(1, 36)
-        zip_code = random.randint(100, 999)
-        
-        # Fraud more common in certain categories
-        category = random.choices(range(1, 11), weights=[5, 5, 20, 15, 10, 15, 5, 5, 15, 5])[0]
-        
-        upi_id_hash = random.randint(1000, 99999)
-        
-        data.append({
-            'transaction_id': num_legitimate + i + 1,
-            'amount': amount,
-            'time_hour': time_hour,
-            'time_minute': time_minute,
-            'user_age': user_age,
-            'merchant_age': merchant_age,
-            'state_code': state_code,
-            'zip_code': zip_code,
-            'category': category,
-            'upi_id_hash': upi_id_hash,
-            'fraud': 1
-        })
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    
-    # Shuffle the dataset
-    df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-    df['transaction_id'] = range(1, len(df) + 1)
-    
+    print("Generating legitimate and fraudulent transactions...")
+    df = next(iter_chunks(num_transactions, fraud_ratio, seed, chunk_size=num_transactions))
+
     # Save to CSV
-    output_path = 'data/upi_transactions.csv'
     df.to_csv(output_path, index=False)
-    
+
     print(f"\nDataset generated successfully!")
     print(f"Total transactions: {len(df)}")
     print(f"Legitimate: {len(df[df['fraud'] == 0])} ({len(df[df['fraud'] == 0])/len(df)*100:.1f}%)")
     print(f"Fraudulent: {len(df[df['fraud'] == 1])} ({len(df[df['fraud'] == 1])/len(df)*100:.1f}%)")
     print(f"Saved to: {output_path}")
-    
+
     # Display sample
     print("\nSample of generated data:")
     print(df.head(10))
-    
+
     return df
 
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='UPI Transaction Dataset Generator')
+    parser.add_argument('--rows', type=int, default=50000, help='Total transactions')
+    parser.add_argument('--fraud-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='Stream in chunks of this many rows (bounded memory)')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'npy'], default='csv',
+                        help='npy writes a directory of typed per-column .npy files')
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
     print("=" * 50)
     print("UPI Transaction Dataset Generator")
     print("=" * 50)
-    generate_dataset(num_transactions=50000, fraud_ratio=0.1)
->>>>>>> a692c63 (initial commit)
+
+    if args.chunk_size is None and args.format == 'csv':
+        generate_dataset(args.rows, args.fraud_ratio, args.seed,
+                         output_path=args.output or 'data/upi_transactions.csv')
+    else:
+        output_path = args.output or (
+            'data/upi_transactions_columns' if args.format == 'npy' else f'data/upi_transactions.{args.format}'
+        )
+        chunk_size = args.chunk_size or 1_000_000
+        print(f"Streaming {args.rows:,} rows in chunks of {chunk_size:,} to {output_path}...")
+        rows, frauds = write_chunks(
+            iter_chunks(args.rows, args.fraud_ratio, args.seed, chunk_size), output_path, args.format, args.rows
+        )
+        print(f"\nDataset generated successfully!")
+        print(f"Total transactions: {rows:,}")
+        print(f"Fraudulent: {frauds:,} ({frauds / rows * 100:.1f}%)")
+        print(f"Saved to: {output_path}")
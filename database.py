@@ -5,11 +5,13 @@ Creates SQLite database with all required tables for UPI Guard
 
 import sqlite3
 import os
-from datetime import datetime
+import sys
+import queue
+import threading
 import hashlib
 
 # Database file path
-DB_PATH = 'upi_guard.db'
+DB_PATH = os.environ.get('DATABASE_PATH', 'upi_guard.db')
 
 def get_db_connection():
     """Get database connection"""
@@ -17,6 +19,72 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row  # Access columns by name
     return conn
 
+def open_tuned_connection(path, busy_timeout_ms=5000, cache_size_kb=16384, mmap_size=268435456):
+    """
+    Open a connection tuned for the concurrent web workload
+    
+    WAL lets readers proceed while a payment commits, synchronous=NORMAL
+    only fsyncs at checkpoints in WAL mode, and the page cache / mmap keep
+    hot B-tree pages in memory.
+    """
+    conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA cache_size = -{int(cache_size_kb)}')
+    conn.execute(f'PRAGMA mmap_size = {int(mmap_size)}')
+    conn.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    return conn
+
+class ConnectionPool:
+    """
+    Pool of reusable, tuned SQLite connections
+    
+    Connections are opened lazily (at most one per concurrently active
+    worker thread) and handed back on release instead of being closed, so
+    requests no longer pay connect/PRAGMA setup on every call.
+    """
+    
+    def __init__(self, path, max_size=16, **tuning):
+        self.path = path
+        self.max_size = max_size
+        self.tuning = tuning
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.opened = 0
+    
+    def acquire(self):
+        """Take an idle connection or open a new one"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.opened += 1
+            return open_tuned_connection(self.path, **self.tuning)
+    
+    def release(self, conn):
+        """Return a connection to the pool, discarding uncommitted work"""
+        if conn.in_transaction:
+            conn.rollback()
+        if self._idle.qsize() < self.max_size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+            with self._lock:
+                self.opened -= 1
+    
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self.opened -= 1
+
 def create_tables():
     """Create all required database tables"""
     conn = get_db_connection()
@@ -126,9 +194,235 @@ def create_tables():
     print("✓ Admins table created")
     
     conn.commit()
+    
+    # Bring indexes and later schema changes up to date
+    applied = migrate(conn)
+    for version, description in applied:
+        print(f"✓ Migration {version} applied: {description}")
+    
     conn.close()
     print("\nAll tables created successfully!")
     
+# ==================== Schema Migrations ====================
+# Each migration is (version, description, statements). Versions are applied
+# in order exactly once and recorded in schema_version; statements must be
+# safe to re-run so a partially applied upgrade can simply be retried.
+# A statement is SQL text or a callable taking the connection, for steps
+# SQL alone can't express idempotently.
+
+def add_merchant_upi_id_hash(conn):
+    """Add merchants.upi_id_hash (ALTER TABLE has no IF NOT EXISTS)"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(merchants)')]
+    if 'upi_id_hash' not in columns:
+        conn.execute('ALTER TABLE merchants ADD COLUMN upi_id_hash INTEGER')
+
+def backfill_merchant_upi_id_hash(conn):
+    """Precompute the stable upi_id_hash feature for existing merchants"""
+    from features import upi_id_hash
+    rows = conn.execute('SELECT id, upi_id FROM merchants WHERE upi_id IS NOT NULL AND upi_id_hash IS NULL').fetchall()
+    conn.executemany('UPDATE merchants SET upi_id_hash = ? WHERE id = ?',
+                     [(upi_id_hash(upi_id), merchant_id) for merchant_id, upi_id in rows])
+
+MIGRATIONS = [
+    (1, 'Indexes for dashboard, payment and OTP hot paths', [
+        # User dashboard: WHERE user_id = ? ORDER BY created_at DESC
+        '''CREATE INDEX IF NOT EXISTS idx_transactions_user_created
+           ON transactions (user_id, created_at)''',
+        # Merchant dashboard: WHERE merchant_id = ? AND status = ? ORDER BY created_at DESC
+        '''CREATE INDEX IF NOT EXISTS idx_transactions_merchant_status_created
+           ON transactions (merchant_id, status, created_at)''',
+        # Admin fraud counts and filters
+        '''CREATE INDEX IF NOT EXISTS idx_transactions_is_fraud
+           ON transactions (is_fraud, created_at)''',
+        # Admin recent transactions
+        '''CREATE INDEX IF NOT EXISTS idx_transactions_created
+           ON transactions (created_at)''',
+        # OTP verification: equality on mobile/otp/verified, newest first,
+        # expiry checked from the index entry
+        '''CREATE INDEX IF NOT EXISTS idx_otp_lookup
+           ON otp_storage (mobile, otp, verified, created_at, expires_at)''',
+        '''CREATE INDEX IF NOT EXISTS idx_fraud_logs_created
+           ON fraud_logs (created_at)''',
+        '''CREATE INDEX IF NOT EXISTS idx_users_created
+           ON users (created_at)''',
+        '''CREATE INDEX IF NOT EXISTS idx_merchants_created
+           ON merchants (created_at)''',
+    ]),
+    (2, 'Trigger-maintained admin statistics counters', [
+        '''CREATE TABLE IF NOT EXISTS stats_counters (
+               name TEXT PRIMARY KEY,
+               value INTEGER NOT NULL DEFAULT 0
+           )''',
+        '''INSERT OR REPLACE INTO stats_counters (name, value)
+           SELECT 'total_users', COUNT(*) FROM users''',
+        '''INSERT OR REPLACE INTO stats_counters (name, value)
+           SELECT 'total_merchants', COUNT(*) FROM merchants''',
+        '''INSERT OR REPLACE INTO stats_counters (name, value)
+           SELECT 'total_transactions', COUNT(*) FROM transactions''',
+        '''INSERT OR REPLACE INTO stats_counters (name, value)
+           SELECT 'fraud_count', COUNT(*) FROM transactions WHERE is_fraud = 1''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_users_count_insert AFTER INSERT ON users
+           BEGIN UPDATE stats_counters SET value = value + 1 WHERE name = 'total_users'; END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_users_count_delete AFTER DELETE ON users
+           BEGIN UPDATE stats_counters SET value = value - 1 WHERE name = 'total_users'; END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_merchants_count_insert AFTER INSERT ON merchants
+           BEGIN UPDATE stats_counters SET value = value + 1 WHERE name = 'total_merchants'; END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_merchants_count_delete AFTER DELETE ON merchants
+           BEGIN UPDATE stats_counters SET value = value - 1 WHERE name = 'total_merchants'; END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_transactions_count_insert AFTER INSERT ON transactions
+           BEGIN
+               UPDATE stats_counters SET value = value + 1 WHERE name = 'total_transactions';
+               UPDATE stats_counters SET value = value + 1 WHERE name = 'fraud_count' AND NEW.is_fraud = 1;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_transactions_count_delete AFTER DELETE ON transactions
+           BEGIN
+               UPDATE stats_counters SET value = value - 1 WHERE name = 'total_transactions';
+               UPDATE stats_counters SET value = value - 1 WHERE name = 'fraud_count' AND OLD.is_fraud = 1;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_transactions_fraud_update
+           AFTER UPDATE OF is_fraud ON transactions
+           WHEN (OLD.is_fraud = 1) != (NEW.is_fraud = 1)
+           BEGIN
+               UPDATE stats_counters
+               SET value = value + CASE WHEN NEW.is_fraud = 1 THEN 1 ELSE -1 END
+               WHERE name = 'fraud_count';
+           END''',
+    ]),
+    (3, 'Shadow scores from offline re-scoring', [
+        # One probability per (model, transaction); re-running a model replaces its rows.
+        # Only rescoring.py writes here; live challengers have live_shadow_scores (6)
+        '''CREATE TABLE IF NOT EXISTS shadow_scores (
+               model_name TEXT NOT NULL,
+               transaction_id TEXT NOT NULL,
+               fraud_probability REAL NOT NULL,
+               is_fraud BOOLEAN NOT NULL,
+               scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               PRIMARY KEY (model_name, transaction_id)
+           )''',
+        # Resume point of a re-scoring run: last transactions.id written
+        '''CREATE TABLE IF NOT EXISTS rescore_checkpoints (
+               model_name TEXT PRIMARY KEY,
+               last_id INTEGER NOT NULL DEFAULT 0,
+               rows_scored INTEGER NOT NULL DEFAULT 0,
+               updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+           )''',
+    ]),
+    (4, 'Stable upi_id_hash precomputed per merchant', [
+        add_merchant_upi_id_hash,
+        backfill_merchant_upi_id_hash,
+    ]),
+    (5, 'Expiry index for purging OTPs', [
+        # otp.purge_expired: WHERE expires_at <= ? LIMIT batch
+        '''CREATE INDEX IF NOT EXISTS idx_otp_expires
+           ON otp_storage (expires_at)''',
+    ]),
+    (6, 'Live challenger scores from shadow scoring', [
+        # Kept apart from shadow_scores so offline re-scoring runs (rescoring.py
+        # --name/--restart) never replace or delete the live challengers' rows
+        '''CREATE TABLE IF NOT EXISTS live_shadow_scores (
+               model_name TEXT NOT NULL,
+               transaction_id TEXT NOT NULL,
+               fraud_probability REAL NOT NULL,
+               is_fraud BOOLEAN NOT NULL,
+               scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               PRIMARY KEY (model_name, transaction_id)
+           )''',
+    ]),
+]
+
+# Counter name -> query that recomputes it from scratch
+STATS_COUNTER_QUERIES = {
+    'total_users': 'SELECT COUNT(*) FROM users',
+    'total_merchants': 'SELECT COUNT(*) FROM merchants',
+    'total_transactions': 'SELECT COUNT(*) FROM transactions',
+    'fraud_count': 'SELECT COUNT(*) FROM transactions WHERE is_fraud = 1'
+}
+
+def get_schema_version(conn):
+    """Return the highest applied migration version (0 if none)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+def migrate(conn, migrations=None):
+    """
+    Apply pending schema migrations (idempotent)
+    
+    Returns:
+        list: (version, description) for each migration applied now
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    current = get_schema_version(conn)
+    conn.commit()
+    applied = []
+    
+    for version, description, statements in migrations:
+        if version <= current:
+            continue
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # Another worker may have upgraded while we waited for the lock
+            if conn.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,)).fetchone():
+                conn.rollback()
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute(
+                'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                (version, description)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append((version, description))
+    
+    return applied
+
+def get_stats(conn):
+    """Read the admin dashboard counters (O(1), no table scans)"""
+    stats = {name: 0 for name in STATS_COUNTER_QUERIES}
+    for row in conn.execute('SELECT name, value FROM stats_counters'):
+        stats[row[0]] = row[1]
+    return stats
+
+def reconcile_stats(conn):
+    """
+    Rebuild every stats counter from full COUNT(*) scans
+    
+    Runs in one write transaction so concurrent inserts cannot slip in
+    between a count and its counter update.
+    
+    Returns:
+        dict: counter name -> (previous value, reconciled value)
+    """
+    changes = {}
+    conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        previous = get_stats(conn)
+        for name, query in STATS_COUNTER_QUERIES.items():
+            value = conn.execute(query).fetchone()[0]
+            conn.execute(
+                'INSERT OR REPLACE INTO stats_counters (name, value) VALUES (?, ?)',
+                (name, value)
+            )
+            changes[name] = (previous[name], value)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return changes
+
 def create_default_admin():
     """Create default admin user"""
     conn = get_db_connection()
@@ -151,12 +445,17 @@ def create_default_admin():
     
     conn.close()
     
-def generate_transaction_id():
-    """Generate unique transaction ID"""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
-    return f"TXN{timestamp}"
-
 if __name__ == '__main__':
+    if '--reconcile-stats' in sys.argv[1:]:
+        # Rebuild the admin dashboard counters from scratch
+        conn = get_db_connection()
+        migrate(conn)
+        for name, (before, after) in reconcile_stats(conn).items():
+            marker = '✓' if before == after else '✗ drift fixed'
+            print(f"{name:<20} {before:>10} -> {after:<10} {marker}")
+        conn.close()
+        sys.exit(0)
+    
     print("=" * 60)
     print("UPI Guard - Database Initialization")
     print("=" * 60)
@@ -181,4 +480,3 @@ if __name__ == '__main__':
     print("=" * 60)
     print(f"\nDatabase file: {DB_PATH}")
     print("\nYou can now run the Flask application: python app.py")
->>>>>>> a692c63 (initial commit)
@@ -0,0 +1,71 @@
+"""
+Fraud Feature Construction
+Builds the model's feature vector for a payment, shared by the live payment
+path (app.py, asgi.py) and offline re-scoring (rescoring.py)
+
+Columns are the static payment attributes followed by the velocity features
+(velocity.py). Models trained before the velocity columns existed take the
+first len(STATIC_FEATURES) columns, so scoring passes each model the leading
+columns it was trained on.
+"""
+
+import hashlib
+
+from velocity import VELOCITY_FEATURES
+
+# Training column order (see data/generate_dataset.py)
+STATIC_FEATURES = [
+    'amount', 'time_hour', 'time_minute', 'user_age', 'merchant_age',
+    'state_code', 'zip_code', 'category', 'upi_id_hash'
+]
+FEATURE_COLUMNS = STATIC_FEATURES + VELOCITY_FEATURES
+
+# Fixed key: the dataset generator and every serving process must agree
+UPI_HASH_KEY = b'upi-guard/upi_id_hash/v1'
+UPI_HASH_MIN = 1000
+UPI_HASH_MAX = 99999
+
+
+def upi_id_hash(upi_id):
+    """
+    Stable upi_id_hash feature for a UPI ID
+
+    Keyed BLAKE2b folded into the training range (1000 - 99999). Unlike
+    hash(), which is salted per process, the value is the same in every
+    worker, restart and at training time.
+    """
+    digest = hashlib.blake2b(upi_id.encode('utf-8'), digest_size=8, key=UPI_HASH_KEY).digest()
+    return UPI_HASH_MIN + int.from_bytes(digest, 'little') % (UPI_HASH_MAX - UPI_HASH_MIN + 1)
+
+
+def payment_transaction_data(user, merchant, amount, category, now, velocity):
+    """
+    Fraud detection inputs for a payment made at `now`
+
+    Args:
+        user: Profile with age, state_code and zip_code
+        merchant: Profile with merchant_age and upi_id_hash
+        amount: Payment amount
+        category: Category code (config.CATEGORIES)
+        now: Payment time (anything with .hour and .minute)
+        velocity: VELOCITY_FEATURES values for this payment
+            (VelocityFeatureStore.observe)
+    """
+    transaction_data = {
+        'amount': amount,
+        'time_hour': now.hour,
+        'time_minute': now.minute,
+        'user_age': user.age,
+        'merchant_age': merchant.merchant_age,
+        'state_code': user.state_code,
+        'zip_code': user.zip_code,
+        'category': category,
+        'upi_id_hash': merchant.upi_id_hash
+    }
+    transaction_data.update((name, velocity[name]) for name in VELOCITY_FEATURES)
+    return transaction_data
+
+
+def fraud_features(transaction_data):
+    """Feature vector in training column order"""
+    return [transaction_data[name] for name in FEATURE_COLUMNS]
@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration for UPI Guard
+
+The app (and with MODEL_LOADING=eager, the fraud model) is imported once in
+the master with preload_app; workers are forked from it and share the model
+pages copy-on-write instead of each loading their own copy. The master
+never starts background threads; each worker starts its own in post_fork.
+
+Workers are threaded (gthread) so concurrent payments in one worker can
+share a BatchingScorer batch; a sync worker only ever has one in flight.
+"""
+
+import gc
+import os
+
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))  # Concurrent requests per worker
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() in ('1', 'true', 'yes')
+
+
+def pre_fork(server, worker):
+    """Move loaded objects out of GC tracking so collections in workers don't dirty shared pages"""
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    Background threads are not inherited across fork(); start and warm this worker's own
+
+    (The worker's transaction ID worker id is already leased by the
+    register_at_fork hook in app.py.)
+    """
+    import app
+    app.ensure_worker_threads()
+    if server.cfg.preload_app:
+        app.warm_up_models()
+
+
+def worker_exit(server, worker):
+    """Score and persist payments still queued for the shadow models"""
+    import app
+    if app.shadow_scorer is not None:
+        app.shadow_scorer.stop()
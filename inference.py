@@ -0,0 +1,210 @@
+"""
+Micro-batching Inference Engine
+Coalesces concurrent fraud scoring requests into batched model calls
+"""
+
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+from metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingScore:
+    """A single caller waiting for its fraud probability"""
+
+    __slots__ = ('features', 'enqueued_at', 'done', 'result', 'error', 'callback')
+
+    def __init__(self, features, callback=None):
+        self.features = features
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.callback = callback
+
+
+class BatchingScorer:
+    """
+    Queue-backed scorer that flushes pending requests as one batch
+
+    A background worker collects feature vectors from concurrent callers and
+    runs `predict_batch` once per flush. A flush happens when `max_batch_size`
+    requests are waiting or when the oldest request has waited `max_wait_us`
+    microseconds, whichever comes first. The wait only applies under
+    concurrency (other requests queued, or the previous batch had more than
+    one): a lone caller is scored immediately.
+
+    Args:
+        predict_batch: Callable mapping an (n, num_features) float array
+            of raw features to n fraud probabilities
+        max_batch_size: Maximum number of requests per model call
+        max_wait_us: Maximum time the oldest request waits for a batch to fill
+    """
+
+    def __init__(self, predict_batch, max_batch_size=32, max_wait_us=2000):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0, max_wait_us) / 1_000_000
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+        # Tuning counters
+        self.latency = LatencyHistogram()
+        self.batch_sizes = [0] * (self.max_batch_size + 1)
+        self.batches = 0
+        self.requests = 0
+        self.full_flushes = 0
+        self.timeout_flushes = 0
+        self.errors = 0
+        self.callback_errors = 0
+        self._last_batch_size = 0
+
+    def start(self):
+        """Start the background worker (idempotent)"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='batching-scorer', daemon=True
+                )
+                self._worker.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the background worker after draining pending requests"""
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join(timeout)
+
+    def score(self, features, timeout=5.0):
+        """
+        Score one feature vector through the batching queue
+
+        Returns:
+            float: fraud probability for this caller's features
+        """
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            self.start()
+
+        pending = _PendingScore(features)
+        self._queue.put(pending)
+
+        if not pending.done.wait(timeout):
+            raise TimeoutError('Timed out waiting for batched inference')
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def submit(self, features, callback):
+        """
+        Enqueue one feature vector without blocking the caller
+
+        callback(result, error) is invoked on the worker thread once the
+        batch containing this request has been scored (asyncio callers hand
+        it to loop.call_soon_threadsafe).
+        """
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            self.start()
+        self._queue.put(_PendingScore(features, callback))
+
+    def pending(self):
+        """Requests waiting in the queue (not yet collected into a batch)"""
+        return self._queue.qsize()
+
+    def _collect(self, first):
+        """Gather a batch starting with `first` until full or the wait expires"""
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        # Waiting for company only pays off when requests are arriving concurrently
+        wait = self._last_batch_size > 1 or not self._queue.empty()
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter() if wait else 0
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Keep the stop sentinel for the outer loop
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        """Worker loop: collect, predict, and hand results back"""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        """Run one batched model call and resolve every waiting caller"""
+        size = len(batch)
+        try:
+            features = np.asarray([item.features for item in batch], dtype=np.float64)
+            probabilities = np.asarray(self.predict_batch(features)).reshape(-1)
+            if len(probabilities) != size:
+                raise ValueError(f"predict_batch returned {len(probabilities)} probabilities for {size} requests")
+            for item, probability in zip(batch, probabilities):
+                item.result = float(probability)
+        except Exception as e:
+            self.errors += 1
+            for item in batch:
+                item.error = e
+
+        finished_at = time.perf_counter()
+        for item in batch:
+            item.done.set()
+            if item.callback is not None:
+                # A failing callback must not kill the worker or skip the rest of the batch
+                try:
+                    item.callback(item.result, item.error)
+                except Exception:
+                    self.callback_errors += 1
+                    logger.exception('Batched scoring callback failed')
+            self.latency.record((finished_at - item.enqueued_at) * 1_000_000)
+
+        self._last_batch_size = size
+        self.batches += 1
+        self.requests += size
+        self.batch_sizes[size] += 1
+        if size >= self.max_batch_size:
+            self.full_flushes += 1
+        else:
+            self.timeout_flushes += 1
+
+    def stats(self):
+        """Latency and batch-occupancy counters for tuning"""
+        batches = self.batches
+        mean_batch = self.requests / batches if batches else 0.0
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_us': int(self.max_wait * 1_000_000),
+            'requests': self.requests,
+            'batches': batches,
+            'full_flushes': self.full_flushes,
+            'timeout_flushes': self.timeout_flushes,
+            'errors': self.errors,
+            'callback_errors': self.callback_errors,
+            'mean_batch_size': round(mean_batch, 2),
+            'batch_occupancy': round(mean_batch / self.max_batch_size, 3),
+            'batch_size_counts': {
+                str(size): count for size, count in enumerate(self.batch_sizes) if count
+            },
+            'latency': self.latency.snapshot()
+        }
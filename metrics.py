@@ -0,0 +1,252 @@
+"""
+Lightweight Metrics Primitives
+Thread-safe latency histograms used to tune the scoring hot path, per-stage
+request timers and Prometheus text exposition
+"""
+
+import itertools
+import math
+import threading
+import time
+from collections import deque
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram (microsecond resolution)
+
+    Every power-of-two range is split into SUB_BUCKETS equal slots, so
+    recorded values keep roughly 1/SUB_BUCKETS relative precision while the
+    memory footprint stays fixed no matter how many samples are recorded.
+    """
+
+    SUB_BUCKETS = 16
+
+    def __init__(self, max_value_us=60_000_000):
+        self.max_exponent = max(1, math.ceil(math.log2(max_value_us)))
+        self.counts = [0] * ((self.max_exponent + 1) * self.SUB_BUCKETS)
+        self.total = 0
+        self.sum_us = 0.0
+        self.max_us = 0.0
+        self._lock = threading.Lock()
+
+    def _index(self, value_us):
+        """Map a value to its bucket index"""
+        if value_us < 1:
+            return 0
+        exponent = min(int(value_us).bit_length() - 1, self.max_exponent)
+        base = 1 << exponent
+        sub = min(int((value_us - base) * self.SUB_BUCKETS / base), self.SUB_BUCKETS - 1)
+        return exponent * self.SUB_BUCKETS + sub
+
+    def _upper_bound(self, index):
+        """Upper edge (in microseconds) of a bucket"""
+        exponent, sub = divmod(index, self.SUB_BUCKETS)
+        base = 1 << exponent
+        return base + base * (sub + 1) / self.SUB_BUCKETS
+
+    def record(self, value_us):
+        """Record one observation in microseconds"""
+        index = self._index(value_us)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum_us += value_us
+            if value_us > self.max_us:
+                self.max_us = value_us
+
+    def percentile(self, pct):
+        """Return the approximate value (us) at the given percentile (0-100)"""
+        with self._lock:
+            if self.total == 0:
+                return 0.0
+            target = max(1, math.ceil(self.total * pct / 100.0))
+            running = 0
+            for index, count in enumerate(self.counts):
+                running += count
+                if running >= target:
+                    return min(self._upper_bound(index), self.max_us)
+        return self.max_us
+
+    def snapshot(self):
+        """Summary dictionary suitable for JSON responses"""
+        with self._lock:
+            total, sum_us, max_us = self.total, self.sum_us, self.max_us
+        return {
+            'count': total,
+            'mean_us': round(sum_us / total, 1) if total else 0.0,
+            'p50_us': round(self.percentile(50), 1),
+            'p99_us': round(self.percentile(99), 1),
+            'max_us': round(max_us, 1)
+        }
+
+    def cumulative_buckets(self):
+        """
+        (upper bound us, cumulative count) at every power of two
+
+        Power-of-two edges coincide with bucket edges, so the counts are
+        exact; this is the coarser view exported to Prometheus.
+
+        Returns:
+            tuple: (buckets, total, sum_us), all from one consistent snapshot
+        """
+        with self._lock:
+            counts = list(self.counts)
+            total, sum_us = self.total, self.sum_us
+        buckets = []
+        running = 0
+        for exponent in range(self.max_exponent + 1):
+            running += sum(counts[exponent * self.SUB_BUCKETS:(exponent + 1) * self.SUB_BUCKETS])
+            buckets.append((float(1 << (exponent + 1)), running))
+        return buckets, total, sum_us
+
+    def reset(self):
+        """Clear all recorded observations"""
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.total = 0
+            self.sum_us = 0.0
+            self.max_us = 0.0
+
+
+class Trace:
+    """Stage timings of one sampled request; see StageTimer.trace()"""
+
+    __slots__ = ('_timer', '_start', '_last', '_marks')
+
+    def __init__(self, timer):
+        self._timer = timer
+        self._start = self._last = time.perf_counter_ns()
+        self._marks = []
+
+    def mark(self, stage):
+        """End `stage`: it covers the time since the previous mark (or the start)"""
+        now = time.perf_counter_ns()
+        self._marks.append((stage, now - self._last))
+        self._last = now
+
+    def finish(self, outcome):
+        """Hand the stages and the total (up to now, not the last mark) to the timer, and count the outcome"""
+        self._timer._pending.append((self._marks, time.perf_counter_ns() - self._start))
+        self._timer.count(outcome)
+
+
+class _UnsampledTrace:
+    """Stand-in for requests that are not timed: only the outcome is counted"""
+
+    __slots__ = ('_timer',)
+
+    def __init__(self, timer):
+        self._timer = timer
+
+    def mark(self, stage):
+        pass
+
+    def finish(self, outcome):
+        self._timer.count(outcome)
+
+
+class StageTimer:
+    """
+    Per-stage latency histograms and outcome counters for one request path
+
+    A request calls trace() once, mark(stage) at the end of each stage and
+    finish(outcome) when it returns. Only one request in sample_every is
+    timed: a clock read and a list append per stage, and finish() queues
+    the timings. They go into the histograms when the metrics are read
+    (flush()), so the histogram locks stay off the request path. The other
+    requests only count their outcome.
+
+    Args:
+        stages: Stage names in display order (others are added on first use)
+        outcomes: Outcome names exported even before they occur
+        sample_every: Time 1 in N requests (1: all, 0: none)
+        max_pending: Timed requests queued between reads; older ones are
+            dropped beyond this
+    """
+
+    def __init__(self, stages=(), outcomes=(), sample_every=1, max_pending=100000):
+        self.sample_every = max(0, int(sample_every))
+        self.stages = {stage: LatencyHistogram() for stage in stages}
+        self.total = LatencyHistogram()
+        self.outcomes = dict.fromkeys(outcomes, 0)
+        self._pending = deque(maxlen=max_pending)
+        self._requests = itertools.count()
+        self._unsampled = _UnsampledTrace(self)
+        self._lock = threading.Lock()
+
+    def trace(self):
+        """Trace for a new request (timed or not, per the sampling rate)"""
+        if self.sample_every and next(self._requests) % self.sample_every == 0:
+            return Trace(self)
+        return self._unsampled
+
+    def count(self, outcome):
+        with self._lock:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def flush(self):
+        """Move queued request timings into the histograms"""
+        while True:
+            try:
+                marks, total_ns = self._pending.popleft()
+            except IndexError:
+                return
+            for stage, elapsed_ns in marks:
+                histogram = self.stages.get(stage)
+                if histogram is None:
+                    with self._lock:
+                        histogram = self.stages.setdefault(stage, LatencyHistogram())
+                histogram.record(elapsed_ns / 1000)
+            self.total.record(total_ns / 1000)
+
+    def snapshot(self):
+        """Summary dictionary suitable for JSON responses"""
+        self.flush()
+        return {
+            'sample_every': self.sample_every,
+            'outcomes': dict(self.outcomes),
+            'total': self.total.snapshot(),
+            'stages': {stage: histogram.snapshot() for stage, histogram in list(self.stages.items())}
+        }
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_histogram(name, help_text, histograms, label=None):
+    """
+    Prometheus text lines for LatencyHistograms, exported in seconds
+
+    Args:
+        name: Metric family name (e.g. upi_guard_payment_stage_seconds)
+        histograms: {label value: LatencyHistogram}, or one histogram
+            when label is None
+        label: Label name distinguishing the histograms
+    """
+    if label is None:
+        histograms = {None: histograms}
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for value, histogram in histograms.items():
+        labels = f'{label}="{value}",' if label is not None else ''
+        buckets, total, sum_us = histogram.cumulative_buckets()
+        for bound_us, count in buckets:
+            lines.append(f'{name}_bucket{{{labels}le="{bound_us / 1e6:g}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {total}')
+        suffix = f'{{{labels.rstrip(",")}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {sum_us / 1e6:.6f}')
+        lines.append(f'{name}_count{suffix} {total}')
+    return lines
+
+
+def prometheus_counter(name, help_text, values, label=None):
+    """Prometheus text lines for counters: {label value: count}, or one count"""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+    if label is None:
+        return lines + [f'{name} {_format_value(values)}']
+    return lines + [f'{name}{{{label}="{value}"}} {_format_value(count)}' for value, count in values.items()]
+
+
+def prometheus_gauge(name, help_text, value):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {_format_value(value)}']
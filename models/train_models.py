@@ -1,625 +1,588 @@
-<<<<<<< HEAD
-"""
-Machine Learning Model Training Script
-Trains Logistic Regression, Random Forest, SVM, and CNN models
-for UPI Fraud Detection
-"""
-
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Conv1D, MaxPooling1D, Flatten, Dropout, Reshape
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
-import joblib
-import os
-
-print("=" * 60)
-print("UPI Fraud Detection - Model Training")
-print("=" * 60)
-
-# Step 1: Load Dataset
-print("\n[Step 1] Loading dataset...")
-dataset_path = 'data/upi_transactions.csv'
-
-if not os.path.exists(dataset_path):
-    print(f"Error: Dataset not found at {dataset_path}")
-    print("Please run: python data/generate_dataset.py")
-    exit(1)
-
-df = pd.read_csv(dataset_path)
-print(f"Dataset loaded: {len(df)} transactions")
-print(f"Features: {df.columns.tolist()}")
-
-# Step 2: Data Preprocessing
-print("\n[Step 2] Preprocessing data...")
-
-# Separate features and target
-X = df.drop(['transaction_id', 'fraud'], axis=1)
-y = df['fraud']
-
-# Display class distribution
-print(f"\nClass Distribution:")
-print(f"Legitimate (0): {sum(y == 0)} ({sum(y == 0)/len(y)*100:.2f}%)")
-print(f"Fraudulent (1): {sum(y == 1)} ({sum(y == 1)/len(y)*100:.2f}%)")
-
-# Split data: 70% train, 15% validation, 15% test
-X_train, X_temp, y_train, y_temp = train_test_split(
-    X, y, test_size=0.3, random_state=42, stratify=y
-)
-X_val, X_test, y_val, y_test = train_test_split(
-    X_temp, y_temp, test_size=0.5, random_state=42, stratify=y_temp
-)
-
-print(f"\nData Split:")
-print(f"Training: {len(X_train)} samples")
-print(f"Validation: {len(X_val)} samples")
-print(f"Test: {len(X_test)} samples")
-
-# Feature Scaling (important for ML models)
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_val_scaled = scaler.transform(X_val)
-X_test_scaled = scaler.transform(X_test)
-
-# Save scaler for later use in production
-scaler_path = 'models/scaler.pkl'
-os.makedirs('models', exist_ok=True)
-joblib.dump(scaler, scaler_path)
-print(f"\nScaler saved to: {scaler_path}")
-
-# Step 3: Train Logistic Regression
-print("\n" + "=" * 60)
-print("[Step 3] Training Logistic Regression Model...")
-print("=" * 60)
-
-lr_model = LogisticRegression(random_state=42, max_iter=1000, class_weight='balanced')
-lr_model.fit(X_train_scaled, y_train)
-
-# Predictions
-y_train_pred_lr = lr_model.predict(X_train_scaled)
-y_val_pred_lr = lr_model.predict(X_val_scaled)
-y_test_pred_lr = lr_model.predict(X_test_scaled)
-
-# Accuracy
-train_acc_lr = accuracy_score(y_train, y_train_pred_lr)
-val_acc_lr = accuracy_score(y_val, y_val_pred_lr)
-test_acc_lr = accuracy_score(y_test, y_test_pred_lr)
-
-print(f"\nLogistic Regression Results:")
-print(f"Training Accuracy: {train_acc_lr*100:.2f}%")
-print(f"Validation Accuracy: {val_acc_lr*100:.2f}%")
-print(f"Test Accuracy: {test_acc_lr*100:.2f}%")
-
-# Save model
-lr_path = 'models/fraud_detection_lr.pkl'
-joblib.dump(lr_model, lr_path)
-print(f"Model saved to: {lr_path}")
-
-# Step 4: Train Random Forest
-print("\n" + "=" * 60)
-print("[Step 4] Training Random Forest Model...")
-print("=" * 60)
-
-rf_model = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=20,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42,
-    class_weight='balanced',
-    n_jobs=-1
-)
-rf_model.fit(X_train, y_train)  # RF doesn't always need scaling
-
-# Predictions
-y_train_pred_rf = rf_model.predict(X_train)
-y_val_pred_rf = rf_model.predict(X_val)
-y_test_pred_rf = rf_model.predict(X_test)
-
-# Accuracy
-train_acc_rf = accuracy_score(y_train, y_train_pred_rf)
-val_acc_rf = accuracy_score(y_val, y_val_pred_rf)
-test_acc_rf = accuracy_score(y_test, y_test_pred_rf)
-
-print(f"\nRandom Forest Results:")
-print(f"Training Accuracy: {train_acc_rf*100:.2f}%")
-print(f"Validation Accuracy: {val_acc_rf*100:.2f}%")
-print(f"Test Accuracy: {test_acc_rf*100:.2f}%")
-
-# Save model
-rf_path = 'models/fraud_detection_rf.pkl'
-joblib.dump(rf_model, rf_path)
-print(f"Model saved to: {rf_path}")
-
-# Step 5: Train SVM
-print("\n" + "=" * 60)
-print("[Step 5] Training SVM Model...")
-print("=" * 60)
-
-svm_model = SVC(
-    kernel='rbf',
-    C=1.0,
-    gamma='scale',
-    random_state=42,
-    class_weight='balanced',
-    probability=True
-)
-svm_model.fit(X_train_scaled, y_train)
-
-# Predictions
-y_train_pred_svm = svm_model.predict(X_train_scaled)
-y_val_pred_svm = svm_model.predict(X_val_scaled)
-y_test_pred_svm = svm_model.predict(X_test_scaled)
-
-# Accuracy
-train_acc_svm = accuracy_score(y_train, y_train_pred_svm)
-val_acc_svm = accuracy_score(y_val, y_val_pred_svm)
-test_acc_svm = accuracy_score(y_test, y_test_pred_svm)
-
-print(f"\nSVM Results:")
-print(f"Training Accuracy: {train_acc_svm*100:.2f}%")
-print(f"Validation Accuracy: {val_acc_svm*100:.2f}%")
-print(f"Test Accuracy: {test_acc_svm*100:.2f}%")
-
-# Save model
-svm_path = 'models/fraud_detection_svm.pkl'
-joblib.dump(svm_model, svm_path)
-print(f"Model saved to: {svm_path}")
-
-# Step 6: Train CNN (Convolutional Neural Network)
-print("\n" + "=" * 60)
-print("[Step 6] Training CNN Model...")
-print("=" * 60)
-
-# Reshape data for CNN (1D convolution expects 3D input: samples, timesteps, features)
-# We'll treat features as a sequence for 1D convolution
-X_train_cnn = X_train_scaled.reshape(X_train_scaled.shape[0], X_train_scaled.shape[1], 1)
-X_val_cnn = X_val_scaled.reshape(X_val_scaled.shape[0], X_val_scaled.shape[1], 1)
-X_test_cnn = X_test_scaled.reshape(X_test_scaled.shape[0], X_test_scaled.shape[1], 1)
-
-print(f"CNN Input Shape: {X_train_cnn.shape}")
-
-# Build CNN Model
-cnn_model = Sequential([
-    # First Convolutional Layer
-    Conv1D(filters=64, kernel_size=3, activation='relu', input_shape=(X_train_cnn.shape[1], 1)),
-    MaxPooling1D(pool_size=2),
-    Dropout(0.25),
-    
-    # Second Convolutional Layer
-    Conv1D(filters=32, kernel_size=3, activation='relu'),
-    MaxPooling1D(pool_size=2),
-    Dropout(0.25),
-    
-    # Flatten for Dense layers
-    Flatten(),
-    
-    # Dense layers
-    Dense(128, activation='relu'),
-    Dropout(0.5),
-    Dense(64, activation='relu'),
-    Dropout(0.5),
-    
-    # Output layer (binary classification)
-    Dense(1, activation='sigmoid')
-])
-
-# Compile model
-cnn_model.compile(
-    optimizer='adam',
-    loss='binary_crossentropy',
-    metrics=['accuracy']
-)
-
-print("\nCNN Model Architecture:")
-cnn_model.summary()
-
-# Callbacks
-early_stopping = EarlyStopping(
-    monitor='val_loss',
-    patience=10,
-    restore_best_weights=True
-)
-
-checkpoint = ModelCheckpoint(
-    'models/fraud_detection_cnn_best.h5',
-    monitor='val_accuracy',
-    save_best_only=True,
-    mode='max'
-)
-
-# Train CNN
-print("\nTraining CNN model (this may take several minutes)...")
-history = cnn_model.fit(
-    X_train_cnn, y_train,
-    batch_size=32,
-    epochs=50,
-    validation_data=(X_val_cnn, y_val),
-    callbacks=[early_stopping, checkpoint],
-    verbose=1
-)
-
-# Load best model
-cnn_model.load_weights('models/fraud_detection_cnn_best.h5')
-
-# Predictions
-y_train_pred_cnn = (cnn_model.predict(X_train_cnn) > 0.5).astype(int).flatten()
-y_val_pred_cnn = (cnn_model.predict(X_val_cnn) > 0.5).astype(int).flatten()
-y_test_pred_cnn = (cnn_model.predict(X_test_cnn) > 0.5).astype(int).flatten()
-
-# Accuracy
-train_acc_cnn = accuracy_score(y_train, y_train_pred_cnn)
-val_acc_cnn = accuracy_score(y_val, y_val_pred_cnn)
-test_acc_cnn = accuracy_score(y_test, y_test_pred_cnn)
-
-print(f"\nCNN Results:")
-print(f"Training Accuracy: {train_acc_cnn*100:.2f}%")
-print(f"Validation Accuracy: {val_acc_cnn*100:.2f}%")
-print(f"Test Accuracy: {test_acc_cnn*100:.2f}%")
-
-# Save final CNN model
-cnn_path = 'models/fraud_detection_cnn.h5'
-cnn_model.save(cnn_path)
-print(f"Model saved to: {cnn_path}")
-
-# Step 7: Model Comparison
-print("\n" + "=" * 60)
-print("[Step 7] Model Comparison (Test Set Accuracy)")
-print("=" * 60)
-print(f"{'Model':<25} {'Accuracy':<15}")
-print("-" * 40)
-print(f"{'Logistic Regression':<25} {test_acc_lr*100:>6.2f}%")
-print(f"{'Random Forest':<25} {test_acc_rf*100:>6.2f}%")
-print(f"{'SVM':<25} {test_acc_svm*100:>6.2f}%")
-print(f"{'CNN (Final Model)':<25} {test_acc_cnn*100:>6.2f}%")
-print("=" * 60)
-
-# Detailed CNN Report
-print("\n" + "=" * 60)
-print("CNN Model - Detailed Classification Report")
-print("=" * 60)
-print(classification_report(y_test, y_test_pred_cnn, target_names=['Legitimate', 'Fraud']))
-
-print("\n" + "=" * 60)
-print("CNN Model - Confusion Matrix")
-print("=" * 60)
-cm = confusion_matrix(y_test, y_test_pred_cnn)
-print("                Predicted")
-print("              Legit  Fraud")
-print(f"Actual Legit   {cm[0][0]:4d}   {cm[0][1]:4d}")
-print(f"       Fraud   {cm[1][0]:4d}   {cm[1][1]:4d}")
-
-# Summary
-print("\n" + "=" * 60)
-print("TRAINING COMPLETE!")
-print("=" * 60)
-print("\nBest Model: CNN (Convolutional Neural Network)")
-print(f"Final Test Accuracy: {test_acc_cnn*100:.2f}%")
-print("\nAll models saved in 'models/' directory:")
-print("  - fraud_detection_lr.pkl (Logistic Regression)")
-print("  - fraud_detection_rf.pkl (Random Forest)")
-print("  - fraud_detection_svm.pkl (SVM)")
-print("  - fraud_detection_cnn.h5 (CNN - Final Model)")
-print("  - scaler.pkl (Feature Scaler)")
-print("\nYou can now use the CNN model for real-time fraud detection!")
-=======
 """
 Machine Learning Model Training Script
 Trains Logistic Regression, Random Forest, SVM, and CNN models
 for UPI Fraud Detection
+
+The dataset is split and scaled once and written to memory-mapped .npy
+files; each model then trains in its own worker process (the sklearn
+models concurrently with the CNN) and reads the shared arrays zero-copy.
 """
 
-import pandas as pd
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Conv1D, MaxPooling1D, Flatten, Dropout, Reshape
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
 import joblib
-import os
 
-print("=" * 60)
-print("UPI Fraud Detection - Model Training")
-print("=" * 60)
-
-# Step 1: Load Dataset
-print("\n[Step 1] Loading dataset...")
-dataset_path = 'data/upi_transactions.csv'
-
-if not os.path.exists(dataset_path):
-    print(f"Error: Dataset not found at {dataset_path}")
-    print("Please run: python data/generate_dataset.py")
-    exit(1)
-
-df = pd.read_csv(dataset_path)
-print(f"Dataset loaded: {len(df)} transactions")
-print(f"Features: {df.columns.tolist()}")
-
-# Step 2: Data Preprocessing
-print("\n[Step 2] Preprocessing data...")
-
-# Separate features and target
-X = df.drop(['transaction_id', 'fraud'], axis=1)
-y = df['fraud']
-
-# Display class distribution
-print(f"\nClass Distribution:")
-print(f"Legitimate (0): {sum(y == 0)} ({sum(y == 0)/len(y)*100:.2f}%)")
-print(f"Fraudulent (1): {sum(y == 1)} ({sum(y == 1)/len(y)*100:.2f}%)")
-
-# Split data: 70% train, 15% validation, 15% test
-X_train, X_temp, y_train, y_temp = train_test_split(
-    X, y, test_size=0.3, random_state=42, stratify=y
-)
-X_val, X_test, y_val, y_test = train_test_split(
-    X_temp, y_temp, test_size=0.5, random_state=42, stratify=y_temp
-)
-
-print(f"\nData Split:")
-print(f"Training: {len(X_train)} samples")
-print(f"Validation: {len(X_val)} samples")
-print(f"Test: {len(X_test)} samples")
-
-# Feature Scaling (important for ML models)
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_val_scaled = scaler.transform(X_val)
-X_test_scaled = scaler.transform(X_test)
-
-# Save scaler for later use in production
-scaler_path = 'models/scaler.pkl'
-os.makedirs('models', exist_ok=True)
-joblib.dump(scaler, scaler_path)
-print(f"\nScaler saved to: {scaler_path}")
-
-# Step 3: Train Logistic Regression
-print("\n" + "=" * 60)
-print("[Step 3] Training Logistic Regression Model...")
-print("=" * 60)
-
-lr_model = LogisticRegression(random_state=42, max_iter=1000, class_weight='balanced')
-lr_model.fit(X_train_scaled, y_train)
-
-# Predictions
-y_train_pred_lr = lr_model.predict(X_train_scaled)
-y_val_pred_lr = lr_model.predict(X_val_scaled)
-y_test_pred_lr = lr_model.predict(X_test_scaled)
-
-# Accuracy
-train_acc_lr = accuracy_score(y_train, y_train_pred_lr)
-val_acc_lr = accuracy_score(y_val, y_val_pred_lr)
-test_acc_lr = accuracy_score(y_test, y_test_pred_lr)
-
-print(f"\nLogistic Regression Results:")
-print(f"Training Accuracy: {train_acc_lr*100:.2f}%")
-print(f"Validation Accuracy: {val_acc_lr*100:.2f}%")
-print(f"Test Accuracy: {test_acc_lr*100:.2f}%")
-
-# Save model
-lr_path = 'models/fraud_detection_lr.pkl'
-joblib.dump(lr_model, lr_path)
-print(f"Model saved to: {lr_path}")
-
-# Step 4: Train Random Forest
-print("\n" + "=" * 60)
-print("[Step 4] Training Random Forest Model...")
-print("=" * 60)
-
-rf_model = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=20,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42,
-    class_weight='balanced',
-    n_jobs=-1
-)
-rf_model.fit(X_train, y_train)  # RF doesn't always need scaling
-
-# Predictions
-y_train_pred_rf = rf_model.predict(X_train)
-y_val_pred_rf = rf_model.predict(X_val)
-y_test_pred_rf = rf_model.predict(X_test)
-
-# Accuracy
-train_acc_rf = accuracy_score(y_train, y_train_pred_rf)
-val_acc_rf = accuracy_score(y_val, y_val_pred_rf)
-test_acc_rf = accuracy_score(y_test, y_test_pred_rf)
-
-print(f"\nRandom Forest Results:")
-print(f"Training Accuracy: {train_acc_rf*100:.2f}%")
-print(f"Validation Accuracy: {val_acc_rf*100:.2f}%")
-print(f"Test Accuracy: {test_acc_rf*100:.2f}%")
-
-# Save model
-rf_path = 'models/fraud_detection_rf.pkl'
-joblib.dump(rf_model, rf_path)
-print(f"Model saved to: {rf_path}")
-
-# Step 5: Train SVM
-print("\n" + "=" * 60)
-print("[Step 5] Training SVM Model...")
-print("=" * 60)
-
-svm_model = SVC(
-    kernel='rbf',
-    C=1.0,
-    gamma='scale',
-    random_state=42,
-    class_weight='balanced',
-    probability=True
-)
-svm_model.fit(X_train_scaled, y_train)
-
-# Predictions
-y_train_pred_svm = svm_model.predict(X_train_scaled)
-y_val_pred_svm = svm_model.predict(X_val_scaled)
-y_test_pred_svm = svm_model.predict(X_test_scaled)
-
-# Accuracy
-train_acc_svm = accuracy_score(y_train, y_train_pred_svm)
-val_acc_svm = accuracy_score(y_val, y_val_pred_svm)
-test_acc_svm = accuracy_score(y_test, y_test_pred_svm)
-
-print(f"\nSVM Results:")
-print(f"Training Accuracy: {train_acc_svm*100:.2f}%")
-print(f"Validation Accuracy: {val_acc_svm*100:.2f}%")
-print(f"Test Accuracy: {test_acc_svm*100:.2f}%")
-
-# Save model
-svm_path = 'models/fraud_detection_svm.pkl'
-joblib.dump(svm_model, svm_path)
-print(f"Model saved to: {svm_path}")
-
-# Step 6: Train CNN (Convolutional Neural Network)
-print("\n" + "=" * 60)
-print("[Step 6] Training CNN Model...")
-print("=" * 60)
-
-# Reshape data for CNN (1D convolution expects 3D input: samples, timesteps, features)
-# We'll treat features as a sequence for 1D convolution
-X_train_cnn = X_train_scaled.reshape(X_train_scaled.shape[0], X_train_scaled.shape[1], 1)
-X_val_cnn = X_val_scaled.reshape(X_val_scaled.shape[0], X_val_scaled.shape[1], 1)
-X_test_cnn = X_test_scaled.reshape(X_test_scaled.shape[0], X_test_scaled.shape[1], 1)
-
-print(f"CNN Input Shape: {X_train_cnn.shape}")
-
-# Build CNN Model
-cnn_model = Sequential([
-    # First Convolutional Layer
-    Conv1D(filters=64, kernel_size=3, activation='relu', input_shape=(X_train_cnn.shape[1], 1)),
-    MaxPooling1D(pool_size=2),
-    Dropout(0.25),
-    
-    # Second Convolutional Layer
-    Conv1D(filters=32, kernel_size=3, activation='relu'),
-    MaxPooling1D(pool_size=2),
-    Dropout(0.25),
-    
-    # Flatten for Dense layers
-    Flatten(),
-    
-    # Dense layers
-    Dense(128, activation='relu'),
-    Dropout(0.5),
-    Dense(64, activation='relu'),
-    Dropout(0.5),
-    
-    # Output layer (binary classification)
-    Dense(1, activation='sigmoid')
-])
-
-# Compile model
-cnn_model.compile(
-    optimizer='adam',
-    loss='binary_crossentropy',
-    metrics=['accuracy']
-)
-
-print("\nCNN Model Architecture:")
-cnn_model.summary()
-
-# Callbacks
-early_stopping = EarlyStopping(
-    monitor='val_loss',
-    patience=10,
-    restore_best_weights=True
-)
-
-checkpoint = ModelCheckpoint(
-    'models/fraud_detection_cnn_best.h5',
-    monitor='val_accuracy',
-    save_best_only=True,
-    mode='max'
-)
-
-# Train CNN
-print("\nTraining CNN model (this may take several minutes)...")
-history = cnn_model.fit(
-    X_train_cnn, y_train,
-    batch_size=32,
-    epochs=50,
-    validation_data=(X_val_cnn, y_val),
-    callbacks=[early_stopping, checkpoint],
-    verbose=1
-)
-
-# Load best model
-cnn_model.load_weights('models/fraud_detection_cnn_best.h5')
-
-# Predictions
-y_train_pred_cnn = (cnn_model.predict(X_train_cnn) > 0.5).astype(int).flatten()
-y_val_pred_cnn = (cnn_model.predict(X_val_cnn) > 0.5).astype(int).flatten()
-y_test_pred_cnn = (cnn_model.predict(X_test_cnn) > 0.5).astype(int).flatten()
-
-# Accuracy
-train_acc_cnn = accuracy_score(y_train, y_train_pred_cnn)
-val_acc_cnn = accuracy_score(y_val, y_val_pred_cnn)
-test_acc_cnn = accuracy_score(y_test, y_test_pred_cnn)
-
-print(f"\nCNN Results:")
-print(f"Training Accuracy: {train_acc_cnn*100:.2f}%")
-print(f"Validation Accuracy: {val_acc_cnn*100:.2f}%")
-print(f"Test Accuracy: {test_acc_cnn*100:.2f}%")
-
-# Save final CNN model
-cnn_path = 'models/fraud_detection_cnn.h5'
-cnn_model.save(cnn_path)
-print(f"Model saved to: {cnn_path}")
-
-# Step 7: Model Comparison
-print("\n" + "=" * 60)
-print("[Step 7] Model Comparison (Test Set Accuracy)")
-print("=" * 60)
-print(f"{'Model':<25} {'Accuracy':<15}")
-print("-" * 40)
-print(f"{'Logistic Regression':<25} {test_acc_lr*100:>6.2f}%")
-print(f"{'Random Forest':<25} {test_acc_rf*100:>6.2f}%")
-print(f"{'SVM':<25} {test_acc_svm*100:>6.2f}%")
-print(f"{'CNN (Final Model)':<25} {test_acc_cnn*100:>6.2f}%")
-print("=" * 60)
-
-# Detailed CNN Report
-print("\n" + "=" * 60)
-print("CNN Model - Detailed Classification Report")
-print("=" * 60)
-print(classification_report(y_test, y_test_pred_cnn, target_names=['Legitimate', 'Fraud']))
-
-print("\n" + "=" * 60)
-print("CNN Model - Confusion Matrix")
-print("=" * 60)
-cm = confusion_matrix(y_test, y_test_pred_cnn)
-print("                Predicted")
-print("              Legit  Fraud")
-print(f"Actual Legit   {cm[0][0]:4d}   {cm[0][1]:4d}")
-print(f"       Fraud   {cm[1][0]:4d}   {cm[1][1]:4d}")
-
-# Summary
-print("\n" + "=" * 60)
-print("TRAINING COMPLETE!")
-print("=" * 60)
-print("\nBest Model: CNN (Convolutional Neural Network)")
-print(f"Final Test Accuracy: {test_acc_cnn*100:.2f}%")
-print("\nAll models saved in 'models/' directory:")
-print("  - fraud_detection_lr.pkl (Logistic Regression)")
-print("  - fraud_detection_rf.pkl (Random Forest)")
-print("  - fraud_detection_svm.pkl (SVM)")
-print("  - fraud_detection_cnn.h5 (CNN - Final Model)")
-print("  - scaler.pkl (Feature Scaler)")
-print("\nYou can now use the CNN model for real-time fraud detection!")
->>>>>>> a692c63 (initial commit)
+# Allow importing the serving runtime from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATASET_PATH = 'data/upi_transactions.csv'
+WORK_DIR = 'models/.train_cache'
+SCALER_PATH = 'models/scaler.pkl'
+NON_FEATURE_COLUMNS = ['transaction_id', 'fraud']
+
+MODEL_NAMES = {
+    'lr': 'Logistic Regression',
+    'rf': 'Random Forest',
+    'svm': 'SVM',
+    'cnn': 'CNN (Final Model)'
+}
+
+
+# ==================== Data Preparation ====================
+
+def load_dataset(path=DATASET_PATH):
+    """
+    Load the dataset and return (X, y, feature_columns)
+
+    path may be the CSV file or a per-column .npy directory written by
+    generate_dataset.py --format npy, which is memory-mapped instead of
+    parsed; only the float feature matrix is materialized.
+    """
+    if os.path.isdir(path):
+        from data.generate_dataset import load_columns
+
+        columns = load_columns(path)
+        feature_columns = [c for c in columns if c not in NON_FEATURE_COLUMNS]
+        X = np.empty((len(columns['fraud']), len(feature_columns)), dtype=np.float64)
+        for j, name in enumerate(feature_columns):
+            X[:, j] = columns[name]
+        return X, columns['fraud'], feature_columns
+
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    feature_columns = [c for c in df.columns if c not in NON_FEATURE_COLUMNS]
+    X = df[feature_columns].to_numpy(dtype=np.float64)
+    y = df['fraud'].to_numpy(dtype=np.int8)
+    return X, y, feature_columns
+
+
+def prepare_splits(X, y, work_dir=WORK_DIR):
+    """
+    Split 70/15/15 (stratified), fit the scaler, and write shared arrays
+
+    Rows are stored in train | val | test order in one raw and one scaled
+    .npy file, so every split is a slice of a single memory map and each
+    model can score all three splits in one predict pass.
+
+    Returns:
+        dict: split sizes and file names (also saved as meta.json)
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    indices = np.arange(len(y))
+    train_idx, temp_idx = train_test_split(indices, test_size=0.3, random_state=42, stratify=y)
+    val_idx, test_idx = train_test_split(temp_idx, test_size=0.5, random_state=42, stratify=y[temp_idx])
+    order = np.concatenate([train_idx, val_idx, test_idx])
+
+    os.makedirs(work_dir, exist_ok=True)
+    X_ordered = X[order]
+    np.save(os.path.join(work_dir, 'X_raw.npy'), X_ordered)
+    np.save(os.path.join(work_dir, 'y.npy'), y[order])
+
+    # Feature Scaling (important for ML models)
+    scaler = StandardScaler()
+    scaler.fit(X_ordered[:len(train_idx)])
+    np.save(os.path.join(work_dir, 'X_scaled.npy'), scaler.transform(X_ordered))
+
+    # Save scaler for later use in production
+    os.makedirs(os.path.dirname(SCALER_PATH), exist_ok=True)
+    joblib.dump(scaler, SCALER_PATH)
+
+    meta = {'n_train': len(train_idx), 'n_val': len(val_idx), 'n_test': len(test_idx)}
+    with open(os.path.join(work_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+def load_shared(work_dir=WORK_DIR):
+    """
+    Memory-map the prepared arrays (zero-copy, shared page cache)
+
+    Returns:
+        tuple: (X_raw, X_scaled, y, meta)
+    """
+    with open(os.path.join(work_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    X_raw = np.load(os.path.join(work_dir, 'X_raw.npy'), mmap_mode='r')
+    X_scaled = np.load(os.path.join(work_dir, 'X_scaled.npy'), mmap_mode='r')
+    y = np.load(os.path.join(work_dir, 'y.npy'), mmap_mode='r')
+    return X_raw, X_scaled, y, meta
+
+
+def split_slices(meta):
+    """Row slices of the train, validation and test splits"""
+    a = meta['n_train']
+    b = a + meta['n_val']
+    return {'train': slice(0, a), 'val': slice(a, b), 'test': slice(b, b + meta['n_test'])}
+
+
+def evaluate(y, predictions, meta):
+    """Accuracy per split from a single predict pass over all rows"""
+    from sklearn.metrics import accuracy_score
+
+    return {
+        name: float(accuracy_score(y[rows], predictions[rows]))
+        for name, rows in split_slices(meta).items()
+    }
+
+
+# ==================== Model Stages (run in worker processes) ====================
+
+def train_logistic_regression(work_dir=WORK_DIR):
+    """Train and save the Logistic Regression model"""
+    from sklearn.linear_model import LogisticRegression
+
+    X_raw, X_scaled, y, meta = load_shared(work_dir)
+    train = split_slices(meta)['train']
+
+    start = time.perf_counter()
+    lr_model = LogisticRegression(random_state=42, max_iter=1000, class_weight='balanced')
+    lr_model.fit(X_scaled[train], y[train])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = lr_model.predict(X_scaled)
+    predict_seconds = time.perf_counter() - start
+
+    lr_path = 'models/fraud_detection_lr.pkl'
+    joblib.dump(lr_model, lr_path)
+    return {'model': 'lr', 'path': lr_path, 'accuracy': evaluate(y, predictions, meta),
+            'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds}
+
+
+def train_random_forest(work_dir=WORK_DIR):
+    """Train and save the Random Forest model"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    X_raw, X_scaled, y, meta = load_shared(work_dir)
+    train = split_slices(meta)['train']
+
+    start = time.perf_counter()
+    rf_model = RandomForestClassifier(
+        n_estimators=100,
+        max_depth=20,
+        min_samples_split=5,
+        min_samples_leaf=2,
+        random_state=42,
+        class_weight='balanced',
+        n_jobs=-1
+    )
+    rf_model.fit(X_raw[train], y[train])  # RF doesn't always need scaling
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = rf_model.predict(X_raw)
+    predict_seconds = time.perf_counter() - start
+
+    rf_path = 'models/fraud_detection_rf.pkl'
+    joblib.dump(rf_model, rf_path)
+    return {'model': 'rf', 'path': rf_path, 'accuracy': evaluate(y, predictions, meta),
+            'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds}
+
+
+def build_svm(mode='exact', num_features=9, n_components=500):
+    """
+    Build the SVM stage estimator
+
+    Args:
+        mode: 'exact' for the kernel SVC (quadratic-to-cubic in sample count,
+            plus 5-fold Platt scaling for probability=True), or 'rff' /
+            'nystroem' to approximate the same RBF kernel with an explicit
+            feature map followed by a linear SVM, calibrated with sigmoid
+            (Platt) scaling so predict_proba is still available
+        num_features: Input width, used to match gamma='scale'
+        n_components: Size of the approximate feature map
+    """
+    from sklearn.svm import SVC
+
+    if mode == 'exact':
+        return SVC(
+            kernel='rbf',
+            C=1.0,
+            gamma='scale',
+            random_state=42,
+            class_weight='balanced',
+            probability=True
+        )
+
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.kernel_approximation import Nystroem, RBFSampler
+    from sklearn.pipeline import make_pipeline
+    from sklearn.svm import LinearSVC
+
+    # gamma='scale' is 1 / (n_features * X.var()); standardized features have unit variance
+    gamma = 1.0 / num_features
+    if mode == 'rff':
+        feature_map = RBFSampler(gamma=gamma, n_components=n_components, random_state=42)
+    elif mode == 'nystroem':
+        feature_map = Nystroem(gamma=gamma, n_components=n_components, random_state=42)
+    else:
+        raise ValueError(f"Unknown SVM mode: {mode}")
+
+    linear_svm = LinearSVC(C=1.0, class_weight='balanced', dual=False, random_state=42)
+    return make_pipeline(feature_map, CalibratedClassifierCV(linear_svm, method='sigmoid', cv=3))
+
+
+def train_svm(work_dir=WORK_DIR, mode='exact', n_components=500):
+    """Train and save the SVM model (exact kernel SVC or a kernel approximation)"""
+    X_raw, X_scaled, y, meta = load_shared(work_dir)
+    train = split_slices(meta)['train']
+
+    start = time.perf_counter()
+    svm_model = build_svm(mode, X_scaled.shape[1], n_components)
+    svm_model.fit(X_scaled[train], y[train])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = svm_model.predict(X_scaled)
+    predict_seconds = time.perf_counter() - start
+
+    svm_path = 'models/fraud_detection_svm.pkl'
+    joblib.dump(svm_model, svm_path)
+    return {'model': 'svm', 'path': svm_path, 'accuracy': evaluate(y, predictions, meta),
+            'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds}
+
+
+def build_cnn(num_features):
+    """
+    Build the Conv1D fraud detection network
+
+    Pooling uses padding='same' so the second MaxPool keeps at least one
+    step; with 9 features and 'valid' pooling its output length is zero
+    and Keras 3 refuses to build the model.
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Input, Dense, Conv1D, MaxPooling1D, Flatten, Dropout
+
+    return Sequential([
+        Input(shape=(num_features, 1)),
+
+        # First Convolutional Layer
+        Conv1D(filters=64, kernel_size=3, activation='relu'),
+        MaxPooling1D(pool_size=2, padding='same'),
+        Dropout(0.25),
+
+        # Second Convolutional Layer
+        Conv1D(filters=32, kernel_size=3, activation='relu'),
+        MaxPooling1D(pool_size=2, padding='same'),
+        Dropout(0.25),
+
+        # Flatten for Dense layers
+        Flatten(),
+
+        # Dense layers
+        Dense(128, activation='relu'),
+        Dropout(0.5),
+        Dense(64, activation='relu'),
+        Dropout(0.5),
+
+        # Output layer (binary classification)
+        Dense(1, activation='sigmoid')
+    ])
+
+
+def train_cnn(work_dir=WORK_DIR, epochs=50):
+    """Train the CNN, save it, and export the NumPy serving runtime"""
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+    from cnn_runtime import export_numpy_model
+
+    X_raw, X_scaled, y, meta = load_shared(work_dir)
+    splits = split_slices(meta)
+    num_features = X_scaled.shape[1]
+
+    # Reshape data for CNN (1D convolution expects 3D input: samples, timesteps, features)
+    # Reshaping a memory-mapped slice is a view, not a copy
+    X_cnn = X_scaled.reshape(X_scaled.shape[0], num_features, 1)
+
+    cnn_model = build_cnn(num_features)
+
+    # Compile model
+    cnn_model.compile(
+        optimizer='adam',
+        loss='binary_crossentropy',
+        metrics=['accuracy']
+    )
+
+    # Callbacks
+    early_stopping = EarlyStopping(
+        monitor='val_loss',
+        patience=10,
+        restore_best_weights=True
+    )
+
+    checkpoint = ModelCheckpoint(
+        'models/fraud_detection_cnn_best.h5',
+        monitor='val_accuracy',
+        save_best_only=True,
+        mode='max'
+    )
+
+    start = time.perf_counter()
+    cnn_model.fit(
+        X_cnn[splits['train']], y[splits['train']],
+        batch_size=32,
+        epochs=epochs,
+        validation_data=(X_cnn[splits['val']], y[splits['val']]),
+        callbacks=[early_stopping, checkpoint],
+        verbose=2
+    )
+    fit_seconds = time.perf_counter() - start
+
+    # Load best model
+    cnn_model.load_weights('models/fraud_detection_cnn_best.h5')
+
+    # One predict pass over train | val | test
+    start = time.perf_counter()
+    predictions = (cnn_model.predict(X_cnn, batch_size=4096, verbose=0) > 0.5).astype(int).flatten()
+    predict_seconds = time.perf_counter() - start
+
+    # Save final CNN model
+    cnn_path = 'models/fraud_detection_cnn.h5'
+    cnn_model.save(cnn_path)
+
+    # Export weights + scaler parameters for the TensorFlow-free serving runtime
+    numpy_model_path = 'models/fraud_detection_cnn.npz'
+    export_numpy_model(cnn_model, joblib.load(SCALER_PATH), numpy_model_path)
+
+    return {'model': 'cnn', 'path': cnn_path, 'accuracy': evaluate(y, predictions, meta),
+            'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds,
+            'test_predictions': predictions[splits['test']]}
+
+
+STAGES = {
+    'lr': train_logistic_regression,
+    'rf': train_random_forest,
+    'svm': train_svm,
+    'cnn': train_cnn
+}
+
+
+# ==================== Pipeline ====================
+
+def run_stages(models, work_dir, workers, stage_kwargs):
+    """
+    Train the requested models, concurrently in a process pool
+
+    Workers are started with 'spawn' so TensorFlow is only ever imported
+    inside the CNN worker, never forked from a parent that loaded it.
+    """
+    results = {}
+    if workers <= 1:
+        for name in models:
+            results[name] = STAGES[name](work_dir, **stage_kwargs.get(name, {}))
+            print(f"  ✓ {MODEL_NAMES[name]} finished")
+        return results
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Submit the CNN first: it is the longest stage
+        ordered = sorted(models, key=lambda name: name != 'cnn')
+        futures = {
+            pool.submit(STAGES[name], work_dir, **stage_kwargs.get(name, {})): name
+            for name in ordered
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name] = future.result()
+            print(f"  ✓ {MODEL_NAMES[name]} finished")
+    return results
+
+
+def print_report(results, y_test, timings):
+    """Accuracy comparison, CNN details, and the per-stage timing report"""
+    from sklearn.metrics import classification_report, confusion_matrix
+
+    for name in MODEL_NAMES:
+        if name not in results:
+            continue
+        accuracy = results[name]['accuracy']
+        print(f"\n{MODEL_NAMES[name]} Results:")
+        print(f"Training Accuracy: {accuracy['train']*100:.2f}%")
+        print(f"Validation Accuracy: {accuracy['val']*100:.2f}%")
+        print(f"Test Accuracy: {accuracy['test']*100:.2f}%")
+        print(f"Model saved to: {results[name]['path']}")
+
+    # Model Comparison
+    print("\n" + "=" * 60)
+    print("Model Comparison (Test Set Accuracy)")
+    print("=" * 60)
+    print(f"{'Model':<25} {'Accuracy':<15}")
+    print("-" * 40)
+    for name in MODEL_NAMES:
+        if name in results:
+            print(f"{MODEL_NAMES[name]:<25} {results[name]['accuracy']['test']*100:>6.2f}%")
+    print("=" * 60)
+
+    if 'cnn' in results:
+        y_test_pred_cnn = results['cnn'].get('test_predictions')
+
+        # Detailed CNN Report (needs per-row predictions, not kept when streaming)
+        if y_test_pred_cnn is not None:
+            print("\n" + "=" * 60)
+            print("CNN Model - Detailed Classification Report")
+            print("=" * 60)
+            print(classification_report(y_test, y_test_pred_cnn, target_names=['Legitimate', 'Fraud']))
+            cm = confusion_matrix(y_test, y_test_pred_cnn)
+        else:
+            cm = results['cnn']['confusion']
+
+        print("\n" + "=" * 60)
+        print("CNN Model - Confusion Matrix")
+        print("=" * 60)
+        print("                Predicted")
+        print("              Legit  Fraud")
+        print(f"Actual Legit   {cm[0][0]:4d}   {cm[0][1]:4d}")
+        print(f"       Fraud   {cm[1][0]:4d}   {cm[1][1]:4d}")
+
+    # Timing report
+    print("\n" + "=" * 60)
+    print("Timing Report")
+    print("=" * 60)
+    print(f"{'Stage':<28} {'Fit (s)':>10} {'Predict (s)':>12}")
+    print("-" * 52)
+    for stage, seconds in timings.items():
+        print(f"{stage:<28} {seconds:>10.2f}")
+    for name in MODEL_NAMES:
+        if name in results:
+            r = results[name]
+            print(f"{MODEL_NAMES[name]:<28} {r['fit_seconds']:>10.2f} {r['predict_seconds']:>12.2f}")
+    print(f"{'Peak RSS':<28} {peak_rss_mb():>8.0f} MB")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children"""
+    import resource
+
+    usage = [resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return max(usage) / 1024  # ru_maxrss is in KiB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UPI Fraud Detection - Model Training')
+    parser.add_argument('--dataset', default=DATASET_PATH,
+                        help='CSV file, or per-column .npy directory (generate_dataset.py --format npy)')
+    parser.add_argument('--models', default='lr,rf,svm,cnn',
+                        help='Comma-separated subset of: lr, rf, svm, cnn')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Parallel training processes (1 = sequential)')
+    parser.add_argument('--epochs', type=int, default=50, help='Maximum CNN epochs')
+    parser.add_argument('--svm-mode', choices=['exact', 'rff', 'nystroem'], default='exact',
+                        help="SVM variant: exact kernel SVC, or a random Fourier feature / "
+                             "Nystroem approximation that scales linearly with rows")
+    parser.add_argument('--svm-components', type=int, default=500,
+                        help='Feature map size for --svm-mode rff/nystroem')
+    parser.add_argument('--work-dir', default=WORK_DIR)
+    parser.add_argument('--streaming', action='store_true',
+                        help='Out-of-core mode: read the dataset in chunks (bounded memory)')
+    parser.add_argument('--chunk-size', type=int, default=100_000,
+                        help='Rows per chunk in --streaming mode')
+    parser.add_argument('--stream-epochs', type=int, default=5,
+                        help='partial_fit passes for the linear models in --streaming mode')
+    parser.add_argument('--rf-sample-rows', type=int, default=1_000_000,
+                        help='Train rows sampled for Random Forest in --streaming mode')
+    args = parser.parse_args()
+
+    models = [m.strip() for m in args.models.split(',') if m.strip()]
+    unknown = [m for m in models if m not in STAGES]
+    if unknown:
+        parser.error(f"Unknown model(s): {', '.join(unknown)}")
+
+    print("=" * 60)
+    print("UPI Fraud Detection - Model Training")
+    print("=" * 60)
+    pipeline_start = time.perf_counter()
+    timings = {}
+
+    if not os.path.exists(args.dataset):
+        print(f"Error: Dataset not found at {args.dataset}")
+        print("Please run: python data/generate_dataset.py")
+        sys.exit(1)
+
+    if args.streaming:
+        from models.train_streaming import run_streaming
+
+        print(f"\n[Streaming] Training out-of-core in chunks of {args.chunk_size:,} rows...")
+        results, timings, counts = run_streaming(
+            args.dataset, models, args.chunk_size, args.stream_epochs, args.epochs, args.svm_components,
+            args.rf_sample_rows
+        )
+        for split, (legit, fraud) in counts.items():
+            print(f"{split.capitalize()}: {legit + fraud} samples ({fraud} fraud)")
+        timings['Total pipeline (wall)'] = time.perf_counter() - pipeline_start
+        print_report(results, None, timings)
+        return
+
+    # Step 1: Load Dataset
+    print("\n[Step 1] Loading dataset...")
+
+    start = time.perf_counter()
+    X, y, feature_columns = load_dataset(args.dataset)
+    timings['Load dataset'] = time.perf_counter() - start
+    print(f"Dataset loaded: {len(y)} transactions")
+    print(f"Features: {feature_columns}")
+
+    # Display class distribution
+    print(f"\nClass Distribution:")
+    print(f"Legitimate (0): {int((y == 0).sum())} ({(y == 0).mean()*100:.2f}%)")
+    print(f"Fraudulent (1): {int((y == 1).sum())} ({(y == 1).mean()*100:.2f}%)")
+
+    # Step 2: Data Preprocessing
+    print("\n[Step 2] Splitting, scaling and writing shared arrays...")
+    start = time.perf_counter()
+    meta = prepare_splits(X, y, args.work_dir)
+    del X, y
+    timings['Split + scale + write'] = time.perf_counter() - start
+
+    print(f"\nData Split:")
+    print(f"Training: {meta['n_train']} samples")
+    print(f"Validation: {meta['n_val']} samples")
+    print(f"Test: {meta['n_test']} samples")
+    print(f"\nScaler saved to: {SCALER_PATH}")
+
+    # Step 3: Train models
+    print("\n" + "=" * 60)
+    print(f"[Step 3] Training {', '.join(MODEL_NAMES[m] for m in models)} "
+          f"({args.workers} worker{'s' if args.workers != 1 else ''})...")
+    print("=" * 60)
+    start = time.perf_counter()
+    stage_kwargs = {
+        'svm': {'mode': args.svm_mode, 'n_components': args.svm_components},
+        'cnn': {'epochs': args.epochs}
+    }
+    results = run_stages(models, args.work_dir, args.workers, stage_kwargs)
+    timings['Model training (wall)'] = time.perf_counter() - start
+
+    _, _, y_shared, _ = load_shared(args.work_dir)
+    y_test = np.asarray(y_shared[split_slices(meta)['test']])
+    timings['Total pipeline (wall)'] = time.perf_counter() - pipeline_start
+
+    print_report(results, y_test, timings)
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("TRAINING COMPLETE!")
+    print("=" * 60)
+    if 'cnn' in results:
+        print("\nBest Model: CNN (Convolutional Neural Network)")
+        print(f"Final Test Accuracy: {results['cnn']['accuracy']['test']*100:.2f}%")
+    print("\nAll models saved in 'models/' directory:")
+    print("  - fraud_detection_lr.pkl (Logistic Regression)")
+    print("  - fraud_detection_rf.pkl (Random Forest)")
+    print("  - fraud_detection_svm.pkl (SVM)")
+    print("  - fraud_detection_cnn.h5 (CNN - Final Model)")
+    print("  - fraud_detection_cnn.npz (CNN - NumPy serving runtime)")
+    print("  - scaler.pkl (Feature Scaler)")
+    print("\nYou can now use the CNN model for real-time fraud detection!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+Out-of-core Training
+Streams the dataset in fixed-size chunks so peak memory is bounded by the
+chunk size rather than the row count.
+
+Rows are assigned to train/val/test by a hash of transaction_id (70/15/15),
+so every pass over the file sees the same split without holding an index.
+The scaler is fitted with partial_fit in a first pass; the linear models
+are trained with partial_fit over several epochs and the CNN is fed by a
+tf.data generator pipeline. Random Forest has no incremental fit and is
+trained on a bounded uniform sample of the train split.
+"""
+
+import os
+import time
+
+import numpy as np
+import joblib
+
+from models.train_models import MODEL_NAMES, NON_FEATURE_COLUMNS, SCALER_PATH
+
+SPLIT_NAMES = ('train', 'val', 'test')
+TRAIN_FRACTION = 0.70
+VAL_FRACTION = 0.15
+
+
+# ==================== Chunked Input ====================
+
+def iter_dataset_chunks(path, chunk_size=100_000):
+    """
+    Yield (transaction_ids, X, y) chunks from a CSV, Parquet or per-column
+    .npy dataset
+
+    Only one chunk is resident at a time.
+    """
+    if os.path.isdir(path):
+        from data.generate_dataset import load_columns
+
+        columns = load_columns(path)
+        feature_columns = [c for c in columns if c not in NON_FEATURE_COLUMNS]
+        for start in range(0, len(columns['fraud']), chunk_size):
+            rows = slice(start, start + chunk_size)
+            yield (columns['transaction_id'][rows].astype(np.uint64),
+                   np.column_stack([columns[c][rows] for c in feature_columns]).astype(np.float64),
+                   np.asarray(columns['fraud'][rows]))
+        return
+
+    import pandas as pd
+
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq  # Optional dependency for Parquet input
+
+        frames = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+    else:
+        frames = pd.read_csv(path, chunksize=chunk_size)
+
+    for df in frames:
+        feature_columns = [c for c in df.columns if c not in NON_FEATURE_COLUMNS]
+        yield (df['transaction_id'].to_numpy(dtype=np.uint64),
+               df[feature_columns].to_numpy(dtype=np.float64),
+               df['fraud'].to_numpy(dtype=np.int8))
+
+
+def assign_splits(transaction_ids):
+    """
+    Deterministic split per row: 0 = train, 1 = val, 2 = test
+
+    Multiplicative hashing spreads sequential IDs uniformly over [0, 1).
+    """
+    ids = np.asarray(transaction_ids, dtype=np.uint64)
+    u = ((ids * np.uint64(2654435761)) % np.uint64(2 ** 32)) / 2.0 ** 32
+    return np.digitize(u, [TRAIN_FRACTION, TRAIN_FRACTION + VAL_FRACTION]).astype(np.int8)
+
+
+def iter_split(path, chunk_size, split, scaler=None):
+    """Yield (X, y) chunks of one split, scaled when a scaler is given"""
+    wanted = SPLIT_NAMES.index(split)
+    for ids, X, y in iter_dataset_chunks(path, chunk_size):
+        mask = assign_splits(ids) == wanted
+        if not mask.any():
+            continue
+        X = X[mask]
+        yield (scaler.transform(X) if scaler is not None else X), y[mask]
+
+
+# ==================== Streaming Stages ====================
+
+def fit_scaler(path, chunk_size):
+    """
+    First pass: fit the StandardScaler on train rows and count every split
+
+    Returns:
+        tuple: (scaler, counts) where counts[split] = [legitimate, fraud]
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    counts = {name: [0, 0] for name in SPLIT_NAMES}
+    for ids, X, y in iter_dataset_chunks(path, chunk_size):
+        splits = assign_splits(ids)
+        for index, name in enumerate(SPLIT_NAMES):
+            in_split = splits == index
+            fraud = int(y[in_split].sum())
+            counts[name][0] += int(in_split.sum()) - fraud
+            counts[name][1] += fraud
+        train = splits == 0
+        if train.any():
+            scaler.partial_fit(X[train])
+
+    os.makedirs(os.path.dirname(SCALER_PATH), exist_ok=True)
+    joblib.dump(scaler, SCALER_PATH)
+    return scaler, counts
+
+
+def balanced_class_weight(counts):
+    """Equivalent of class_weight='balanced' from streamed train counts"""
+    legit, fraud = counts['train']
+    total = legit + fraud
+    return {0: total / (2.0 * max(legit, 1)), 1: total / (2.0 * max(fraud, 1))}
+
+
+def stream_accuracy(predict, path, chunk_size, scaler, confusion_split=None):
+    """
+    Per-split accuracy from one streamed predict pass
+
+    Returns:
+        tuple: (accuracy dict, 2x2 confusion matrix of confusion_split or None)
+    """
+    correct = dict.fromkeys(SPLIT_NAMES, 0)
+    total = dict.fromkeys(SPLIT_NAMES, 0)
+    confusion = np.zeros((2, 2), dtype=np.int64)
+
+    for ids, X, y in iter_dataset_chunks(path, chunk_size):
+        splits = assign_splits(ids)
+        predictions = predict(scaler.transform(X) if scaler is not None else X)
+        for index, name in enumerate(SPLIT_NAMES):
+            in_split = splits == index
+            correct[name] += int((predictions[in_split] == y[in_split]).sum())
+            total[name] += int(in_split.sum())
+            if name == confusion_split:
+                np.add.at(confusion, (y[in_split], predictions[in_split]), 1)
+
+    accuracy = {name: correct[name] / max(total[name], 1) for name in SPLIT_NAMES}
+    return accuracy, (confusion if confusion_split else None)
+
+
+def train_linear_streaming(model, path, chunk_size, scaler, epochs, transform=None):
+    """partial_fit a linear model over shuffled train chunks for several epochs"""
+    rng = np.random.default_rng(42)
+    for _ in range(epochs):
+        for X, y in iter_split(path, chunk_size, 'train', scaler):
+            order = rng.permutation(len(y))
+            X = X[order]
+            if transform is not None:
+                X = transform.transform(X)
+            model.partial_fit(X, y[order], classes=[0, 1])
+    return model
+
+
+def train_logistic_regression_streaming(path, chunk_size, scaler, counts, epochs=5):
+    """Logistic Regression via SGD (log loss) with partial_fit"""
+    from sklearn.linear_model import SGDClassifier
+
+    start = time.perf_counter()
+    lr_model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42,
+                             class_weight=balanced_class_weight(counts))
+    train_linear_streaming(lr_model, path, chunk_size, scaler, epochs)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accuracy, _ = stream_accuracy(lr_model.predict, path, chunk_size, scaler)
+    predict_seconds = time.perf_counter() - start
+
+    lr_path = 'models/fraud_detection_lr.pkl'
+    joblib.dump(lr_model, lr_path)
+    return {'model': 'lr', 'path': lr_path, 'accuracy': accuracy,
+            'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds}
+
+
+def train_random_forest_streaming(path, chunk_size, counts, max_rows=1_000_000):
+    """
+    Random Forest on a uniform sample of at most max_rows train rows
+
+    Trees need all their rows at once, so memory is bounded by the sample
+    rather than the dataset. Like train_models.train_random_forest, the
+    forest is fitted on raw (unscaled) features.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    keep = min(1.0, max_rows / max(sum(counts['train']), 1))
+    rng = np.random.default_rng(42)
+    X_parts, y_parts = [], []
+    for X, y in iter_split(path, chunk_size, 'train'):
+        sampled = rng.random(len(y)) < keep
+        X_parts.append(X[sampled])
+        y_parts.append(y[sampled])
+
+    start = time.perf_counter()
+    rf_model = RandomForestClassifier(
+        n_estimators=100,
+        max_depth=20,
+        min_samples_split=5,
+        min_samples_leaf=2,
+        random_state=42,
+        class_weight='balanced',
+        n_jobs=-1
+    )
+    rf_model.fit(np.concatenate(X_parts), np.concatenate(y_parts))
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accuracy, _ = stream_accuracy(rf_model.predict, path, chunk_size, None)
+    predict_seconds = time.perf_counter() - start
+
+    rf_path = 'models/fraud_detection_rf.pkl'
+    joblib.dump(rf_model, rf_path)
+    return {'model': 'rf', 'path': rf_path, 'accuracy': accuracy,
+            'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds}
+
+
+def train_svm_streaming(path, chunk_size, scaler, counts, epochs=5, n_components=500):
+    """
+    Kernel-approximated SVM: random Fourier features + SGD modified Huber loss
+
+    RBFSampler only needs the input width to fit, so the feature map is
+    built up front and applied chunk by chunk. Modified Huber is a smoothed
+    hinge loss that, unlike hinge, supports predict_proba (shadow scoring
+    needs probabilities).
+    """
+    from sklearn.kernel_approximation import RBFSampler
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import make_pipeline
+
+    num_features = len(scaler.mean_)
+    start = time.perf_counter()
+    feature_map = RBFSampler(gamma=1.0 / num_features, n_components=n_components, random_state=42)
+    feature_map.fit(np.zeros((1, num_features)))
+    linear_svm = SGDClassifier(loss='modified_huber', alpha=1e-4, random_state=42,
+                               class_weight=balanced_class_weight(counts))
+    train_linear_streaming(linear_svm, path, chunk_size, scaler, epochs, transform=feature_map)
+    svm_model = make_pipeline(feature_map, linear_svm)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accuracy, _ = stream_accuracy(svm_model.predict, path, chunk_size, scaler)
+    predict_seconds = time.perf_counter() - start
+
+    svm_path = 'models/fraud_detection_svm.pkl'
+    joblib.dump(svm_model, svm_path)
+    return {'model': 'svm', 'path': svm_path, 'accuracy': accuracy,
+            'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds}
+
+
+def make_cnn_dataset(path, chunk_size, scaler, split, batch_size=32, shuffle_buffer=0):
+    """tf.data pipeline of (X, y) batches streamed from one split"""
+    import tensorflow as tf
+
+    num_features = len(scaler.mean_)
+
+    def generate():
+        for X, y in iter_split(path, chunk_size, split, scaler):
+            yield X.astype(np.float32).reshape(-1, num_features, 1), y.astype(np.float32)
+
+    dataset = tf.data.Dataset.from_generator(generate, output_signature=(
+        tf.TensorSpec(shape=(None, num_features, 1), dtype=tf.float32),
+        tf.TensorSpec(shape=(None,), dtype=tf.float32)
+    )).unbatch()
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer, seed=42)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def train_cnn_streaming(path, chunk_size, scaler, counts, epochs=50):
+    """Train the CNN from a streamed tf.data pipeline and export the NumPy runtime"""
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+    from cnn_runtime import export_numpy_model
+    from models.train_models import build_cnn
+
+    num_features = len(scaler.mean_)
+    cnn_model = build_cnn(num_features)
+    cnn_model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+
+    early_stopping = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
+    checkpoint = ModelCheckpoint(
+        'models/fraud_detection_cnn_best.h5',
+        monitor='val_accuracy',
+        save_best_only=True,
+        mode='max'
+    )
+
+    start = time.perf_counter()
+    cnn_model.fit(
+        make_cnn_dataset(path, chunk_size, scaler, 'train', shuffle_buffer=10_000),
+        epochs=epochs,
+        validation_data=make_cnn_dataset(path, chunk_size, scaler, 'val', batch_size=4096),
+        callbacks=[early_stopping, checkpoint],
+        verbose=2
+    )
+    fit_seconds = time.perf_counter() - start
+    cnn_model.load_weights('models/fraud_detection_cnn_best.h5')
+
+    def predict(X):
+        X = X.astype(np.float32).reshape(-1, num_features, 1)
+        return (cnn_model.predict(X, batch_size=4096, verbose=0) > 0.5).astype(np.int8).flatten()
+
+    start = time.perf_counter()
+    accuracy, confusion = stream_accuracy(predict, path, chunk_size, scaler, confusion_split='test')
+    predict_seconds = time.perf_counter() - start
+
+    cnn_path = 'models/fraud_detection_cnn.h5'
+    cnn_model.save(cnn_path)
+    export_numpy_model(cnn_model, scaler, 'models/fraud_detection_cnn.npz')
+
+    return {'model': 'cnn', 'path': cnn_path, 'accuracy': accuracy,
+            'fit_seconds': fit_seconds, 'predict_seconds': predict_seconds,
+            'confusion': confusion}
+
+
+STREAMING_MODELS = ('lr', 'rf', 'svm', 'cnn')
+
+
+def run_streaming(path, models, chunk_size=100_000, epochs=5, cnn_epochs=50, svm_components=500,
+                  rf_max_rows=1_000_000):
+    """
+    Train the requested models out-of-core
+
+    Every model is retrained, so none is left paired with a scaler from an
+    earlier dataset. Random Forest uses a sample of rf_max_rows train rows.
+
+    Returns:
+        tuple: (results, timings, counts)
+    """
+    timings = {}
+    start = time.perf_counter()
+    scaler, counts = fit_scaler(path, chunk_size)
+    timings['Scaler pass'] = time.perf_counter() - start
+
+    results = {}
+    for name in models:
+        if name not in STREAMING_MODELS:
+            print(f"  - {MODEL_NAMES[name]}: not supported in streaming mode, skipped")
+            continue
+        if name == 'cnn':
+            results[name] = train_cnn_streaming(path, chunk_size, scaler, counts, cnn_epochs)
+        elif name == 'rf':
+            results[name] = train_random_forest_streaming(path, chunk_size, counts, rf_max_rows)
+        elif name == 'svm':
+            results[name] = train_svm_streaming(path, chunk_size, scaler, counts, epochs, svm_components)
+        else:
+            results[name] = train_logistic_regression_streaming(path, chunk_size, scaler, counts, epochs)
+        print(f"  ✓ {MODEL_NAMES[name]} finished")
+
+    return results, timings, counts
@@ -0,0 +1,259 @@
+"""
+OTP Store
+Issues and verifies login OTPs from an in-process TTL map, optionally
+replicated to the otp_storage table so any worker can verify them
+
+Login used to insert every OTP into otp_storage and never delete anything,
+so verification searched an ever-growing table. Here an OTP lives in memory
+until it is used or expires; with replicate=True (several worker processes)
+it is also written to otp_storage, and verification consumes the row with a
+single atomic UPDATE so an OTP can be used once across all workers. The
+worker that issued an OTP remembers its row id and consumes it by primary
+key; only OTPs issued elsewhere need the (mobile, otp) index search.
+purge_expired() deletes expired rows (verified ones included) in bounded
+batches, keeping the table at roughly the OTPs issued in the last TTL.
+"""
+
+import threading
+import time
+
+from velocity import format_timestamp
+
+INSERT_OTP_SQL = '''
+    INSERT INTO otp_storage (mobile, otp, expires_at)
+    VALUES (?, ?, ?)
+'''
+
+# Consume an OTP this worker issued (row id known from the insert)
+CONSUME_OTP_BY_ID_SQL = '''
+    UPDATE otp_storage SET verified = 1
+    WHERE id = ? AND verified = 0
+'''
+
+# Consume an OTP issued by another worker: newest matching unexpired row
+CONSUME_OTP_SQL = '''
+    UPDATE otp_storage SET verified = 1
+    WHERE id = (
+        SELECT id FROM otp_storage
+        WHERE mobile = ? AND otp = ? AND verified = 0 AND expires_at > ?
+        ORDER BY created_at DESC
+        LIMIT 1
+    )
+'''
+
+PURGE_OTP_SQL = '''
+    DELETE FROM otp_storage
+    WHERE id IN (
+        SELECT id FROM otp_storage
+        WHERE expires_at <= ?
+        LIMIT ?
+    )
+'''
+
+
+def purge_expired(conn, now=None, batch_size=1000, max_batches=None):
+    """
+    Delete expired OTP rows, committing after every batch
+
+    Each batch holds the write lock only for batch_size deletes, so payments
+    and logins interleave with a long purge instead of waiting for it.
+
+    Args:
+        conn: Database connection
+        now: Rows with expires_at at or before this epoch time are deleted
+            (default: current time)
+        batch_size: Rows deleted per transaction
+        max_batches: Stop after this many batches (default: until done)
+
+    Returns:
+        int: rows deleted
+    """
+    cutoff = format_timestamp(time.time() if now is None else now)
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with conn:
+            count = conn.execute(PURGE_OTP_SQL, (cutoff, batch_size)).rowcount
+        deleted += count
+        batches += 1
+        if count < batch_size:
+            break
+    return deleted
+
+
+class OTPStore:
+    """
+    Thread-safe OTP store with per-OTP expiry
+
+    Args:
+        ttl_seconds: How long an issued OTP stays valid
+        replicate: Also write OTPs to otp_storage and consume them there, so
+            an OTP issued by one worker process verifies on another
+        max_entries: Mobiles held in memory; beyond this expired entries are
+            dropped, then the oldest (replicated OTPs still verify from the
+            database)
+        clock: Returns the current epoch time in seconds (for tests)
+    """
+
+    def __init__(self, ttl_seconds=600, replicate=False, max_entries=100000, clock=time.time):
+        self.ttl_seconds = ttl_seconds
+        self.replicate = replicate
+        self.max_entries = max_entries
+        self._clock = clock
+        self._codes = {}  # mobile -> {otp: (expires_at, otp_storage row id or None)}
+        self._lock = threading.Lock()
+
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+        self.memory_hits = 0
+        self.evictions = 0
+
+    def issue(self, mobile, otp, conn=None):
+        """
+        Store a new OTP for a mobile number (earlier unexpired ones stay valid)
+
+        Args:
+            conn: Database connection, required when replicating
+
+        Returns:
+            float: epoch time the OTP expires at
+        """
+        now = self._clock()
+        expires_at = now + self.ttl_seconds
+        row_id = None
+        if self.replicate:
+            with conn:
+                row_id = conn.execute(INSERT_OTP_SQL, (mobile, otp, format_timestamp(expires_at))).lastrowid
+
+        with self._lock:
+            codes = self._codes.pop(mobile, None) or {}
+            codes[otp] = (expires_at, row_id)
+            self._codes[mobile] = codes  # Most recently issued last
+            if len(self._codes) > self.max_entries:
+                self._purge_memory(now)
+                while len(self._codes) > self.max_entries:
+                    del self._codes[next(iter(self._codes))]
+                    self.evictions += 1
+            self.issued += 1
+        return expires_at
+
+    def verify(self, mobile, otp, conn=None):
+        """
+        Consume an OTP: True once for a valid, unexpired code, False otherwise
+
+        Args:
+            conn: Database connection, required when replicating
+        """
+        now = self._clock()
+        with self._lock:
+            codes = self._codes.get(mobile)
+            expires_at, row_id = codes.pop(otp, (None, None)) if codes else (None, None)
+            if codes is not None and not codes:
+                del self._codes[mobile]
+        in_memory = expires_at is not None and expires_at > now
+        if in_memory:
+            self.memory_hits += 1
+
+        if not self.replicate:
+            valid = in_memory
+        elif in_memory:
+            # Issued here; another worker may still have consumed the row
+            with conn:
+                valid = conn.execute(CONSUME_OTP_BY_ID_SQL, (row_id,)).rowcount == 1
+        elif expires_at is not None:
+            valid = False
+        else:
+            with conn:
+                valid = conn.execute(CONSUME_OTP_SQL, (mobile, otp, format_timestamp(now))).rowcount == 1
+
+        if valid:
+            self.verified += 1
+        else:
+            self.rejected += 1
+        return valid
+
+    def _purge_memory(self, now):
+        expired = 0
+        for mobile in list(self._codes):
+            codes = self._codes[mobile]
+            for otp in [otp for otp, (expires_at, _) in codes.items() if expires_at <= now]:
+                del codes[otp]
+                expired += 1
+            if not codes:
+                del self._codes[mobile]
+        return expired
+
+    def purge(self, conn=None, batch_size=1000):
+        """
+        Drop expired OTPs from memory and, when replicating, from otp_storage
+
+        Returns:
+            int: OTPs removed
+        """
+        now = self._clock()
+        with self._lock:
+            removed = self._purge_memory(now)
+        if self.replicate and conn is not None:
+            removed += purge_expired(conn, now, batch_size)
+        return removed
+
+    def stats(self):
+        return {
+            'replicate': self.replicate,
+            'mobiles': len(self._codes),
+            'max_entries': self.max_entries,
+            'issued': self.issued,
+            'verified': self.verified,
+            'rejected': self.rejected,
+            'memory_hits': self.memory_hits,
+            'evictions': self.evictions
+        }
+
+
+class OTPPurger:
+    """
+    Background thread calling purge() every interval_seconds
+
+    Args:
+        purge: Callable doing one purge pass (errors are logged, not raised)
+        interval_seconds: Pause between passes
+    """
+
+    def __init__(self, purge, interval_seconds=60.0):
+        self.purge = purge
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.purged = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the thread (idempotent; restarts it in a forked worker)"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name='otp-purger', daemon=True)
+                self._worker.start()
+
+    def stop(self, timeout=5.0):
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is not None:
+            self._stop.set()
+            worker.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.purged += self.purge()
+            except Exception as e:
+                self.errors += 1
+                print(f"Error purging OTPs: {e}")
+            self.runs += 1
+
+    def stats(self):
+        return {'runs': self.runs, 'purged': self.purged, 'errors': self.errors}
@@ -0,0 +1,76 @@
+"""
+Keyset Pagination Helpers
+Cursor-based paging on (created_at, id) for dashboard listings
+"""
+
+import base64
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor pointing just past the given row"""
+    raw = f"{created_at}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns:
+        tuple: (created_at, id)
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().rsplit('|', 1)
+        return created_at, int(row_id)
+    except Exception:
+        raise ValueError('Invalid pagination cursor')
+
+
+def fetch_page(cursor, select_sql, alias, where=None, params=(), after=None, limit=20):
+    """
+    Fetch one page of rows newest-first using a keyset cursor
+
+    Instead of OFFSET (which re-reads every skipped row), the next page
+    starts strictly after the last (created_at, id) seen, so every page
+    is a bounded index range read.
+
+    Args:
+        cursor: sqlite3 cursor
+        select_sql: "SELECT <fields> FROM <table> <alias> [JOIN ...]"
+        alias: Alias of the paged table in select_sql
+        where: Optional list of extra WHERE conditions
+        params: Parameters for the extra conditions
+        after: Cursor string from the previous page (None for the first page)
+        limit: Page size
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    conditions = list(where or [])
+    params = list(params)
+
+    if after:
+        created_at, row_id = decode_cursor(after)
+        conditions.append(f"({alias}.created_at, {alias}.id) < (?, ?)")
+        params.extend([created_at, row_id])
+
+    sql = select_sql
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    sql += f" ORDER BY {alias}.created_at DESC, {alias}.id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+
+    return rows, next_cursor
@@ -0,0 +1,157 @@
+"""
+Profile Lookup Cache
+In-process LRU/TTL cache of the user and merchant attributes used for scoring
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from features import upi_id_hash
+
+# Compact records: only the columns process_payment needs
+UserProfile = namedtuple('UserProfile', ['id', 'age', 'state_code', 'zip_code'])
+MerchantProfile = namedtuple('MerchantProfile', ['id', 'upi_id', 'merchant_age', 'upi_id_hash'])
+
+
+class LRUTTLCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted
+        ttl_seconds: Seconds an entry stays valid after it was stored
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value or None (counts hit/miss)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Drop one entry if present"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+
+class ProfileCache:
+    """
+    Cached user/merchant profile lookups for the payment path
+
+    Users are keyed by id and merchants by UPI ID. Writers call the
+    invalidate_* methods after changing a row so the next payment re-reads
+    it. With enabled=False every lookup goes straight to the database.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300, enabled=True):
+        self.enabled = enabled
+        self.users = LRUTTLCache(max_entries, ttl_seconds)
+        self.merchants = LRUTTLCache(max_entries, ttl_seconds)
+
+    def get_user(self, cursor, user_id):
+        """Return the UserProfile for user_id (or None if missing)"""
+        if self.enabled:
+            profile = self.users.get(user_id)
+            if profile is not None:
+                return profile
+
+        cursor.execute('SELECT id, age, state_code, zip_code FROM users WHERE id = ?', (user_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        profile = UserProfile(*row)
+        if self.enabled:
+            self.users.put(user_id, profile)
+        return profile
+
+    def get_merchant(self, cursor, upi_id):
+        """Return the MerchantProfile for a UPI ID (or None if missing)"""
+        if self.enabled:
+            profile = self.merchants.get(upi_id)
+            if profile is not None:
+                return profile
+
+        cursor.execute('SELECT id, upi_id, merchant_age, upi_id_hash FROM merchants WHERE upi_id = ?', (upi_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        profile = MerchantProfile(*row)
+        if profile.upi_id_hash is None:
+            # Inserted without the precomputed hash (e.g. by a script)
+            profile = profile._replace(upi_id_hash=upi_id_hash(profile.upi_id))
+        if self.enabled:
+            self.merchants.put(upi_id, profile)
+        return profile
+
+    def invalidate_user(self, user_id):
+        """Forget a cached user after it was created or changed"""
+        self.users.invalidate(user_id)
+
+    def invalidate_merchant(self, upi_id):
+        """Forget a cached merchant after it was created or changed"""
+        self.merchants.invalidate(upi_id)
+
+    def stats(self):
+        """Cache counters for both profile kinds"""
+        return {
+            'enabled': self.enabled,
+            'users': self.users.stats(),
+            'merchants': self.merchants.stats()
+        }
@@ -0,0 +1,235 @@
+"""
+Offline Re-scoring
+Replays the stored transactions through a (re)trained model and records its
+decisions in shadow_scores, next to the live ones in transactions
+
+Feature vectors are rebuilt with the same helpers process_payment uses
+(features.py): the amount, category, merchant UPI, location and time of day
+stored on each transaction, the user's and merchant's ages from the joined
+profiles, and velocity features from replaying the transactions in order
+through a VelocityFeatureStore (the live stores are per process, so this
+replay sees every worker's payments). Work is done in chunks of
+RESCORE_CHUNK_SIZE rows:
+
+- rows are read with keyset queries on transactions.id (SQLite has no
+  server-side cursors, and a short query per chunk keeps a long read
+  snapshot from pinning the WAL while the app is writing)
+- features are scored across a process pool, several chunks in flight
+- each chunk's shadow scores and the checkpoint are committed together, so
+  an interrupted run resumes after the last chunk written
+
+CLI:
+    python rescoring.py --model models/fraud_detection_cnn.npz --name cnn-v2
+    python rescoring.py --model new.npz --restart     # discard the checkpoint
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import time as time_of_day
+
+import numpy as np
+
+from config import DATABASE_PATH, FRAUD_THRESHOLD, RESCORE_CHUNK_SIZE, RESCORE_WORKERS, VELOCITY_MAX_KEYS
+from database import migrate, open_tuned_connection
+from features import fraud_features, payment_transaction_data, upi_id_hash
+from profile_cache import MerchantProfile, UserProfile
+from shadow_scoring import INSERT_SHADOW_SQL
+from velocity import VelocityFeatureStore, parse_timestamp
+
+SELECT_CHUNK_SQL = '''
+    SELECT t.id, t.transaction_id, t.user_id, t.merchant_id, t.amount, t.category, t.upi_id,
+           t.state_code, t.zip_code, t.time_hour, t.time_minute, t.is_fraud, t.created_at,
+           u.age AS user_age, m.merchant_age
+    FROM transactions t
+    JOIN users u ON u.id = t.user_id
+    JOIN merchants m ON m.id = t.merchant_id
+    WHERE t.id > ?
+    ORDER BY t.id
+    LIMIT ?
+'''
+
+SAVE_CHECKPOINT_SQL = '''
+    INSERT INTO rescore_checkpoints (model_name, last_id, rows_scored, updated_at)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT (model_name) DO UPDATE SET
+        last_id = excluded.last_id,
+        rows_scored = rescore_checkpoints.rows_scored + excluded.rows_scored,
+        updated_at = excluded.updated_at
+'''
+
+
+def row_features(row, velocity):
+    """Feature vector for a stored transaction, built as process_payment builds it"""
+    # Location is the user's profile at payment time, as copied onto the row
+    user = UserProfile(row['user_id'], row['user_age'], row['state_code'], row['zip_code'])
+    merchant = MerchantProfile(row['merchant_id'], row['upi_id'], row['merchant_age'], upi_id_hash(row['upi_id']))
+    paid_at = time_of_day(row['time_hour'], row['time_minute'])
+    return fraud_features(payment_transaction_data(
+        user, merchant, row['amount'], row['category'], paid_at, velocity
+    ))
+
+
+def prime_velocity(conn, store, last_id):
+    """Replay the day of history before a checkpoint into a fresh store"""
+    row = conn.execute('SELECT created_at FROM transactions WHERE id <= ? ORDER BY id DESC LIMIT 1',
+                       (last_id,)).fetchone()
+    if row is None:
+        return 0
+    return store.rebuild(conn, now=parse_timestamp(row[0]), until_id=last_id)
+
+
+def load_checkpoint(conn, model_name):
+    """(last_id, rows_scored) of a previous run, or (0, 0)"""
+    row = conn.execute('SELECT last_id, rows_scored FROM rescore_checkpoints WHERE model_name = ?',
+                       (model_name,)).fetchone()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+def reset(conn, model_name):
+    """Forget a model's checkpoint and shadow scores"""
+    with conn:
+        conn.execute('DELETE FROM shadow_scores WHERE model_name = ?', (model_name,))
+        conn.execute('DELETE FROM rescore_checkpoints WHERE model_name = ?', (model_name,))
+
+
+# ==================== Pool Workers ====================
+
+_scorer = None
+
+
+def _init_worker(numpy_model_path):
+    """Load the model once per pool process"""
+    global _scorer
+    from bulk_scoring import load_scorer
+    _scorer = load_scorer(numpy_model_path)
+
+
+def score_chunk(features):
+    """Fraud probabilities for one chunk (runs in a pool process)"""
+    # Models trained without the velocity columns take the leading ones
+    return np.asarray(_scorer.predict(features[:, :_scorer.num_features]), dtype=np.float64).reshape(-1)
+
+
+# ==================== Driver ====================
+
+def rescore(conn, model_name, executor, predict=score_chunk, chunk_size=RESCORE_CHUNK_SIZE,
+            max_in_flight=None, threshold=FRAUD_THRESHOLD, progress=None):
+    """
+    Score every transaction after the model's checkpoint into shadow_scores
+
+    Args:
+        conn: Connection to the application database (migrated)
+        model_name: Key for the shadow scores and checkpoint
+        executor: concurrent.futures executor running `predict`
+        predict: Picklable callable mapping an (n, 9) raw feature array to n probabilities
+        chunk_size: Rows per read, model call and commit
+        max_in_flight: Chunks submitted ahead of the writer (default 2 per worker)
+        threshold: Probability above which the shadow decision is "block"
+        progress: Optional callable(stats) after each committed chunk
+
+    Returns:
+        dict: rows, flagged, changed (shadow decision differs from the live
+        one), resumed_from, last_id, seconds, rows_per_sec
+    """
+    if max_in_flight is None:
+        max_in_flight = 2 * max(getattr(executor, '_max_workers', 1), 1)
+
+    resumed_from, _ = load_checkpoint(conn, model_name)
+    velocity = VelocityFeatureStore(max_keys=VELOCITY_MAX_KEYS)
+    if resumed_from:
+        prime_velocity(conn, velocity, resumed_from)
+    stats = {'rows': 0, 'flagged': 0, 'changed': 0, 'resumed_from': resumed_from, 'last_id': resumed_from}
+    start = time.perf_counter()
+    pending = deque()
+    read_id = resumed_from
+    exhausted = False
+
+    while not exhausted or pending:
+        if not exhausted:
+            rows = conn.execute(SELECT_CHUNK_SQL, (read_id, chunk_size)).fetchall()
+            if rows:
+                features = np.array([
+                    row_features(row, velocity.observe(row['user_id'], row['merchant_id'], row['amount'],
+                                                       parse_timestamp(row['created_at'])))
+                    for row in rows
+                ], dtype=np.float64)
+                pending.append((rows, executor.submit(predict, features)))
+                read_id = rows[-1]['id']
+            exhausted = len(rows) < chunk_size
+
+        # Write in read order so the checkpoint only ever moves forward
+        while pending and (exhausted or len(pending) >= max_in_flight):
+            rows, future = pending.popleft()
+            probabilities = future.result()
+            decisions = probabilities > threshold
+            with conn:
+                conn.executemany(INSERT_SHADOW_SQL, [
+                    (model_name, row['transaction_id'], float(p), int(d))
+                    for row, p, d in zip(rows, probabilities, decisions)
+                ])
+                conn.execute(SAVE_CHECKPOINT_SQL, (model_name, rows[-1]['id'], len(rows)))
+
+            stats['rows'] += len(rows)
+            stats['flagged'] += int(decisions.sum())
+            stats['changed'] += sum(bool(row['is_fraud']) != bool(d) for row, d in zip(rows, decisions))
+            stats['last_id'] = rows[-1]['id']
+            if progress is not None:
+                progress(stats)
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_sec'] = stats['rows'] / max(stats['seconds'], 1e-9)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UPI Guard - Offline Re-scoring')
+    parser.add_argument('--model', required=True, help='NumPy model export (.npz) to score with')
+    parser.add_argument('--name', default=None, help='Shadow model name (default: model file name)')
+    parser.add_argument('--database', default=DATABASE_PATH)
+    parser.add_argument('--workers', type=int, default=RESCORE_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=RESCORE_CHUNK_SIZE)
+    parser.add_argument('--restart', action='store_true', help='Discard the checkpoint and previous shadow scores')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        parser.error(f"No model at {args.model}")
+    model_name = args.name or os.path.splitext(os.path.basename(args.model))[0]
+
+    conn = open_tuned_connection(args.database)
+    migrate(conn)
+    if args.restart:
+        reset(conn, model_name)
+    last_id, rows_scored = load_checkpoint(conn, model_name)
+    if last_id:
+        print(f"Resuming '{model_name}' after transaction id {last_id} ({rows_scored:,} rows already scored)",
+              file=sys.stderr)
+
+    reported = [0]
+
+    def report(stats):
+        # One line per 100k rows
+        if stats['rows'] // 100000 == reported[0]:
+            return
+        reported[0] = stats['rows'] // 100000
+        rate = stats['rows'] / max(time.perf_counter() - started, 1e-9)
+        print(f"  {stats['rows']:,} rows (id {stats['last_id']}), {rate:,.0f} rows/sec", file=sys.stderr)
+
+    started = time.perf_counter()
+    # spawn: workers start clean instead of inheriting the driver's connection
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(args.model,)) as executor:
+        stats = rescore(conn, model_name, executor, chunk_size=args.chunk_size, progress=report)
+    conn.close()
+
+    print(f"Re-scored {stats['rows']:,} transactions with '{model_name}' in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec): {stats['flagged']:,} would be blocked, "
+          f"{stats['changed']:,} decisions differ from live", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: dataset load time and on-disk size per format
+
+Writes the same generated dataset as CSV, Parquet (when pyarrow is
+installed) and typed per-column .npy files, then times loading each into
+the (X, y) arrays the trainer uses. Load times are best of --repeat runs
+(warm page cache).
+
+Usage: python scripts/bench_dataset_formats.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from data.generate_dataset import iter_chunks, write_chunks  # noqa: E402
+from models.train_models import NON_FEATURE_COLUMNS, load_dataset  # noqa: E402
+
+
+def load_parquet(path):
+    """Parquet -> (X, y) the same way the CSV path builds them"""
+    import pandas as pd
+
+    df = pd.read_parquet(path)
+    feature_columns = [c for c in df.columns if c not in NON_FEATURE_COLUMNS]
+    return df[feature_columns].to_numpy(dtype=np.float64), df['fraud'].to_numpy(dtype=np.int8)
+
+
+def disk_size(path):
+    """Bytes on disk of a file or directory"""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def best_time(load, path, repeat):
+    """Fastest of several load calls, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        X, y = load(path)[:2]
+        float(X[-1, -1]), int(y[-1])  # Touch the data
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='upi_guard_formats_')
+    formats = [('CSV', 'csv', os.path.join(scratch, 'data.csv'), load_dataset)]
+    try:
+        import pyarrow  # noqa: F401
+        formats.append(('Parquet', 'parquet', os.path.join(scratch, 'data.parquet'), load_parquet))
+    except ImportError:
+        print("pyarrow not installed: skipping Parquet")
+    formats.append(('npy columns', 'npy', os.path.join(scratch, 'columns'), load_dataset))
+
+    try:
+        print(f"\n{'Format':<14} {'Size (MB)':>10} {'Load (s)':>9}")
+        print("-" * 35)
+        for label, fmt, path, load in formats:
+            write_chunks(iter_chunks(args.rows, chunk_size=250_000), path, fmt, args.rows)
+            seconds = best_time(load, path, args.repeat)
+            print(f"{label:<14} {disk_size(path) / 1e6:>10.1f} {seconds:>9.3f}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Microbenchmark: per-call fraud scoring latency
+
+Compares the original detect_fraud path (np.array -> scaler.transform ->
+reshape -> Keras predict) with the NumPy runtime and the fused scorer.
+
+Uses models/fraud_detection_cnn.h5 + models/scaler.pkl when present,
+otherwise a randomly initialised model with the training layer stack.
+
+Usage: python scripts/bench_inference.py [--calls 2000]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cnn_runtime import NumpyCNN, FusedCNNScorer, export_numpy_model
+from config import MODEL_PATH, SCALER_PATH
+
+SAMPLE = {
+    'amount': 1250.50, 'time_hour': 14, 'time_minute': 30, 'user_age': 34,
+    'merchant_age': 400, 'state_code': 12, 'zip_code': 560, 'category': 3,
+    'upi_id_hash': 48213
+}
+
+
+def load_or_build():
+    """Return (keras_model, scaler) for benchmarking"""
+    from tensorflow import keras
+    import joblib
+
+    if os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH):
+        print(f"Using trained model: {MODEL_PATH}")
+        return keras.models.load_model(MODEL_PATH), joblib.load(SCALER_PATH)
+
+    from sklearn.preprocessing import StandardScaler
+    from tensorflow.keras import layers
+
+    print("Trained model not found - using random weights with the training layer stack")
+    rng = np.random.default_rng(0)
+    raw = rng.normal(size=(1000, 9)) * [900, 6, 17, 18, 1000, 10, 260, 3, 28000] + 1000
+    scaler = StandardScaler().fit(raw)
+    model = keras.Sequential([
+        keras.Input(shape=(9, 1)),
+        layers.Conv1D(64, 3, activation='relu'),
+        layers.MaxPooling1D(2, padding='same'),
+        layers.Conv1D(32, 3, activation='relu'),
+        layers.MaxPooling1D(2, padding='same'),
+        layers.Flatten(),
+        layers.Dense(128, activation='relu'),
+        layers.Dense(64, activation='relu'),
+        layers.Dense(1, activation='sigmoid')
+    ])
+    return model, scaler
+
+
+def time_calls(label, fn, calls):
+    """Run fn() `calls` times and print per-call latency percentiles"""
+    for _ in range(min(50, calls)):
+        fn()
+
+    samples = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+
+    samples *= 1_000_000
+    print(f"{label:<38} p50 {np.percentile(samples, 50):>9.1f} us   "
+          f"p99 {np.percentile(samples, 99):>9.1f} us   mean {samples.mean():>9.1f} us")
+    return np.percentile(samples, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    model, scaler = load_or_build()
+    buffer = io.BytesIO()
+    export_numpy_model(model, scaler, buffer)
+    buffer.seek(0)
+    runtime = NumpyCNN.load(buffer)
+    fused = FusedCNNScorer.from_numpy_model(runtime)
+
+    def current_path():
+        features = np.array([[SAMPLE[k] for k in SAMPLE]])
+        scaled = scaler.transform(features)
+        reshaped = scaled.reshape(scaled.shape[0], scaled.shape[1], 1)
+        return float(model.predict(reshaped, verbose=0)[0][0])
+
+    def numpy_path():
+        return float(runtime.predict([[SAMPLE[k] for k in SAMPLE]])[0])
+
+    def fused_path():
+        return fused.score([SAMPLE[k] for k in SAMPLE])
+
+    print(f"\nScores: current={current_path():.6f} numpy={numpy_path():.6f} fused={fused_path():.6f}\n")
+
+    baseline = time_calls('scaler.transform + Model.predict', current_path, min(args.calls, 300))
+    numpy_p50 = time_calls('NumpyCNN.predict', numpy_path, args.calls)
+    fused_p50 = time_calls('FusedCNNScorer.score', fused_path, args.calls)
+
+    print(f"\nSpeedup (p50): numpy {baseline / numpy_p50:.0f}x, fused {baseline / fused_p50:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
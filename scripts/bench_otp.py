@@ -0,0 +1,143 @@
+"""
+Benchmark: OTP verification latency with a large otp_storage history
+
+Fills otp_storage with --rows historical OTPs (expired, mostly verified),
+then times verifying freshly issued OTPs:
+
+- legacy: the original SELECT ... ORDER BY created_at DESC LIMIT 1 plus
+  UPDATE by id, against the full table
+- replicated (by id / by search): OTPStore(replicate=True) on the worker that
+  issued the OTP and on another worker, against the full table
+- the same after otp.purge_expired() (timed) has emptied the history
+- memory: OTPStore without replication
+
+The history pages are cold the first time a mobile is looked up, which is
+what p99 mostly shows.
+
+Usage: python scripts/bench_otp.py [--rows 10000000] [--verifies 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH_DIR = tempfile.mkdtemp(prefix='upi_guard_bench_')
+os.environ['DATABASE_PATH'] = os.path.join(SCRATCH_DIR, 'otp.db')
+sys.path.insert(0, ROOT)
+
+import database  # noqa: E402
+from otp import OTPStore, purge_expired  # noqa: E402
+from velocity import format_timestamp  # noqa: E402
+
+LEGACY_SELECT_SQL = '''
+    SELECT * FROM otp_storage
+    WHERE mobile = ? AND otp = ? AND verified = 0
+    AND expires_at > datetime('now')
+    ORDER BY created_at DESC
+    LIMIT 1
+'''
+LEGACY_UPDATE_SQL = 'UPDATE otp_storage SET verified = 1 WHERE id = ?'
+
+HISTORY_DAYS = 90
+MOBILES = 1_000_000
+
+
+def fill_history(conn, rows, chunk_size=100000):
+    """Insert rows expired OTPs spread over the last HISTORY_DAYS"""
+    rng = random.Random(0)
+    now = time.time()
+    start = time.perf_counter()
+    for offset in range(0, rows, chunk_size):
+        batch = []
+        for _ in range(min(chunk_size, rows - offset)):
+            created = now - rng.uniform(660, HISTORY_DAYS * 86400)
+            batch.append((
+                f'9{rng.randrange(MOBILES):09d}', f'{rng.randrange(1000000):06d}',
+                format_timestamp(created + 600), int(rng.random() < 0.7), format_timestamp(created)
+            ))
+        with conn:
+            conn.executemany('''
+                INSERT INTO otp_storage (mobile, otp, expires_at, verified, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', batch)
+    return time.perf_counter() - start
+
+
+def fresh_otps(count, seed):
+    rng = random.Random(seed)
+    return [(f'9{rng.randrange(MOBILES):09d}', f'{rng.randrange(1000000):06d}') for _ in range(count)]
+
+
+def legacy_verify(conn, mobile, otp):
+    row = conn.execute(LEGACY_SELECT_SQL, (mobile, otp)).fetchone()
+    if row is not None:
+        conn.execute(LEGACY_UPDATE_SQL, (row['id'],))
+    conn.commit()
+    return row is not None
+
+
+def measure(label, otps, verify):
+    timings = []
+    for mobile, otp in otps:
+        start = time.perf_counter()
+        assert verify(mobile, otp), (label, mobile, otp)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    p50, p99 = np.percentile(timings, [50, 99])
+    print(f"{label:<34} p50 {p50:>8.1f} us   p99 {p99:>8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--verifies', type=int, default=2000)
+    args = parser.parse_args()
+
+    database.create_tables()
+    conn = database.get_db_connection()
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+
+    print(f"\nInserting {args.rows:,} historical OTPs ...")
+    print(f"  {fill_history(conn, args.rows):.1f}s, "
+          f"{os.path.getsize(database.DB_PATH) / 1e6:,.0f} MB database")
+
+    issuer = OTPStore(replicate=True)
+    other = OTPStore(replicate=True)
+
+    def run_all(suffix):
+        legacy = fresh_otps(args.verifies, seed=f'legacy{suffix}')
+        by_id = fresh_otps(args.verifies, seed=f'id{suffix}')
+        by_search = fresh_otps(args.verifies, seed=f'search{suffix}')
+        for mobile, otp in legacy + by_id + by_search:
+            issuer.issue(mobile, otp, conn)
+        rows = conn.execute('SELECT COUNT(*) FROM otp_storage').fetchone()[0]
+        print(f"\n{rows:,} rows in otp_storage")
+        measure('legacy SELECT + UPDATE', legacy, lambda m, o: legacy_verify(conn, m, o))
+        measure('replicated, issuing worker (by id)', by_id, lambda m, o: issuer.verify(m, o, conn))
+        measure('replicated, other worker (search)', by_search, lambda m, o: other.verify(m, o, conn))
+
+    run_all('')
+
+    start = time.perf_counter()
+    deleted = purge_expired(conn, batch_size=10000)
+    elapsed = time.perf_counter() - start
+    print(f"\npurge_expired: {deleted:,} rows in {elapsed:.1f}s ({deleted / elapsed:,.0f} rows/s)")
+    run_all('-purged')
+
+    memory = OTPStore()
+    otps = fresh_otps(args.verifies, seed='memory')
+    for mobile, otp in otps:
+        memory.issue(mobile, otp)
+    print()
+    measure('memory only', otps, memory.verify)
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
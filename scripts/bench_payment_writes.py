@@ -0,0 +1,97 @@
+"""
+Benchmark: database writes per safe payment
+
+Compares the original commit path (INSERT status='pending', then
+UPDATE ... SET status='completed' WHERE transaction_id=?) with the
+single-write path used by /api/process_payment (INSERT with the final
+status). Counts write statements, WAL frames (pages written) and
+commits (one fsync each under synchronous=FULL) per payment.
+
+Usage: python scripts/bench_payment_writes.py [--payments 5000]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH_DIR = tempfile.mkdtemp(prefix='upi_guard_bench_')
+os.environ['DATABASE_PATH'] = os.path.join(SCRATCH_DIR, 'app.db')
+sys.path.insert(0, ROOT)
+
+import database  # noqa: E402
+from app import INSERT_TRANSACTION_SQL  # noqa: E402
+
+COMPLETE_SQL = '''
+    UPDATE transactions SET status = 'completed'
+    WHERE transaction_id = ?
+'''
+
+
+def legacy_payment(conn, row):
+    """Original flow: pending insert, then a second write by text key"""
+    conn.execute(INSERT_TRANSACTION_SQL, row[:-1] + ('pending',))
+    conn.execute(COMPLETE_SQL, (row[0],))
+    conn.commit()
+
+
+def single_write_payment(conn, row):
+    """Current flow: one insert with the final status, one commit"""
+    with conn:
+        conn.execute(INSERT_TRANSACTION_SQL, row)
+
+
+def measure(label, payment_fn, payments):
+    """Run payments on a fresh database and report per-payment write counts"""
+    database.DB_PATH = os.path.join(SCRATCH_DIR, label.replace(' ', '_') + '.db')
+    database.create_tables()
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = FULL')
+    conn.execute('PRAGMA wal_autocheckpoint = 0')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    counts = {'INSERT': 0, 'UPDATE': 0, 'COMMIT': 0}
+
+    def count_statement(sql):
+        verb = sql.lstrip().split(None, 1)[0].upper()
+        if verb in counts:
+            counts[verb] += 1
+
+    conn.set_trace_callback(count_statement)
+    changes_before = conn.total_changes
+
+    start = time.perf_counter()
+    for i in range(payments):
+        row = (f"TXN{i:020d}", 1, 1, 250.0, 2, 'm@upiguard', 12, 560, 14, 30, 0.1, 0, 'completed')
+        payment_fn(conn, row)
+    elapsed = time.perf_counter() - start
+
+    conn.set_trace_callback(None)
+    _, wal_frames, _ = conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+    rows_changed = conn.total_changes - changes_before
+    conn.close()
+
+    writes = counts['INSERT'] + counts['UPDATE']
+    print(f"{label:<18} writes/payment {writes / payments:>4.1f}   "
+          f"row changes/payment {rows_changed / payments:>4.1f}   "
+          f"WAL pages/payment {wal_frames / payments:>5.2f}   "
+          f"commits(fsync)/payment {counts['COMMIT'] / payments:>4.1f}   "
+          f"{payments / elapsed:>7.0f} payments/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--payments', type=int, default=5000)
+    args = parser.parse_args()
+
+    print()
+    measure('pending + UPDATE', legacy_payment, args.payments)
+    measure('single write', single_write_payment, args.payments)
+
+
+if __name__ == '__main__':
+    main()
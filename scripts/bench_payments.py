@@ -0,0 +1,114 @@
+"""
+Benchmark: payments per second through /api/process_payment
+
+Runs payments against a scratch database through the Flask test client,
+once with a brand-new sqlite3 connection per request (the original
+behaviour) and once with the pooled, tuned connections.
+
+Usage: python scripts/bench_payments.py [--payments 2000] [--threads 4]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH_DIR = tempfile.mkdtemp(prefix='upi_guard_bench_')
+os.environ['DATABASE_PATH'] = os.path.join(SCRATCH_DIR, 'bench.db')
+sys.path.insert(0, ROOT)
+
+import database  # noqa: E402
+import app as upi_app  # noqa: E402
+
+
+class ConnectPerRequest:
+    """Original behaviour: connect on every request, close afterwards"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def acquire(self):
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def release(self, conn):
+        conn.close()
+
+
+def seed_database():
+    """Create the schema plus one payer and one merchant"""
+    database.create_tables()
+    conn = database.get_db_connection()
+    conn.execute('''
+        INSERT INTO users (mobile, name, age, state_code, zip_code, upi_id)
+        VALUES ('9000000001', 'Bench User', 30, 12, 560, '9000000001@upiguard')
+    ''')
+    conn.execute('''
+        INSERT INTO merchants (mobile, business_name, merchant_age, upi_id)
+        VALUES ('9000000002', 'Bench Merchant', 400, '9000000002@upiguard')
+    ''')
+    conn.commit()
+    user_id = conn.execute('SELECT id FROM users').fetchone()[0]
+    conn.close()
+    return user_id
+
+
+def run(label, pool, payments, threads, user_id):
+    """Fire `payments` payments across `threads` clients and report throughput"""
+    upi_app.db_pool = pool
+    per_thread = payments // threads
+    errors = []
+
+    def client_loop():
+        with upi_app.app.test_client() as client:
+            with client.session_transaction() as sess:
+                sess['user_id'] = user_id
+            for _ in range(per_thread):
+                r = client.post('/api/process_payment', json={
+                    'merchant_upi': '9000000002@upiguard', 'amount': 250.0, 'category': 2
+                })
+                if r.status_code not in (200, 403):
+                    errors.append(r.status_code)
+
+    workers = [threading.Thread(target=client_loop) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    total = per_thread * threads
+    print(f"{label:<28} {total / elapsed:>9.0f} payments/sec   ({total} payments, "
+          f"{elapsed:.2f}s, {len(errors)} errors)")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--payments', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    user_id = seed_database()
+    db_path = os.environ['DATABASE_PATH']
+    print(f"\nScratch database: {db_path}\n")
+
+    before = run('connect per request', ConnectPerRequest(db_path), args.payments, args.threads, user_id)
+    pooled = database.ConnectionPool(
+        db_path,
+        busy_timeout_ms=upi_app.DB_BUSY_TIMEOUT_MS,
+        cache_size_kb=upi_app.DB_CACHE_SIZE_KB,
+        mmap_size=upi_app.DB_MMAP_SIZE
+    )
+    after = run('pooled + tuned (WAL)', pooled, args.payments, args.threads, user_id)
+    print(f"\nSpeedup: {after / before:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark: app cold start and gunicorn per-worker memory
+
+1. Times `import app` in a fresh interpreter and reports its RSS for the
+   Keras .h5 path, the NumPy .npz path and MODEL_LOADING=lazy.
+2. Starts gunicorn with --workers, with and without preload_app, waits
+   for /ready and reports the time to ready plus per-worker RSS and PSS
+   (PSS splits shared copy-on-write pages between the processes using them).
+
+A randomly initialised model with the training layer stack is written to a
+scratch directory; the real database is not touched.
+
+Usage: python scripts/bench_startup.py [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+IMPORT_PROBE = '''
+import json, time
+start = time.perf_counter()
+import app
+ready = time.perf_counter() - start
+app.ensure_models_loaded()
+print(json.dumps({
+    "import_seconds": ready,
+    "scoring_ready_seconds": time.perf_counter() - start,
+    "rss_mb": int(open("/proc/self/status").read().split("VmRSS:")[1].split()[0]) / 1024,
+    "status": app.model_status
+}))
+'''
+
+
+def build_models(scratch):
+    """Write a random CNN (.h5), a fitted scaler and the .npz export"""
+    import joblib
+    import numpy as np
+    from sklearn.preprocessing import StandardScaler
+    from cnn_runtime import export_numpy_model
+    from models.train_models import build_cnn
+
+    model = build_cnn(9)
+    scaler = StandardScaler().fit(np.random.default_rng(0).normal(size=(100, 9)))
+    paths = {
+        'MODEL_PATH': os.path.join(scratch, 'cnn.h5'),
+        'SCALER_PATH': os.path.join(scratch, 'scaler.pkl'),
+        'NUMPY_MODEL_PATH': os.path.join(scratch, 'cnn.npz')
+    }
+    model.save(paths['MODEL_PATH'])
+    joblib.dump(scaler, paths['SCALER_PATH'])
+    export_numpy_model(model, scaler, paths['NUMPY_MODEL_PATH'])
+    return paths
+
+
+def scenario_env(scratch, paths, runtime, loading='eager'):
+    """Environment for one scenario; runtime is 'keras' or 'numpy'"""
+    env = dict(os.environ, DATABASE_PATH=os.path.join(scratch, 'bench.db'), MODEL_LOADING=loading,
+               TF_CPP_MIN_LOG_LEVEL='3', **paths)
+    if runtime == 'keras':
+        env['NUMPY_MODEL_PATH'] = os.path.join(scratch, 'missing.npz')
+    return env
+
+
+def measure_import(env):
+    """Cold `import app` in a fresh interpreter"""
+    output = subprocess.run([sys.executable, '-c', IMPORT_PROBE], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def memory_kb(pid):
+    """(Rss, Pss) in kB from /proc/<pid>/smaps_rollup"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1]] = int(parts[1])
+    return values['Rss'], values['Pss']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure_gunicorn(env, workers, preload):
+    """Start gunicorn, wait for /ready, and sample worker memory"""
+    port = free_port()
+    env = dict(env, GUNICORN_PRELOAD=str(preload), WEB_CONCURRENCY=str(workers))
+    start = time.perf_counter()
+    master = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-b', f'127.0.0.1:{port}', 'app:app'],
+        env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ready_seconds = None
+        while time.perf_counter() - start < 120:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/ready', timeout=1) as response:
+                    if response.status == 200:
+                        ready_seconds = time.perf_counter() - start
+                        break
+            except OSError:
+                pass
+            time.sleep(0.05)
+
+        # Give every worker time to boot before sampling memory
+        time.sleep(2)
+        children = subprocess.run(['pgrep', '-P', str(master.pid)], capture_output=True, text=True).stdout.split()
+        samples = [memory_kb(int(pid)) for pid in children]
+        master_rss, master_pss = memory_kb(master.pid)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+    return {
+        'ready_seconds': ready_seconds,
+        'workers': len(samples),
+        'worker_rss_mb': sum(s[0] for s in samples) / max(len(samples), 1) / 1024,
+        'worker_pss_mb': sum(s[1] for s in samples) / max(len(samples), 1) / 1024,
+        'total_pss_mb': (sum(s[1] for s in samples) + master_pss) / 1024
+    }
+
+
+def run(scratch, workers):
+    """Print both tables for models written to scratch"""
+    paths = build_models(scratch)
+
+    print(f"\n{'import app':<24} {'Import (s)':>11} {'Scoring ready (s)':>18} {'RSS (MB)':>9}")
+    print("-" * 65)
+    for label, runtime, loading in [('keras .h5, eager', 'keras', 'eager'),
+                                    ('numpy .npz, eager', 'numpy', 'eager'),
+                                    ('numpy .npz, lazy', 'numpy', 'lazy')]:
+        r = measure_import(scenario_env(scratch, paths, runtime, loading))
+        print(f"{label:<24} {r['import_seconds']:>11.2f} {r['scoring_ready_seconds']:>18.2f} {r['rss_mb']:>9.0f}")
+
+    print(f"\n{'gunicorn x' + str(workers):<24} {'Ready (s)':>10} {'Worker RSS':>11} "
+          f"{'Worker PSS':>11} {'Total PSS':>10}  (MB)")
+    print("-" * 74)
+    for label, runtime, preload in [('keras .h5, no preload', 'keras', False),
+                                    ('keras .h5, preload', 'keras', True),
+                                    ('numpy .npz, no preload', 'numpy', False),
+                                    ('numpy .npz, preload', 'numpy', True)]:
+        r = measure_gunicorn(scenario_env(scratch, paths, runtime), workers, preload)
+        ready = f"{r['ready_seconds']:.2f}" if r['ready_seconds'] is not None else 'timeout'
+        print(f"{label:<24} {ready:>10} {r['worker_rss_mb']:>11.0f} "
+              f"{r['worker_pss_mb']:>11.0f} {r['total_pss_mb']:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='upi_guard_startup_')
+    try:
+        run(scratch, args.workers)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: exact kernel SVC vs. kernel-approximation SVM training
+
+Trains each --svm-mode variant from models/train_models.py on synthetic
+datasets of growing size (same 70/15/15 stratified split and scaler as
+training) and reports test accuracy and fit/predict wall-clock time.
+The exact SVC is skipped above --exact-max-rows, where it takes minutes
+to hours.
+
+Usage: python scripts/bench_svm_scaling.py [--sizes 10000,50000,200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.generate_dataset import iter_chunks
+from models.train_models import NON_FEATURE_COLUMNS, build_svm
+
+
+def make_splits(rows):
+    """Scaled train/test arrays for a generated dataset of the given size"""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    df = pd.concat(iter_chunks(rows, seed=42))
+    X = df.drop(columns=NON_FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+    y = df['fraud'].to_numpy()
+
+    X_train, X_temp, y_train, y_temp = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
+    _, X_test, _, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=42, stratify=y_temp)
+
+    scaler = StandardScaler().fit(X_train)
+    return scaler.transform(X_train), y_train, scaler.transform(X_test), y_test
+
+
+def measure(mode, X_train, y_train, X_test, y_test, n_components):
+    """Fit one SVM variant and return (test accuracy, fit seconds, predict seconds)"""
+    model = build_svm(mode, X_train.shape[1], n_components)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accuracy = float((model.predict(X_test) == y_test).mean())
+    predict_seconds = time.perf_counter() - start
+    return accuracy, fit_seconds, predict_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='10000,50000,200000',
+                        help='Comma-separated dataset sizes (rows)')
+    parser.add_argument('--modes', default='exact,rff,nystroem')
+    parser.add_argument('--components', type=int, default=500)
+    parser.add_argument('--exact-max-rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    modes = [m.strip() for m in args.modes.split(',')]
+
+    print(f"\n{'Rows':>9} {'Mode':<10} {'Test acc':>9} {'Fit (s)':>9} {'Predict (s)':>12}")
+    print("-" * 53)
+    for rows in sizes:
+        X_train, y_train, X_test, y_test = make_splits(rows)
+        for mode in modes:
+            if mode == 'exact' and rows > args.exact_max_rows:
+                print(f"{rows:>9,} {mode:<10} {'skipped (--exact-max-rows)':>32}")
+                continue
+            accuracy, fit_seconds, predict_seconds = measure(
+                mode, X_train, y_train, X_test, y_test, args.components
+            )
+            print(f"{rows:>9,} {mode:<10} {accuracy * 100:>8.2f}% {fit_seconds:>9.2f} {predict_seconds:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Champion / Challenger Scoring
+Registry of fraud models where the champion decides each payment and the
+challengers ("shadows") score the same features in the background
+
+Shadow scoring never runs on the request thread: detect_fraud hands the
+payment's features to ShadowScorer.submit(), which only enqueues them. A
+background worker drains the queue in batches, scores each batch with every
+shadow model in one vectorized call and persists the results to
+live_shadow_scores in a single transaction, where they can be compared with
+the champion's decisions in transactions (offline re-scoring runs write to
+shadow_scores instead).
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+from metrics import LatencyHistogram
+
+# Offline re-scoring runs (rescoring.py)
+INSERT_SHADOW_SQL = '''
+    INSERT OR REPLACE INTO shadow_scores (model_name, transaction_id, fraud_probability, is_fraud)
+    VALUES (?, ?, ?, ?)
+'''
+
+# Live challengers (ShadowScorer via app.persist_shadow_scores)
+INSERT_LIVE_SHADOW_SQL = '''
+    INSERT OR REPLACE INTO live_shadow_scores (model_name, transaction_id, fraud_probability, is_fraud)
+    VALUES (?, ?, ?, ?)
+'''
+
+
+def sklearn_predict_batch(model, scaler=None):
+    """
+    predict_batch for a model from train_models.py (LR, RF or SVM)
+
+    LR and SVM are fitted on standardized features: pass the training scaler
+    and raw rows go through it first. RF is fitted on raw features: pass
+    scaler=None. Only the leading columns the model was trained on are used.
+    """
+    num_features = (scaler if scaler is not None else model).n_features_in_
+
+    if scaler is None:
+        def predict_batch(features):
+            return model.predict_proba(features[:, :num_features])[:, 1]
+    else:
+        def predict_batch(features):
+            return model.predict_proba(scaler.transform(features[:, :num_features]))[:, 1]
+    return predict_batch
+
+
+class ModelRegistry:
+    """
+    Named fraud models with one champion and per-model latency histograms
+
+    Args:
+        champion: Name of the model whose probability decides payments
+    """
+
+    def __init__(self, champion='cnn'):
+        self.champion = champion
+        self._models = {}
+        self.latency = {}
+
+    def register(self, name, predict_batch):
+        """Add (or replace) a model: predict_batch maps (n, 9) raw features to n probabilities"""
+        self._models[name] = predict_batch
+        self.latency.setdefault(name, LatencyHistogram())
+
+    def names(self):
+        return list(self._models)
+
+    def shadows(self):
+        """Registered models other than the champion"""
+        return [name for name in self._models if name != self.champion]
+
+    def record(self, name, elapsed_us):
+        """Record one scoring call's latency for a model"""
+        if name not in self.latency:
+            self.latency[name] = LatencyHistogram()
+        self.latency[name].record(elapsed_us)
+
+    def predict(self, name, features):
+        """Score a batch with one model, recording its latency"""
+        start = time.perf_counter()
+        probabilities = np.asarray(self._models[name](features)).reshape(-1)
+        self.record(name, (time.perf_counter() - start) * 1_000_000)
+        return probabilities
+
+    def stats(self):
+        return {
+            'champion': self.champion,
+            'shadows': self.shadows(),
+            'latency': {name: histogram.snapshot() for name, histogram in self.latency.items()}
+        }
+
+
+class ShadowScorer:
+    """
+    Background scorer for the registry's shadow models
+
+    Args:
+        registry: ModelRegistry providing the shadow models
+        persist: Callable receiving a list of (model_name, transaction_id,
+            fraud_probability, is_fraud) rows; called once per batch
+        threshold: Probability above which a shadow decision is "block"
+        max_queue: Payments held for scoring; beyond this new ones are
+            dropped (counted) rather than slowing down payments
+        max_batch_size: Payments scored and persisted per batch
+        flush_interval: Seconds a partial batch waits for more payments
+    """
+
+    def __init__(self, registry, persist, threshold=0.5, max_queue=10000, max_batch_size=256, flush_interval=1.0):
+        self.registry = registry
+        self.persist = persist
+        self.threshold = threshold
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.dropped = 0
+        self.scored = 0
+        self.batches = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the background worker (idempotent)"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+                self._worker.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the worker after scoring and persisting everything queued"""
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join(timeout)
+
+    def submit(self, transaction_id, features):
+        """Queue one payment for shadow scoring (never blocks)"""
+        if not self.registry.shadows():
+            return
+        if self._worker is None:
+            self.start()
+        try:
+            self._queue.put_nowait((transaction_id, features))
+            self.submitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _collect(self, first):
+        """Gather a batch starting with `first` until full or the interval expires"""
+        batch = [first]
+        deadline = time.perf_counter() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Keep the stop sentinel for the outer loop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self._flush(self._collect(first))
+
+    def _flush(self, batch):
+        """Score a batch with every shadow model and persist it in one call"""
+        transaction_ids = [transaction_id for transaction_id, _ in batch]
+        features = np.asarray([features for _, features in batch], dtype=np.float64)
+        rows = []
+        for name in self.registry.shadows():
+            try:
+                probabilities = self.registry.predict(name, features)
+            except Exception as e:
+                self.errors += 1
+                print(f"Shadow model {name} failed: {e}")
+                continue
+            rows.extend(
+                (name, transaction_id, float(p), int(p > self.threshold))
+                for transaction_id, p in zip(transaction_ids, probabilities)
+            )
+
+        if rows:
+            try:
+                self.persist(rows)
+            except Exception as e:
+                self.errors += 1
+                print(f"Error persisting shadow scores: {e}")
+
+        self.scored += len(batch)
+        self.batches += 1
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'dropped': self.dropped,
+            'scored': self.scored,
+            'batches': self.batches,
+            'errors': self.errors,
+            'queued': self._queue.qsize()
+        }
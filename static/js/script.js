@@ -1,91 +1,3 @@
-<<<<<<< HEAD
-// UPI Guard - Frontend JavaScript
-
-// Close flash messages
-document.addEventListener('DOMContentLoaded', function() {
-    // Auto-hide flash messages after 5 seconds
-    const flashMessages = document.querySelectorAll('.flash-message');
-    flashMessages.forEach(message => {
-        setTimeout(() => {
-            message.style.animation = 'slideOut 0.3s ease';
-            setTimeout(() => message.remove(), 300);
-        }, 5000);
-    });
-    
-    // Close button for flash messages
-    document.querySelectorAll('.close-flash').forEach(btn => {
-        btn.addEventListener('click', function() {
-            this.parentElement.style.animation = 'slideOut 0.3s ease';
-            setTimeout(() => this.parentElement.remove(), 300);
-        });
-    });
-    
-    // Mobile number validation
-    const mobileInput = document.getElementById('mobile');
-    if (mobileInput) {
-        mobileInput.addEventListener('input', function() {
-            this.value = this.value.replace(/\D/g, ''); // Only numbers
-        });
-    }
-    
-    // OTP input auto-focus and formatting
-    const otpInput = document.getElementById('otp');
-    if (otpInput) {
-        otpInput.addEventListener('input', function() {
-            this.value = this.value.replace(/\D/g, ''); // Only numbers
-        });
-    }
-});
-
-// Add slideOut animation
-const style = document.createElement('style');
-style.textContent = `
-    @keyframes slideOut {
-        from {
-            transform: translateX(0);
-            opacity: 1;
-        }
-        to {
-            transform: translateX(400px);
-            opacity: 0;
-        }
-    }
-`;
-document.head.appendChild(style);
-
-// Form validation helpers
-function validateMobile(mobile) {
-    return /^[0-9]{10}$/.test(mobile);
-}
-
-function validateOTP(otp) {
-    return /^[0-9]{6}$/.test(otp);
-}
-
-function validateAmount(amount) {
-    return amount > 0 && amount <= 100000;
-}
-
-// Utility function to format currency
-function formatCurrency(amount) {
-    return new Intl.NumberFormat('en-IN', {
-        style: 'currency',
-        currency: 'INR'
-    }).format(amount);
-}
-
-// Utility function to format date
-function formatDate(dateString) {
-    const date = new Date(dateString);
-    return date.toLocaleString('en-IN', {
-        year: 'numeric',
-        month: 'short',
-        day: 'numeric',
-        hour: '2-digit',
-        minute: '2-digit'
-    });
-}
-=======
 // UPI Guard - Frontend JavaScript
 
 // Close flash messages
@@ -172,4 +84,122 @@ function formatDate(dateString) {
         minute: '2-digit'
     });
 }
->>>>>>> a692c63 (initial commit)
+
+// ==================== Lazy-loaded dashboard pages ====================
+
+// Escape text before inserting API data into table markup
+function escapeHtml(value) {
+    return String(value ?? '').replace(/[&<>"']/g, ch => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+}
+
+function statusBadge(status) {
+    if (status === 'completed') return '<span class="badge badge-success">Completed</span>';
+    if (status === 'blocked') return '<span class="badge badge-danger">Blocked</span>';
+    return '<span class="badge badge-warning">Pending</span>';
+}
+
+function formatAmount(amount) {
+    return '₹' + Number(amount).toFixed(2);
+}
+
+function formatRisk(probability) {
+    return probability ? (probability * 100).toFixed(1) + '%' : 'N/A';
+}
+
+// Row renderers matching the server-rendered dashboard tables
+const rowRenderers = {
+    'user-transaction': txn => `
+        <tr>
+            <td>${escapeHtml(txn.transaction_id)}</td>
+            <td>${escapeHtml(txn.merchant_name)}</td>
+            <td>${formatAmount(txn.amount)}</td>
+            <td>${statusBadge(txn.status)}</td>
+            <td>${formatRisk(txn.fraud_probability)}</td>
+            <td>${escapeHtml(txn.created_at)}</td>
+        </tr>`,
+    'merchant-transaction': txn => `
+        <tr>
+            <td>${escapeHtml(txn.transaction_id)}</td>
+            <td>${escapeHtml(txn.user_name)}</td>
+            <td>${formatAmount(txn.amount)}</td>
+            <td>${statusBadge(txn.status)}</td>
+            <td>${escapeHtml(txn.created_at)}</td>
+        </tr>`,
+    'admin-transaction': txn => `
+        <tr class="${txn.is_fraud ? 'fraud-row' : ''}">
+            <td>${escapeHtml(txn.transaction_id)}</td>
+            <td>${escapeHtml(txn.user_name)}</td>
+            <td>${escapeHtml(txn.merchant_name)}</td>
+            <td>${formatAmount(txn.amount)}</td>
+            <td>${statusBadge(txn.status)}</td>
+            <td>${txn.fraud_probability
+                ? `<span class="${txn.fraud_probability > 0.5 ? 'fraud-high' : 'fraud-low'}">${formatRisk(txn.fraud_probability)}</span>`
+                : 'N/A'}</td>
+            <td>${escapeHtml(txn.created_at)}</td>
+        </tr>`,
+    'fraud-log': log => `
+        <tr class="fraud-row">
+            <td>${escapeHtml(log.transaction_id)}</td>
+            <td>${escapeHtml(log.user_name || 'N/A')}</td>
+            <td>${escapeHtml(log.merchant_name || 'N/A')}</td>
+            <td>${formatAmount(log.amount)}</td>
+            <td><span class="fraud-high">${formatRisk(log.fraud_probability)}</span></td>
+            <td>${escapeHtml(log.reason)}</td>
+            <td><span class="badge badge-danger">${escapeHtml(log.action_taken)}</span></td>
+            <td>${escapeHtml(log.created_at)}</td>
+        </tr>`,
+    'user': user => `
+        <tr>
+            <td>${escapeHtml(user.id)}</td>
+            <td>${escapeHtml(user.name)}</td>
+            <td>${escapeHtml(user.mobile)}</td>
+            <td>${escapeHtml(user.upi_id)}</td>
+            <td>${escapeHtml(user.age)}</td>
+            <td>${escapeHtml(user.created_at)}</td>
+        </tr>`,
+    'merchant': merchant => `
+        <tr>
+            <td>${escapeHtml(merchant.id)}</td>
+            <td>${escapeHtml(merchant.business_name)}</td>
+            <td>${escapeHtml(merchant.mobile)}</td>
+            <td>${escapeHtml(merchant.upi_id)}</td>
+            <td>${escapeHtml(merchant.merchant_age)} days</td>
+            <td>${escapeHtml(merchant.created_at)}</td>
+        </tr>`
+};
+
+// Fetch the next keyset page for a "Load more" button and append its rows
+async function loadNextPage(button) {
+    const cursor = button.dataset.cursor;
+    if (!cursor) return;
+
+    const url = new URL(button.dataset.endpoint, window.location.origin);
+    url.searchParams.set('cursor', cursor);
+    if (button.dataset.role) url.searchParams.set('role', button.dataset.role);
+
+    button.disabled = true;
+    try {
+        const response = await fetch(url, { credentials: 'same-origin' });
+        const page = await response.json();
+        if (!page.success) throw new Error(page.message || 'Failed to load page');
+
+        const render = rowRenderers[button.dataset.row];
+        const tbody = document.getElementById(button.dataset.target);
+        tbody.insertAdjacentHTML('beforeend', page.items.map(render).join(''));
+
+        button.dataset.cursor = page.next_cursor || '';
+        button.hidden = !page.next_cursor;
+    } catch (error) {
+        console.error('Error loading page:', error);
+    } finally {
+        button.disabled = false;
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.load-more').forEach(button => {
+        button.addEventListener('click', () => loadNextPage(button));
+    });
+});
@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import pytest
+
+import app as flask_app
+import asgi
+import database
+from inference import BatchingScorer
+from metrics import StageTimer
+from profile_cache import ProfileCache
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'asgi.db'))
+    database.create_tables()
+    conn = database.get_db_connection()
+    conn.execute("INSERT INTO users (mobile, name, age, state_code, zip_code) VALUES ('9000000001', 'U', 30, 12, 560)")
+    conn.execute("INSERT INTO merchants (mobile, business_name, merchant_age, upi_id) "
+                 "VALUES ('9000000002', 'M', 400, 'shop@upiguard')")
+    conn.commit()
+    conn.close()
+
+    # Probability = amount / 10000, scored through the batching queue
+    scorer = BatchingScorer(lambda features: features[:, 0] / 10000, max_batch_size=16, max_wait_us=5000)
+    monkeypatch.setattr(flask_app, 'batch_scorer', scorer)
+    monkeypatch.setattr(flask_app, 'model_status', 'ready')
+    monkeypatch.setattr(flask_app, 'models_loaded', lambda: True)
+    monkeypatch.setattr(flask_app, 'profile_cache', ProfileCache(enabled=False))
+    monkeypatch.setattr(asgi, 'db', asgi.AsyncDatabase(database.ConnectionPool(database.DB_PATH), max_workers=4))
+    monkeypatch.setattr(asgi, 'scorer', asgi.AsyncScorer(max_pending=256))
+    yield scorer
+    scorer.stop()
+
+
+def session_cookie(**session):
+    serializer = flask_app.app.session_interface.get_signing_serializer(flask_app.app)
+    return ('cookie', f"session={serializer.dumps(session)}")
+
+
+async def call(method, path, body=None, headers=(), query=''):
+    messages = []
+    payload = json.dumps(body).encode() if body is not None else b''
+
+    async def receive():
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+        'headers': [(k.encode(), v.encode()) for k, v in headers]
+    }
+    await asgi.app(scope, receive, send)
+    start, response = messages
+    headers = dict(start['headers'])
+    if headers[b'content-type'] != b'application/json':
+        return start['status'], headers, response['body'].decode()
+    return start['status'], headers, json.loads(response['body'])
+
+
+def pay(amount, **session):
+    return call('POST', '/api/process_payment', {'merchant_upi': 'shop@upiguard', 'amount': amount, 'category': 2},
+                headers=[session_cookie(**session)])
+
+
+def test_payments_are_scored_and_written_once(api):
+    ok_status, _, ok = asyncio.run(pay(2000, user_id=1))
+    blocked_status, _, blocked = asyncio.run(pay(9000, user_id=1))
+
+    assert ok_status == 200 and ok['success'] and abs(ok['fraud_probability'] - 0.2) < 1e-9
+    assert blocked_status == 403 and blocked['fraud_detected']
+
+    conn = database.get_db_connection()
+    rows = conn.execute('SELECT transaction_id, status, is_fraud FROM transactions ORDER BY id').fetchall()
+    logs = conn.execute('SELECT transaction_id FROM fraud_logs').fetchall()
+    conn.close()
+    assert [(r['status'], r['is_fraud']) for r in rows] == [('completed', 0), ('blocked', 1)]
+    assert [r['transaction_id'] for r in logs] == [blocked['transaction_id']]
+
+
+def test_missing_or_forged_session_is_unauthorized(api):
+    status, _, _ = asyncio.run(call('POST', '/api/process_payment', {'amount': 10}))
+    forged, _, _ = asyncio.run(call('POST', '/api/process_payment', {'amount': 10},
+                                    headers=[('cookie', 'session=eyJ1c2VyX2lkIjoxfQ.forged.sig')]))
+    assert status == forged == 401
+
+
+def test_concurrent_payments_share_inference_batches(api):
+    async def burst():
+        return await asyncio.gather(*(pay(100 + i, user_id=1) for i in range(40)))
+
+    results = asyncio.run(burst())
+
+    assert all(status == 200 for status, _, _ in results)
+    assert len({body['transaction_id'] for _, _, body in results}) == 40
+    assert api.stats()['requests'] == 40
+    assert api.stats()['batches'] < 40
+
+
+def test_full_scoring_queue_returns_503(api, monkeypatch):
+    monkeypatch.setattr(asgi, 'scorer', asgi.AsyncScorer(max_pending=0))
+
+    status, headers, body = asyncio.run(pay(100, user_id=1))
+
+    assert status == 503
+    assert headers[b'retry-after'] == b'1'
+    assert asgi.scorer.rejected == 1
+
+
+def test_listing_pages_with_cursor(api):
+    for amount in (100, 200, 300):
+        asyncio.run(pay(amount, user_id=1))
+    cookie = session_cookie(user_id=1)
+
+    status, _, first = asyncio.run(call('GET', '/api/transactions', headers=[cookie], query='limit=2'))
+    _, _, second = asyncio.run(call('GET', '/api/transactions', headers=[cookie],
+                                    query=f"limit=2&cursor={first['next_cursor']}"))
+    admin_only, _, _ = asyncio.run(call('GET', '/api/users', headers=[cookie]))
+
+    assert status == 200
+    assert [t['amount'] for t in first['items'] + second['items']] == [300, 200, 100]
+    assert second['next_cursor'] is None
+    assert admin_only == 401
+
+
+def test_payment_stages_and_outcomes_are_exported(api, monkeypatch):
+    monkeypatch.setattr(flask_app, 'payment_metrics', StageTimer(flask_app.PAYMENT_STAGES, flask_app.PAYMENT_OUTCOMES))
+    for amount in (100, 9000, -5):
+        asyncio.run(pay(amount, user_id=1))
+
+    status, headers, text = asyncio.run(call('GET', '/metrics'))
+
+    assert status == 200 and headers[b'content-type'].startswith(b'text/plain')
+    assert 'upi_guard_payments_total{outcome="completed"} 1' in text
+    assert 'upi_guard_payments_total{outcome="blocked"} 1' in text
+    assert 'upi_guard_payments_total{outcome="rejected"} 1' in text
+    assert 'upi_guard_payment_seconds_count 3' in text
+    for stage in flask_app.PAYMENT_STAGES:
+        assert f'upi_guard_payment_stage_seconds_count{{stage="{stage}"}} 2' in text
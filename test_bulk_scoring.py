@@ -0,0 +1,53 @@
+import io
+import json
+
+import numpy as np
+
+from bulk_scoring import FEATURE_COLUMNS, format_results, iter_csv_records, iter_ndjson_records, score_records
+from features import STATIC_FEATURES
+
+HEADER = 'transaction_id,' + ','.join(STATIC_FEATURES) + ',fraud\n'
+
+
+def csv_row(transaction_id, amount):
+    return f"{transaction_id},{amount},1,2,30,400,12,560,2,1234,0\n"
+
+
+def test_results_keep_input_order_across_batches():
+    calls = []
+
+    def predict_batch(features):
+        calls.append(len(features))
+        return features[:, 0] / 10000
+
+    body = HEADER + ''.join(csv_row(i, i * 10) for i in range(1, 1001))
+    results = list(score_records(iter_csv_records(io.StringIO(body)), predict_batch, batch_size=128,
+                                 columns=STATIC_FEATURES))
+
+    assert [r['transaction_id'] for r in results] == [str(i) for i in range(1, 1001)]
+    assert np.allclose([r['fraud_probability'] for r in results], np.arange(1, 1001) / 1000)
+    assert [r['is_fraud'] for r in results] == [int(i > 500) for i in range(1, 1001)]
+    assert calls == [128] * 7 + [104]
+
+
+def test_bad_rows_are_reported_without_stopping_the_stream():
+    good = {column: 1 for column in FEATURE_COLUMNS}
+    lines = [json.dumps(dict(good, transaction_id='a')), 'not json',
+             json.dumps({'transaction_id': 'c', 'amount': 5}), json.dumps(dict(good, transaction_id='d'))]
+
+    results = list(score_records(iter_ndjson_records(lines), lambda X: np.full(len(X), 0.7), batch_size=2))
+
+    assert [r['transaction_id'] for r in results] == ['a', None, 'c', 'd']
+    assert [('error' in r) for r in results] == [False, True, True, False]
+    assert results[3] == {'transaction_id': 'd', 'fraud_probability': 0.7, 'is_fraud': 1}
+
+
+def test_csv_output_streams_in_chunks():
+    results = ({'transaction_id': i, 'fraud_probability': 0.1, 'is_fraud': 0} for i in range(20000))
+
+    chunks = list(format_results(results, 'csv'))
+
+    assert len(chunks) > 1
+    lines = ''.join(chunks).splitlines()
+    assert lines[0] == 'transaction_id,fraud_probability,is_fraud,error'
+    assert lines[-1] == '19999,0.1,0,'
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from cnn_runtime import FusedCNNScorer, NumpyCNN, export_numpy_model
+
+keras = pytest.importorskip('tensorflow').keras
+StandardScaler = pytest.importorskip('sklearn.preprocessing').StandardScaler
+
+
+def build_cnn(num_features, pool_padding='valid'):
+    """Same layer stack as models/train_models.py"""
+    layers = keras.layers
+    return keras.Sequential([
+        keras.Input(shape=(num_features, 1)),
+        layers.Conv1D(filters=64, kernel_size=3, activation='relu'),
+        layers.MaxPooling1D(pool_size=2, padding=pool_padding),
+        layers.Dropout(0.25),
+        layers.Conv1D(filters=32, kernel_size=3, activation='relu'),
+        layers.MaxPooling1D(pool_size=2, padding=pool_padding),
+        layers.Dropout(0.25),
+        layers.Flatten(),
+        layers.Dense(128, activation='relu'),
+        layers.Dropout(0.5),
+        layers.Dense(64, activation='relu'),
+        layers.Dropout(0.5),
+        layers.Dense(1, activation='sigmoid')
+    ])
+
+
+@pytest.mark.parametrize('num_features,pool_padding', [(15, 'valid'), (9, 'same')])
+def test_numpy_forward_matches_keras_predict(tmp_path, num_features, pool_padding):
+    rng = np.random.default_rng(7)
+    raw = rng.normal(loc=100.0, scale=40.0, size=(256, num_features))
+    scaler = StandardScaler().fit(raw)
+
+    model = build_cnn(num_features, pool_padding)
+    # Randomize biases too so the comparison exercises every parameter
+    model.set_weights([rng.normal(scale=0.3, size=w.shape).astype(np.float32) for w in model.get_weights()])
+
+    path = tmp_path / 'cnn.npz'
+    export_numpy_model(model, scaler, path)
+    runtime = NumpyCNN.load(path)
+
+    scaled = scaler.transform(raw)
+    expected = model.predict(scaled.reshape(-1, num_features, 1), verbose=0)[:, 0]
+    actual = runtime.predict(raw)
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.parametrize('num_features,pool_padding', [(15, 'valid'), (9, 'same')])
+def test_fused_scorer_matches_numpy_runtime(tmp_path, num_features, pool_padding):
+    rng = np.random.default_rng(11)
+    raw = rng.normal(loc=500.0, scale=200.0, size=(64, num_features))
+    scaler = StandardScaler().fit(raw)
+
+    model = build_cnn(num_features, pool_padding)
+    model.set_weights([rng.normal(scale=0.3, size=w.shape).astype(np.float32) for w in model.get_weights()])
+
+    path = tmp_path / 'cnn.npz'
+    export_numpy_model(model, scaler, path)
+    runtime = NumpyCNN.load(path)
+    fused = FusedCNNScorer.from_numpy_model(runtime)
+
+    expected = runtime.predict(raw)
+    np.testing.assert_allclose(fused.predict(raw), expected, rtol=1e-4, atol=1e-5)
+    single = [fused.score(row.tolist()) for row in raw]
+    np.testing.assert_allclose(single, expected, rtol=1e-4, atol=1e-5)
@@ -1,8 +1,9 @@
 import sqlite3
 from app import app
+from config import DATABASE_PATH
 import time
 
-DB = 'upi_guard.db'
+DB = DATABASE_PATH
 
 
 def get_latest_otp(mobile):
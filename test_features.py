@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import database
+from features import UPI_HASH_MAX, UPI_HASH_MIN, upi_id_hash
+
+UPI_IDS = ['shop@upiguard', 'merchant42@upiguard', 'chai.wala@okaxis']
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def hashes_in_subprocess(seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    script = f'from features import upi_id_hash; print([upi_id_hash(u) for u in {UPI_IDS!r}])'
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_upi_id_hash_is_stable_across_processes():
+    expected = str([upi_id_hash(upi_id) for upi_id in UPI_IDS])
+    # Different hash seeds would change hash() but must not change the feature
+    assert hashes_in_subprocess(1) == expected
+    assert hashes_in_subprocess(2) == expected
+
+
+def test_upi_id_hash_stays_in_the_training_range():
+    values = [upi_id_hash(f'merchant{i}@upiguard') for i in range(2000)]
+    assert min(values) >= UPI_HASH_MIN and max(values) <= UPI_HASH_MAX
+    assert len(set(values)) > 1900
+
+
+def test_migration_backfills_existing_merchants(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'features.db'))
+    conn = database.get_db_connection()
+    conn.execute('CREATE TABLE merchants (id INTEGER PRIMARY KEY, upi_id TEXT UNIQUE)')
+    conn.execute("INSERT INTO merchants (upi_id) VALUES ('shop@upiguard')")
+    conn.commit()
+
+    database.add_merchant_upi_id_hash(conn)
+    database.backfill_merchant_upi_id_hash(conn)
+    stored = conn.execute('SELECT upi_id_hash FROM merchants').fetchone()[0]
+    conn.close()
+
+    assert stored == upi_id_hash('shop@upiguard')
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from data.generate_dataset import COLUMN_DTYPES, COLUMNS, iter_chunks, load_columns, write_chunks
+
+
+def test_output_is_deterministic_for_seed_and_chunk_size():
+    first = pd.concat(iter_chunks(25_000, seed=7, chunk_size=4_000))
+    second = pd.concat(iter_chunks(25_000, seed=7, chunk_size=4_000))
+    other_seed = pd.concat(iter_chunks(25_000, seed=8, chunk_size=4_000))
+
+    pd.testing.assert_frame_equal(first, second)
+    assert not first['amount'].equals(other_seed['amount'])
+
+
+def test_rows_ids_fraud_ratio_and_ranges():
+    df = pd.concat(iter_chunks(20_003, fraud_ratio=0.1, seed=1, chunk_size=3_000))
+
+    assert list(df.columns) == COLUMNS
+    assert len(df) == 20_003
+    assert (df['transaction_id'].to_numpy() == np.arange(1, 20_004)).all()
+    assert df['fraud'].sum() == int(20_003 * 0.1)
+    assert df['amount'].between(1.0, 100000).all()
+    assert df['time_hour'].between(0, 23).all()
+    assert df['time_minute'].between(0, 59).all()
+    assert df['user_age'].between(18, 80).all()
+    assert df['merchant_age'].between(1, 3650).all()
+    assert df['state_code'].between(1, 36).all()
+    assert df['zip_code'].between(100, 999).all()
+    assert df['category'].between(1, 10).all()
+    assert df['upi_id_hash'].between(1000, 99999).all()
+    # Legitimate merchants are established; fraud merchants are young
+    assert df.loc[df['fraud'] == 0, 'merchant_age'].min() >= 30
+    assert df.loc[df['fraud'] == 1, 'merchant_age'].max() <= 365
+
+
+def test_streamed_csv_matches_chunks(tmp_path):
+    path = tmp_path / 'stream.csv'
+    rows, frauds = write_chunks(iter_chunks(5_000, seed=3, chunk_size=1_500), path)
+
+    written = pd.read_csv(path)
+    expected = pd.concat(iter_chunks(5_000, seed=3, chunk_size=1_500), ignore_index=True)
+
+    assert (rows, frauds) == (5_000, 500)
+    pd.testing.assert_frame_equal(written, expected, check_dtype=False)
+
+
+def test_npy_columns_round_trip_with_narrow_dtypes(tmp_path):
+    path = tmp_path / 'columns'
+    rows, frauds = write_chunks(iter_chunks(5_000, seed=3, chunk_size=1_500), str(path), 'npy', 5_000)
+
+    columns = load_columns(str(path))
+    expected = pd.concat(iter_chunks(5_000, seed=3, chunk_size=1_500), ignore_index=True)
+
+    assert (rows, frauds) == (5_000, 500)
+    for name in COLUMNS:
+        assert isinstance(columns[name], np.memmap)
+        assert columns[name].dtype == COLUMN_DTYPES[name]
+        assert np.allclose(columns[name], expected[name], rtol=1e-6)
+    assert (columns['amount'] == expected['amount']).all()  # Amounts round-trip exactly
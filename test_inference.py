@@ -0,0 +1,112 @@
+import threading
+import time
+
+from inference import BatchingScorer, _PendingScore
+from metrics import LatencyHistogram
+
+
+def test_concurrent_callers_share_batches_and_get_own_results():
+    calls = []
+
+    def predict_batch(features):
+        calls.append(len(features))
+        return features[:, 0] / 100.0
+
+    scorer = BatchingScorer(predict_batch, max_batch_size=8, max_wait_us=50_000)
+    scorer.start()
+    results = {}
+
+    def worker(i):
+        results[i] = scorer.score([float(i), 0, 0, 0, 0, 0, 0, 0, 0])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    scorer.stop()
+
+    assert results == {i: i / 100.0 for i in range(32)}
+    assert sum(calls) == 32
+    assert len(calls) < 32
+    stats = scorer.stats()
+    assert stats['requests'] == 32
+    assert stats['batches'] == len(calls)
+    assert stats['latency']['count'] == 32
+
+
+def test_model_errors_propagate_to_every_caller():
+    def predict_batch(features):
+        raise ValueError('boom')
+
+    scorer = BatchingScorer(predict_batch, max_batch_size=4, max_wait_us=0)
+    try:
+        scorer.score([1.0] * 9)
+    except ValueError as e:
+        assert str(e) == 'boom'
+    else:
+        raise AssertionError('expected ValueError')
+    finally:
+        scorer.stop()
+    assert scorer.stats()['errors'] == 1
+
+
+def test_short_model_output_fails_every_caller():
+    scorer = BatchingScorer(lambda features: features[:1, 0], max_batch_size=4)
+    batch = [_PendingScore([0.1]), _PendingScore([0.2])]
+    scorer._flush(batch)
+
+    assert all(item.result is None and isinstance(item.error, ValueError) for item in batch)
+    assert scorer.stats()['errors'] == 1
+
+
+def test_lone_caller_does_not_wait_for_a_batch():
+    scorer = BatchingScorer(lambda features: features[:, 0], max_batch_size=32, max_wait_us=200_000)
+    try:
+        for value in (0.1, 0.2, 0.3):
+            start = time.perf_counter()
+            assert scorer.score([value]) == value
+            assert time.perf_counter() - start < 0.1  # Well below max_wait
+    finally:
+        scorer.stop()
+    assert scorer.stats()['batch_size_counts'] == {'1': 3}
+
+
+def test_failing_callback_does_not_stop_the_worker():
+    scorer = BatchingScorer(lambda features: features[:, 0], max_batch_size=4, max_wait_us=0)
+    delivered = threading.Event()
+
+    def bad_callback(result, error):
+        raise RuntimeError('callback bug')
+
+    try:
+        scorer.submit([0.5], bad_callback)
+        scorer.submit([0.25], lambda result, error: delivered.set())
+        assert delivered.wait(2)
+        assert scorer.score([0.75]) == 0.75
+    finally:
+        scorer.stop()
+    assert scorer.stats()['callback_errors'] == 1
+
+
+def test_dead_worker_is_restarted():
+    scorer = BatchingScorer(lambda features: features[:, 0], max_batch_size=4, max_wait_us=0)
+    scorer.start()
+    dead = scorer._worker
+    scorer._queue.put(None)  # Worker exits without clearing _worker
+    dead.join(2)
+
+    try:
+        assert scorer.score([0.5]) == 0.5
+        assert scorer._worker is not dead
+    finally:
+        scorer.stop()
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+    assert abs(histogram.percentile(50) - 500) / 500 < 0.07
+    assert abs(histogram.percentile(99) - 990) / 990 < 0.07
+    assert histogram.percentile(100) == 1000
@@ -0,0 +1,75 @@
+import time
+
+from metrics import LatencyHistogram, StageTimer, prometheus_counter, prometheus_histogram
+
+
+def test_stage_timer_samples_one_in_n_but_counts_every_outcome():
+    timer = StageTimer(['lookup', 'score'], ['completed', 'error'], sample_every=4)
+    for i in range(10):
+        trace = timer.trace()
+        trace.mark('lookup')
+        trace.mark('score')
+        trace.finish('completed' if i % 5 else 'error')
+
+    # Timings reach the histograms when read, not on the request path
+    assert timer.total.total == 0
+    snapshot = timer.snapshot()
+    assert snapshot['outcomes'] == {'completed': 8, 'error': 2}
+    assert snapshot['total']['count'] == 3  # Requests 0, 4 and 8
+    assert snapshot['stages']['lookup']['count'] == snapshot['stages']['score']['count'] == 3
+
+
+def test_marks_split_the_request_into_stages():
+    timer = StageTimer(['fast'])
+    trace = timer.trace()
+    trace.mark('fast')
+    time.sleep(0.01)
+    trace.mark('slow')  # Not declared up front: added on first use
+    trace.finish('completed')
+
+    stages = timer.snapshot()['stages']
+    assert list(stages) == ['fast', 'slow']
+    assert stages['slow']['p50_us'] >= 10000 > stages['fast']['p50_us']
+
+
+def test_total_runs_until_finish_not_the_last_mark():
+    timer = StageTimer(['lookup'])
+    trace = timer.trace()
+    trace.mark('lookup')
+    time.sleep(0.01)  # Unmarked work before returning still counts in the total
+    trace.finish('completed')
+
+    snapshot = timer.snapshot()
+    assert snapshot['total']['p50_us'] >= 10000 > snapshot['stages']['lookup']['p50_us']
+
+
+def test_sampling_disabled_only_counts():
+    timer = StageTimer(['lookup'], sample_every=0)
+    trace = timer.trace()
+    trace.mark('lookup')
+    trace.finish('completed')
+
+    assert timer.outcomes == {'completed': 1}
+    assert timer.total.total == 0
+
+
+def test_prometheus_histogram_buckets_are_cumulative_seconds():
+    histogram = LatencyHistogram()
+    for value_us in (3, 3, 100, 5000):
+        histogram.record(value_us)
+
+    lines = prometheus_histogram('x_seconds', 'help', {'lookup': histogram}, label='stage')
+    buckets = {line.split('le="')[1].split('"')[0]: int(line.rsplit(' ', 1)[1])
+               for line in lines if line.startswith('x_seconds_bucket')}
+
+    assert lines[:2] == ['# HELP x_seconds help', '# TYPE x_seconds histogram']
+    assert buckets['2e-06'] == 0 and buckets['4e-06'] == 2
+    assert buckets['0.000128'] == 3 and buckets['0.008192'] == 4 and buckets['+Inf'] == 4
+    assert list(buckets.values()) == sorted(buckets.values())
+    assert 'x_seconds_sum{stage="lookup"} 0.005106' in lines
+    assert 'x_seconds_count{stage="lookup"} 4' in lines
+
+
+def test_prometheus_counter():
+    assert prometheus_counter('x_total', 'help', {'ok': 2}, label='outcome')[2] == 'x_total{outcome="ok"} 2'
+    assert prometheus_counter('y_total', 'help', 7)[2] == 'y_total 7'
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+import database
+from otp import OTPPurger, OTPStore, purge_expired
+from velocity import format_timestamp
+
+T0 = 1_700_000_000
+
+
+class Clock:
+    def __init__(self, now=T0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'otp.db'))
+    database.create_tables()
+    conn = database.get_db_connection()
+    yield conn
+    conn.close()
+
+
+def test_memory_otp_verifies_once_until_it_expires():
+    clock = Clock()
+    store = OTPStore(ttl_seconds=600, clock=clock)
+    store.issue('9000000001', '111111')
+    store.issue('9000000001', '222222')
+    store.issue('9000000002', '333333')
+
+    assert not store.verify('9000000001', '999999')
+    assert store.verify('9000000001', '111111')
+    assert not store.verify('9000000001', '111111')  # Already used
+
+    clock.now += 601
+    assert not store.verify('9000000001', '222222')
+    assert store.purge() == 1
+    assert store.stats()['mobiles'] == 0
+
+
+def test_memory_is_bounded_dropping_expired_then_oldest():
+    clock = Clock()
+    store = OTPStore(ttl_seconds=60, max_entries=2, clock=clock)
+    store.issue('1', '000001')
+    clock.now += 61
+    store.issue('2', '000002')
+    store.issue('3', '000003')  # '1' has expired: purged, nothing evicted
+    store.issue('4', '000004')  # Evicts the oldest live entry, '2'
+
+    assert store.stats()['evictions'] == 1
+    assert not store.verify('2', '000002')
+    assert store.verify('3', '000003') and store.verify('4', '000004')
+
+
+def test_replicated_otp_is_used_once_across_workers(conn):
+    clock = Clock()
+    issuer = OTPStore(ttl_seconds=600, replicate=True, clock=clock)
+    other = OTPStore(ttl_seconds=600, replicate=True, clock=clock)
+
+    issuer.issue('9000000001', '111111', conn)
+    issuer.issue('9000000001', '222222', conn)
+
+    # Another worker consumes it from the database ...
+    assert other.verify('9000000001', '111111', conn)
+    # ... so the issuing worker's in-memory copy is no longer accepted
+    assert not issuer.verify('9000000001', '111111', conn)
+    # The issuer consumes its own OTP by row id
+    assert issuer.verify('9000000001', '222222', conn)
+    assert not other.verify('9000000001', '222222', conn)
+
+    issuer.issue('9000000001', '333333', conn)
+    clock.now += 601
+    assert not other.verify('9000000001', '333333', conn)
+    assert not issuer.verify('9000000001', '333333', conn)
+
+
+def test_purge_deletes_expired_rows_in_batches(conn):
+    rows = [('9000000001', f'{i:06d}', format_timestamp(T0 - 60 + i)) for i in range(120)]
+    conn.executemany('INSERT INTO otp_storage (mobile, otp, expires_at) VALUES (?, ?, ?)', rows)
+    conn.commit()
+
+    assert purge_expired(conn, now=T0, batch_size=25, max_batches=2) == 50
+    assert purge_expired(conn, now=T0, batch_size=25) == 11
+    remaining = conn.execute('SELECT COUNT(*), MIN(expires_at) FROM otp_storage').fetchone()
+    assert tuple(remaining) == (59, format_timestamp(T0 + 1))
+
+
+def test_purger_runs_in_the_background():
+    ran = threading.Event()
+    purger = OTPPurger(lambda: ran.set() or 3, interval_seconds=0.01)
+    purger.start()
+    assert ran.wait(2)
+    purger.stop()
+
+    assert purger.stats()['purged'] >= 3 and purger.stats()['errors'] == 0
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, fetch_page
+
+SELECT = 'SELECT t.id, t.created_at, t.user_id FROM transactions t'
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute('CREATE TABLE transactions (id INTEGER PRIMARY KEY, user_id INTEGER, created_at TIMESTAMP)')
+    conn.execute('CREATE INDEX idx_user_created ON transactions (user_id, created_at)')
+    # Many rows share a timestamp (CURRENT_TIMESTAMP has one-second resolution)
+    rows = [(i, i % 2, f'2024-01-01 00:00:{i // 10:02d}') for i in range(1, 101)]
+    conn.executemany('INSERT INTO transactions VALUES (?, ?, ?)', rows)
+    yield conn.cursor()
+    conn.close()
+
+
+def walk(cursor, **kwargs):
+    seen, after = [], None
+    while True:
+        rows, after = fetch_page(cursor, SELECT, 't', after=after, limit=7, **kwargs)
+        seen.extend(row['id'] for row in rows)
+        if after is None:
+            return seen
+
+
+def test_pages_cover_every_row_once_newest_first(cursor):
+    assert walk(cursor) == list(range(100, 0, -1))
+
+
+def test_pages_respect_extra_conditions(cursor):
+    assert walk(cursor, where=['t.user_id = ?'], params=(1,)) == list(range(99, 0, -2))
+
+
+def test_cursor_round_trip_and_validation():
+    assert decode_cursor(encode_cursor('2024-01-01 00:00:05', 42)) == ('2024-01-01 00:00:05', 42)
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
@@ -0,0 +1,55 @@
+import sqlite3
+import time
+
+from profile_cache import LRUTTLCache, ProfileCache
+
+
+def make_db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, age INTEGER, state_code INTEGER, zip_code INTEGER)')
+    conn.execute('CREATE TABLE merchants (id INTEGER PRIMARY KEY, upi_id TEXT UNIQUE, merchant_age INTEGER, upi_id_hash INTEGER)')
+    conn.execute('INSERT INTO users VALUES (1, 30, 12, 560)')
+    conn.execute("INSERT INTO merchants VALUES (7, 'shop@upiguard', 400, NULL)")
+    return conn
+
+
+def test_hits_skip_the_database_until_invalidated():
+    conn = make_db()
+    cache = ProfileCache()
+    cursor = conn.cursor()
+
+    assert cache.get_merchant(cursor, 'shop@upiguard').merchant_age == 400
+    conn.execute("UPDATE merchants SET merchant_age = 5 WHERE id = 7")
+    assert cache.get_merchant(cursor, 'shop@upiguard').merchant_age == 400
+
+    cache.invalidate_merchant('shop@upiguard')
+    assert cache.get_merchant(cursor, 'shop@upiguard').merchant_age == 5
+
+    stats = cache.stats()['merchants']
+    assert (stats['hits'], stats['misses'], stats['invalidations']) == (1, 2, 1)
+
+
+def test_disabled_cache_always_reads_through():
+    conn = make_db()
+    cache = ProfileCache(enabled=False)
+    cursor = conn.cursor()
+
+    assert cache.get_user(cursor, 1).age == 30
+    conn.execute('UPDATE users SET age = 31 WHERE id = 1')
+    assert cache.get_user(cursor, 1).age == 31
+    assert cache.get_user(cursor, 99) is None
+    assert cache.stats()['users']['entries'] == 0
+
+
+def test_lru_eviction_and_ttl_expiry():
+    cache = LRUTTLCache(max_entries=2, ttl_seconds=0.05)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)  # evicts 'b', the least recently used
+    assert cache.get('b') is None
+    assert cache.stats()['evictions'] == 1
+
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
@@ -0,0 +1,105 @@
+import sqlite3
+
+import pytest
+
+import app
+import database
+from otp import CONSUME_OTP_BY_ID_SQL, CONSUME_OTP_SQL, PURGE_OTP_SQL
+from pagination import encode_cursor, fetch_page
+
+# Hot queries issued by app.py (payment path, OTP verification); the listings are below
+HOT_QUERIES = {
+    'admin_fraud_count': ('SELECT COUNT(*) as count FROM transactions WHERE is_fraud = 1', ()),
+    'payment_user_lookup': ('SELECT * FROM users WHERE id = ?', (1,)),
+    'payment_merchant_lookup': ('SELECT * FROM merchants WHERE upi_id = ?', ('x@upiguard',)),
+    'otp_consume': (CONSUME_OTP_SQL, ('9000000001', '123456', '2024-01-01 00:00:00')),
+    'otp_consume_by_id': (CONSUME_OTP_BY_ID_SQL, (1,)),
+    'otp_purge': (PURGE_OTP_SQL, ('2024-01-01 00:00:00', 1000)),
+}
+
+# Keyset-paginated listings (dashboards and JSON APIs): app.listing_query() sessions
+LISTINGS = {
+    'user_transactions': ('transactions', {'user_id': 1}),
+    'merchant_transactions': ('transactions', {'merchant_id': 1}),
+    'admin_transactions': ('transactions', {'admin_id': 1}),
+    'fraud_logs': ('fraud_logs', {'admin_id': 1}),
+    'users': ('users', {'admin_id': 1}),
+    'merchants': ('merchants', {'admin_id': 1}),
+}
+
+
+class PlanCursor:
+    """Stands in for the cursor passed to fetch_page, recording its query's plan"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.details = None
+
+    def execute(self, sql, params):
+        self.details = plan_details(self.conn, sql, params)
+
+    def fetchall(self):
+        return []
+
+
+@pytest.fixture
+def migrated_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'plans.db'))
+    database.create_tables()
+    conn = database.get_db_connection()
+    yield conn
+    conn.close()
+
+
+def plan_details(conn, sql, params):
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def assert_no_full_scans_or_sorts(name, details):
+    for detail in details:
+        # Ordered index walks (SCAN ... USING INDEX) stop at the LIMIT
+        assert not (detail.startswith('SCAN') and 'INDEX' not in detail), (name, details)
+        assert 'TEMP B-TREE' not in detail, (name, details)
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_avoids_full_scans_and_sorts(migrated_db, name):
+    sql, params = HOT_QUERIES[name]
+    details = plan_details(migrated_db, sql, params)
+
+    assert_no_full_scans_or_sorts(name, details)
+
+
+@pytest.mark.parametrize('after', [None, encode_cursor('2024-01-01 00:00:00', 10)], ids=['first', 'next'])
+@pytest.mark.parametrize('name', sorted(LISTINGS))
+def test_listing_pages_avoid_full_scans_and_sorts(migrated_db, name, after):
+    select_sql, alias, where, params = app.listing_query(*LISTINGS[name])
+    cursor = PlanCursor(migrated_db)
+    fetch_page(cursor, select_sql, alias, where=where, params=params, after=after, limit=20)
+
+    assert_no_full_scans_or_sorts(name, cursor.details)
+
+
+def test_migrations_are_idempotent(migrated_db):
+    version = database.get_schema_version(migrated_db)
+    assert version == database.MIGRATIONS[-1][0]
+    assert database.migrate(migrated_db) == []
+    assert database.get_schema_version(migrated_db) == version
+
+
+def test_migrate_upgrades_legacy_database(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'legacy.db')
+    conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, created_at TIMESTAMP)')
+    conn.execute('CREATE TABLE merchants (id INTEGER PRIMARY KEY, upi_id TEXT, created_at TIMESTAMP)')
+    conn.execute('''CREATE TABLE transactions (id INTEGER PRIMARY KEY, user_id INTEGER,
+                    merchant_id INTEGER, status TEXT, is_fraud BOOLEAN, created_at TIMESTAMP)''')
+    conn.execute('''CREATE TABLE otp_storage (id INTEGER PRIMARY KEY, mobile TEXT, otp TEXT,
+                    verified BOOLEAN, expires_at TIMESTAMP, created_at TIMESTAMP)''')
+    conn.execute('CREATE TABLE fraud_logs (id INTEGER PRIMARY KEY, created_at TIMESTAMP)')
+    conn.commit()
+
+    applied = database.migrate(conn)
+    assert [version for version, _ in applied] == [m[0] for m in database.MIGRATIONS]
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'idx_transactions_user_created' in indexes
+    conn.close()
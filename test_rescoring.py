@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+import database
+import rescoring
+from shadow_scoring import INSERT_LIVE_SHADOW_SQL
+from features import fraud_features, payment_transaction_data, upi_id_hash
+from profile_cache import MerchantProfile, UserProfile
+from velocity import VELOCITY_FEATURES
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'rescore.db'))
+    database.create_tables()
+    conn = database.open_tuned_connection(database.DB_PATH)
+    conn.execute("INSERT INTO users (mobile, name, age, state_code, zip_code) VALUES ('9000000001', 'U', 30, 12, 560)")
+    conn.execute("INSERT INTO merchants (mobile, business_name, merchant_age, upi_id) "
+                 "VALUES ('9000000002', 'M', 400, 'shop@upiguard')")
+    conn.executemany('''
+        INSERT INTO transactions (transaction_id, user_id, merchant_id, amount, category, upi_id,
+                                  state_code, zip_code, time_hour, time_minute, is_fraud, status)
+        VALUES (?, 1, 1, ?, 2, 'shop@upiguard', 12, 560, 14, ?, 0, 'completed')
+    ''', [(f'TXN{i:03d}', i * 100.0, i % 60) for i in range(1, 51)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def by_amount(features):
+    # Probability = amount / 4000
+    return features[:, 0] / 4000
+
+
+def shadow(conn, model_name='new'):
+    return dict(conn.execute('SELECT transaction_id, fraud_probability FROM shadow_scores WHERE model_name = ?',
+                             (model_name,)).fetchall())
+
+
+def test_features_match_the_payment_path(conn):
+    row = conn.execute(rescoring.SELECT_CHUNK_SQL, (0, 1)).fetchone()
+    velocity = dict.fromkeys(VELOCITY_FEATURES, 0)
+
+    expected = fraud_features(payment_transaction_data(
+        UserProfile(1, 30, 12, 560), MerchantProfile(1, 'shop@upiguard', 400, upi_id_hash('shop@upiguard')),
+        100.0, 2, datetime(2024, 1, 1, 14, 1), velocity
+    ))
+    assert rescoring.row_features(row, velocity) == expected
+
+
+def test_velocity_is_replayed_in_transaction_order(conn):
+    seen = []
+
+    def capture(features):
+        seen.extend(features.tolist())
+        return by_amount(features)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        rescoring.rescore(conn, 'new', executor, predict=capture, chunk_size=20)
+
+    user_txn_1h = [row[9 + VELOCITY_FEATURES.index('user_txn_1h')] for row in seen]
+    pair_amount = [row[9 + VELOCITY_FEATURES.index('pair_amount_1d')] for row in seen]
+    # Each payment sees the ones before it
+    assert user_txn_1h == list(range(50))
+    assert pair_amount[3] == 100 + 200 + 300
+
+
+def test_all_rows_scored_into_shadow_table(conn):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stats = rescoring.rescore(conn, 'new', executor, predict=by_amount, chunk_size=8)
+
+    scores = shadow(conn)
+    assert stats['rows'] == len(scores) == 50
+    assert scores['TXN010'] == pytest.approx(0.25)
+    # Live decisions were all "completed"; amounts above 2000 now block
+    assert stats['flagged'] == stats['changed'] == 30
+    assert rescoring.load_checkpoint(conn, 'new') == (50, 50)
+
+
+def test_interrupted_run_resumes_from_checkpoint(conn):
+    calls = []
+
+    def failing_on_third_chunk(features):
+        calls.append(len(features))
+        if len(calls) == 3:
+            raise RuntimeError('worker died')
+        return by_amount(features)
+
+    with ThreadPoolExecutor(max_workers=1) as executor, pytest.raises(RuntimeError):
+        rescoring.rescore(conn, 'new', executor, predict=failing_on_third_chunk, chunk_size=10, max_in_flight=1)
+
+    assert rescoring.load_checkpoint(conn, 'new') == (20, 20)
+    assert len(shadow(conn)) == 20
+
+    resumed = []
+
+    def capture(features):
+        resumed.extend(features.tolist())
+        return by_amount(features)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stats = rescoring.rescore(conn, 'new', executor, predict=capture, chunk_size=10)
+
+    # Velocity history before the checkpoint is replayed, not lost
+    assert resumed[0][9 + VELOCITY_FEATURES.index('user_txn_1h')] == 20
+    assert stats['resumed_from'] == 20 and stats['rows'] == 30
+    assert len(shadow(conn)) == 50
+    assert rescoring.load_checkpoint(conn, 'new') == (50, 50)
+
+
+def test_rescoring_leaves_live_challenger_scores_alone(conn):
+    with conn:
+        conn.execute(INSERT_LIVE_SHADOW_SQL, ('svm', 'TXN001', 0.9, 1))
+    with ThreadPoolExecutor(2) as executor:
+        rescoring.rescore(conn, 'svm', executor, predict=by_amount, chunk_size=8)
+    assert len(shadow(conn, 'svm')) == 50
+    rescoring.reset(conn, 'svm')
+
+    assert shadow(conn, 'svm') == {}
+    assert [tuple(row) for row in conn.execute('SELECT model_name, fraud_probability FROM live_shadow_scores')] == [('svm', 0.9)]
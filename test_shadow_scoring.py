@@ -0,0 +1,93 @@
+import threading
+import time
+
+import numpy as np
+
+import app as flask_app
+from features import FEATURE_COLUMNS
+from shadow_scoring import ModelRegistry, ShadowScorer, sklearn_predict_batch
+
+
+def features(amount):
+    return [float(amount), 14, 5, 30, 400, 12, 560, 2, 1234]
+
+
+def test_shadows_score_in_background_batches():
+    release = threading.Event()
+    registry = ModelRegistry(champion='cnn')
+    registry.register('cnn', lambda X: X[:, 0] / 10000)
+    registry.register('slow', lambda X: release.wait(5) and X[:, 0] / 1000)
+    batches = []
+    scorer = ShadowScorer(registry, batches.append, threshold=0.5, max_batch_size=8, flush_interval=0.05)
+
+    start = time.perf_counter()
+    for i in range(20):
+        scorer.submit(f'TXN{i}', features(i * 100))
+    submit_seconds = time.perf_counter() - start
+    release.set()
+    scorer.stop()
+
+    # Submitting never waits for the (blocked) shadow model
+    assert submit_seconds < 0.5
+    rows = [row for batch in batches for row in batch]
+    assert [row[1] for row in rows] == [f'TXN{i}' for i in range(20)]
+    assert all(row[0] == 'slow' for row in rows)
+    assert rows[6][2:] == (0.6, 1)
+    assert len(batches) < 20 and max(len(batch) for batch in batches) <= 8
+    assert registry.stats()['latency']['slow']['count'] == len(batches)
+    assert scorer.stats()['scored'] == 20
+
+
+def test_full_queue_drops_instead_of_blocking():
+    registry = ModelRegistry(champion='cnn')
+    registry.register('lr', lambda X: np.zeros(len(X)))
+    scorer = ShadowScorer(registry, lambda rows: None, max_queue=3)
+    scorer._worker = threading.current_thread()  # keep the queue undrained
+
+    for i in range(5):
+        scorer.submit(f'TXN{i}', features(i))
+
+    assert scorer.stats()['submitted'] == 3
+    assert scorer.stats()['dropped'] == 2
+
+
+def test_detect_fraud_records_champion_and_queues_shadows(monkeypatch):
+    registry = ModelRegistry(champion='cnn')
+    registry.register('lr', lambda X: X[:, 0] / 1000)
+    persisted = []
+    scorer = ShadowScorer(registry, persisted.extend, flush_interval=0)
+    monkeypatch.setattr(flask_app, 'model_registry', registry)
+    monkeypatch.setattr(flask_app, 'shadow_scorer', scorer)
+    monkeypatch.setattr(flask_app, 'model_status', 'ready')
+    monkeypatch.setattr(flask_app, 'models_loaded', lambda: True)
+    monkeypatch.setattr(flask_app, 'batch_scorer', None)
+    monkeypatch.setattr(flask_app, 'fused_scorer', None)
+    monkeypatch.setattr(flask_app, 'predict_batch', lambda X: X[:, 0] / 10000)
+
+    transaction_data = dict(zip(FEATURE_COLUMNS, features(700) + [0] * 9))
+    is_fraud, probability = flask_app.detect_fraud(transaction_data, 'TXN1')
+    scorer.stop()
+
+    assert (is_fraud, probability) == (False, 0.07)
+    assert persisted == [('lr', 'TXN1', 0.7, 1)]
+    assert registry.stats()['latency']['cnn']['count'] == 1
+
+
+def test_sklearn_models_get_raw_or_scaled_features():
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=500, scale=100, size=(200, 9))
+    y = (X[:, 0] > 500).astype(int)
+    scaler = StandardScaler().fit(X)
+    raw_model = LogisticRegression(max_iter=1000).fit(X, y)
+    scaled_model = LogisticRegression().fit(scaler.transform(X), y)
+    # Velocity columns beyond the trained ones are ignored
+    served = np.hstack([X, np.zeros((len(X), 9))])
+
+    raw = sklearn_predict_batch(raw_model)(served)
+    scaled = sklearn_predict_batch(scaled_model, scaler)(served)
+
+    assert np.allclose(raw, raw_model.predict_proba(X)[:, 1])
+    assert np.allclose(scaled, scaled_model.predict_proba(scaler.transform(X))[:, 1])
@@ -0,0 +1,67 @@
+import pytest
+
+import database
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'stats.db'))
+    database.create_tables()
+    conn = database.get_db_connection()
+    yield conn
+    conn.close()
+
+
+def add_transaction(conn, txn_id, is_fraud):
+    conn.execute('''
+        INSERT INTO transactions (transaction_id, user_id, merchant_id, amount, is_fraud, status)
+        VALUES (?, 1, 1, 100.0, ?, ?)
+    ''', (txn_id, is_fraud, 'blocked' if is_fraud else 'completed'))
+
+
+def test_triggers_keep_counters_in_sync(conn):
+    conn.execute("INSERT INTO users (mobile, name) VALUES ('9000000001', 'A')")
+    conn.execute("INSERT INTO merchants (mobile, business_name) VALUES ('9000000002', 'M')")
+    add_transaction(conn, 'TXN1', 0)
+    add_transaction(conn, 'TXN2', 1)
+    add_transaction(conn, 'TXN3', 1)
+    conn.execute("UPDATE transactions SET is_fraud = 0 WHERE transaction_id = 'TXN3'")
+    conn.execute("DELETE FROM transactions WHERE transaction_id = 'TXN1'")
+    conn.commit()
+
+    assert database.get_stats(conn) == {
+        'total_users': 1,
+        'total_merchants': 1,
+        'total_transactions': 2,
+        'fraud_count': 1
+    }
+
+
+def test_reconcile_rebuilds_drifted_counters(conn):
+    add_transaction(conn, 'TXN1', 1)
+    conn.execute("UPDATE stats_counters SET value = 42 WHERE name = 'total_transactions'")
+    conn.commit()
+
+    changes = database.reconcile_stats(conn)
+
+    assert changes['total_transactions'] == (42, 1)
+    assert changes['fraud_count'] == (1, 1)
+    assert database.get_stats(conn)['total_transactions'] == 1
+
+
+def test_migration_seeds_counters_from_existing_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'legacy.db'))
+    database.create_tables()
+    conn = database.get_db_connection()
+    # Simulate a database created before migration 2
+    conn.execute('DROP TABLE stats_counters')
+    for name in ('users_count_insert', 'transactions_count_insert'):
+        conn.execute(f'DROP TRIGGER trg_{name}')
+    conn.execute('DELETE FROM schema_version WHERE version >= 2')
+    add_transaction(conn, 'TXN1', 1)
+    conn.commit()
+
+    database.migrate(conn)
+
+    assert database.get_stats(conn)['fraud_count'] == 1
+    conn.close()
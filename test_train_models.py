@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('sklearn')
+
+from models import train_models  # noqa: E402
+
+
+def test_prepare_splits_writes_shared_memmaps(tmp_path, monkeypatch):
+    monkeypatch.setattr(train_models, 'SCALER_PATH', str(tmp_path / 'scaler.pkl'))
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 9))
+    y = (rng.random(1000) < 0.1).astype(np.int8)
+
+    meta = train_models.prepare_splits(X, y, str(tmp_path / 'cache'))
+    X_raw, X_scaled, y_shared, loaded_meta = train_models.load_shared(str(tmp_path / 'cache'))
+    splits = train_models.split_slices(meta)
+
+    assert loaded_meta == meta
+    assert meta['n_train'] + meta['n_val'] + meta['n_test'] == 1000
+    assert isinstance(X_scaled, np.memmap) and isinstance(X_raw, np.memmap)
+    # Same rows, reordered train | val | test; scaler fitted on the train slice only
+    assert sorted(map(tuple, X_raw)) == sorted(map(tuple, X))
+    assert np.allclose(X_scaled[splits['train']].mean(axis=0), 0, atol=1e-9)
+    assert int(y_shared.sum()) == int(y.sum())
+    # Stratified: every split keeps the fraud ratio
+    for rows in splits.values():
+        assert abs(y_shared[rows].mean() - y.mean()) < 0.02
+
+
+def test_npy_columns_load_like_csv(tmp_path):
+    from data.generate_dataset import iter_chunks, write_chunks
+
+    write_chunks(iter_chunks(3_000, seed=4), str(tmp_path / 'data.csv'))
+    write_chunks(iter_chunks(3_000, seed=4), str(tmp_path / 'columns'), 'npy', 3_000)
+
+    X_csv, y_csv, features_csv = train_models.load_dataset(str(tmp_path / 'data.csv'))
+    X_npy, y_npy, features_npy = train_models.load_dataset(str(tmp_path / 'columns'))
+
+    assert features_npy == features_csv
+    assert (y_npy == y_csv).all()
+    assert np.allclose(X_npy, X_csv, rtol=1e-6)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sklearn')
+
+from data.generate_dataset import iter_chunks, write_chunks  # noqa: E402
+from models import train_streaming  # noqa: E402
+
+
+def test_split_assignment_is_deterministic_and_proportional():
+    ids = np.arange(1, 100_001)
+    splits = train_streaming.assign_splits(ids)
+
+    assert (splits == train_streaming.assign_splits(ids)).all()
+    fractions = np.bincount(splits, minlength=3) / len(ids)
+    assert np.allclose(fractions, [0.70, 0.15, 0.15], atol=0.01)
+
+
+def test_chunked_scaler_matches_in_memory_fit(tmp_path, monkeypatch):
+    from sklearn.preprocessing import StandardScaler
+
+    monkeypatch.setattr(train_streaming, 'SCALER_PATH', str(tmp_path / 'scaler.pkl'))
+    path = str(tmp_path / 'data.csv')
+    write_chunks(iter_chunks(12_000, seed=5, chunk_size=5_000), path)
+
+    scaler, counts = train_streaming.fit_scaler(path, chunk_size=1_000)
+
+    df = pd.read_csv(path)
+    train = train_streaming.assign_splits(df['transaction_id'].to_numpy()) == 0
+    expected = StandardScaler().fit(df.drop(columns=['transaction_id', 'fraud']).to_numpy(float)[train])
+    assert np.allclose(scaler.mean_, expected.mean_)
+    assert np.allclose(scaler.scale_, expected.scale_)
+    assert sum(sum(c) for c in counts.values()) == 12_000
+    assert sum(c[1] for c in counts.values()) == int(df['fraud'].sum())
+
+
+def test_streamed_challengers_all_support_predict_proba(tmp_path, monkeypatch):
+    import joblib
+
+    path = str(tmp_path / 'data.csv')
+    write_chunks(iter_chunks(6_000, seed=3, chunk_size=3_000), path)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'models').mkdir()
+    monkeypatch.setattr(train_streaming, 'SCALER_PATH', 'models/scaler.pkl')
+
+    results, _, _ = train_streaming.run_streaming(path, ['lr', 'rf', 'svm'], chunk_size=2_000, epochs=1,
+                                                  svm_components=50, rf_max_rows=2_000)
+
+    assert set(results) == {'lr', 'rf', 'svm'}
+    X = pd.read_csv(path).drop(columns=['transaction_id', 'fraud']).to_numpy(float)[:10]
+    for name in results:
+        probabilities = joblib.load(results[name]['path']).predict_proba(X)
+        assert probabilities.shape == (10, 2)
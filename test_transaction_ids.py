@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from transaction_ids import EPOCH_MS, TransactionIdGenerator, decode, lease_worker_id
+
+
+def issue_ids(worker_id, count=50000):
+    generator = TransactionIdGenerator(worker_id)
+    return [generator.next_id() for _ in range(count)]
+
+
+def test_concurrent_threads_never_collide():
+    generator = TransactionIdGenerator(7)
+    per_thread = [[] for _ in range(8)]
+    start = threading.Barrier(len(per_thread))
+
+    def run(ids):
+        start.wait()
+        for _ in range(20000):
+            ids.append(generator.next_id())
+
+    threads = [threading.Thread(target=run, args=(ids,)) for ids in per_thread]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    issued = [transaction_id for ids in per_thread for transaction_id in ids]
+    assert len(set(issued)) == len(issued) == 160000
+    # Each thread sees strictly increasing IDs
+    assert all(ids == sorted(ids) and len(set(ids)) == len(ids) for ids in per_thread)
+
+
+def test_concurrent_processes_never_collide():
+    with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context('spawn')) as executor:
+        batches = list(executor.map(issue_ids, range(4)))
+
+    issued = [transaction_id for batch in batches for transaction_id in batch]
+    assert len(set(issued)) == len(issued) == 200000
+    assert {decode(batch[0])[1] for batch in batches} == {0, 1, 2, 3}
+
+
+def test_ids_stay_monotonic_when_the_clock_stalls_or_steps_back():
+    reads = []
+    step_back = [0]
+
+    def clock():
+        # Stuck on one millisecond for the first 4097 reads, then it ticks once
+        reads.append(None)
+        return (EPOCH_MS + 5000 + (len(reads) > 4097)) * 1_000_000 - step_back[0]
+
+    generator = TransactionIdGenerator(1, clock=clock)
+    ids = [generator.next_id() for _ in range(5000)]  # More than 4096 in one millisecond
+    step_back[0] = 2_000_000_000
+    ids.append(generator.next_id())
+
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert all(len(transaction_id) == 22 and transaction_id.startswith('TXN') for transaction_id in ids)
+    created_at, worker_id, sequence = decode(ids[4096])
+    assert (created_at.timestamp() * 1000, worker_id, sequence) == (EPOCH_MS + 5001, 1, 0)
+    # The exhausted sequence waited for the clock (one extra read) instead of running ahead of it
+    assert len(reads) == 5002
+    assert decode(ids[-1])[0].timestamp() * 1000 == EPOCH_MS + 5001
+
+
+def test_worker_id_is_validated():
+    with pytest.raises(ValueError):
+        TransactionIdGenerator(1024)
+
+
+def test_live_processes_lease_distinct_worker_ids(tmp_path, monkeypatch):
+    pytest.importorskip('fcntl')
+    monkeypatch.delenv('TRANSACTION_WORKER_ID', raising=False)
+    directory = str(tmp_path / 'worker-ids')
+    first = TransactionIdGenerator(lease_dir=directory)
+    second = TransactionIdGenerator(lease_dir=directory)
+    assert (first.worker_id, second.worker_id) == (0, 1)
+
+    # A forked child gives up its copy of the parent's lock file and leases its own id
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        first.reset()
+        os.write(write_end, str(first.worker_id).encode())
+        os._exit(0)
+    os.close(write_end)
+    child_worker_id = int(os.read(read_end, 16))
+    os.waitpid(pid, 0)
+    os.close(read_end)
+    assert child_worker_id == 2
+    assert first.worker_id == 0
+
+    # The child has exited, so its id is free again; the parent still holds 0
+    worker_id, lock_file = lease_worker_id(directory)
+    lock_file.close()
+    assert worker_id == 2
@@ -0,0 +1,116 @@
+import pytest
+
+import database
+from velocity import SlidingWindow, VelocityFeatureStore, format_timestamp
+
+T0 = 1_700_000_000  # Aligned to every bucket width
+
+
+def test_window_expires_old_buckets():
+    window = SlidingWindow(bucket_seconds=60, num_buckets=60, track_distinct=True)
+    window.add(T0, 100.0, 'a')
+    window.add(T0 + 30, 50.0, 'b')
+    window.add(T0 + 1800, 25.0, 'a')
+
+    assert window.read(T0 + 1800) == (3, 175.0, 2)
+    # First bucket (T0..T0+59) drops out once the hour has passed
+    assert window.read(T0 + 3600) == (1, 25.0, 1)
+    assert window.read(T0 + 10 * 3600) == (0, 0.0, 0)
+
+
+def test_distinct_tracking_is_bounded_by_counterparties_not_payments():
+    window = SlidingWindow(bucket_seconds=60, num_buckets=60, track_distinct=True)
+    for i in range(100_000):
+        window.add(T0, 1.0, f'merchant{i % 5}')  # One busy bucket, five merchants
+
+    assert window.read(T0) == (100_000, 100_000.0, 5)
+    assert sum(len(members) for members in window.members) == 5
+    assert window.read(T0 + 3660) == (0, 0.0, 0) and window.seen == {}
+
+
+def test_window_ignores_events_older_than_the_window():
+    window = SlidingWindow(bucket_seconds=5, num_buckets=12)
+    window.add(T0 + 120, 10.0)
+    window.add(T0, 99.0)
+    window.add(T0 + 100, 1.0)
+
+    assert window.read(T0 + 120) == (2, 11.0, 0)
+
+
+def test_observe_returns_history_before_the_payment():
+    store = VelocityFeatureStore()
+
+    first = store.observe(1, 10, 500.0, now=T0)
+    store.observe(1, 11, 200.0, now=T0 + 10)
+    store.observe(2, 10, 300.0, now=T0 + 20)
+    features = store.observe(1, 10, 50.0, now=T0 + 30)
+
+    assert set(first.values()) == {0}
+    assert features['user_txn_1m'] == 2
+    assert features['user_txn_1h'] == 2
+    assert features['user_amount_1h'] == 700.0
+    assert features['user_merchants_1h'] == 2
+    assert features['merchant_txn_1h'] == 2
+    assert features['merchant_amount_1d'] == 800.0
+    assert features['merchant_users_1d'] == 2
+    assert (features['pair_txn_1d'], features['pair_amount_1d']) == (1, 500.0)
+    # One minute later only the hour and day windows remember them
+    later = store.features(1, 10, now=T0 + 95)
+    assert later['user_txn_1m'] == 0 and later['user_txn_1h'] == 3
+
+
+def test_keys_are_bounded_lru():
+    store = VelocityFeatureStore(max_keys=2)
+    for user_id in (1, 2, 1, 3):
+        store.record(user_id, 10, 1.0, now=T0)
+
+    assert store.stats()['users'] == 2
+    assert store.features(1, 10, now=T0)['user_txn_1h'] == 2
+    assert store.features(2, 10, now=T0)['user_txn_1h'] == 0
+
+
+def test_rebuild_replays_the_last_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'velocity.db'))
+    database.create_tables()
+    conn = database.get_db_connection()
+    rows = [('OLD', T0 - 2 * 86400), ('A', T0 - 3000), ('B', T0 - 30)]
+    conn.executemany('''
+        INSERT INTO transactions (transaction_id, user_id, merchant_id, amount, status, created_at)
+        VALUES (?, 1, 10, 100.0, 'completed', ?)
+    ''', [(txn_id, format_timestamp(at)) for txn_id, at in rows])
+    conn.commit()
+
+    store = VelocityFeatureStore()
+    replayed = store.rebuild(conn, now=T0)
+    conn.close()
+
+    assert replayed == 2
+    features = store.features(1, 10, now=T0)
+    assert features['user_txn_1h'] == 2 and features['user_txn_1m'] == 1
+    assert features['merchant_amount_1d'] == pytest.approx(200.0)
+
+
+def test_sync_shares_payments_committed_by_other_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'velocity.db'))
+    database.create_tables()
+    conn = database.get_db_connection()
+    insert_sql = '''
+        INSERT INTO transactions (transaction_id, user_id, merchant_id, amount, status, created_at)
+        VALUES (?, 1, 10, 100.0, 'completed', ?)
+    '''
+    conn.execute(insert_sql, ('BEFORE', format_timestamp(T0 - 60)))
+    conn.commit()
+
+    first, second = VelocityFeatureStore(), VelocityFeatureStore()
+    assert first.rebuild(conn, now=T0) == 1
+    assert second.sync(conn) == 0  # Never rebuilt: starts from the current end of the table
+
+    # Payments committed through either worker reach both stores exactly once
+    conn.executemany(insert_sql, [('A', format_timestamp(T0 - 20)), ('B', format_timestamp(T0 - 10))])
+    conn.commit()
+    assert (first.sync(conn), second.sync(conn)) == (2, 2)
+    assert (first.sync(conn), second.sync(conn)) == (0, 0)
+    conn.close()
+
+    assert first.features(1, 10, now=T0)['user_txn_1h'] == 3
+    assert second.features(1, 10, now=T0)['user_txn_1h'] == 2
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SCRIPT = '''
+import threading
+import app
+print(sorted(t.name for t in threading.enumerate()))
+app.app.test_client().get('/test')
+print(sorted(t.name for t in threading.enumerate()))
+'''
+
+
+def test_import_starts_no_threads_until_the_first_request(tmp_path):
+    # What gunicorn's preload master does: import app, then fork workers
+    env = dict(os.environ, DATABASE_PATH=str(tmp_path / 'threads.db'), MODEL_LOADING='lazy')
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    at_import, after_request = result.stdout.strip().splitlines()[-2:]
+
+    assert at_import == "['MainThread']"
+    assert 'otp-purger' in after_request
@@ -0,0 +1,145 @@
+"""
+Transaction ID Generator
+Snowflake-style IDs: unique across worker processes, time-ordered and cheap
+
+An ID packs a 64-bit integer (41 bits of milliseconds since EPOCH_MS,
+10 bits of worker id, 12 bits of per-millisecond sequence) rendered as
+"TXN" + 19 zero-padded digits, so string order is numeric order.
+
+Each process needs its own worker id for IDs to be unique across processes.
+With a lease directory (app.py passes TRANSACTION_WORKER_ID_DIR) every
+process, including each freshly forked gunicorn worker, claims the lowest
+id whose lock file no live process holds; otherwise it comes from
+TRANSACTION_WORKER_ID or the pid. Within a process the generator never goes
+backwards: if the clock steps back it keeps counting on the last millisecond
+it used. Once 4096 IDs are issued within one millisecond it waits for the
+clock to tick rather than running ahead of it, so a restarted process that
+leases the same worker id cannot reissue IDs from a borrowed future.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, fall back to default_worker_id()
+    fcntl = None
+
+PREFIX = 'TXN'
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+
+def default_worker_id():
+    """TRANSACTION_WORKER_ID if set, otherwise derived from the pid"""
+    configured = os.environ.get('TRANSACTION_WORKER_ID')
+    if configured is not None:
+        return int(configured)
+    return os.getpid() & MAX_WORKER_ID
+
+
+def lease_worker_id(directory):
+    """
+    Claim the lowest worker id not held by another live process
+
+    Every id is a lock file in `directory`. Its flock is held on the returned
+    file until the file is closed or the process exits (however it exits), so
+    an id is handed out again only once its holder is gone.
+
+    Returns:
+        tuple: (worker_id, open lock file to keep for as long as the id is used)
+    """
+    os.makedirs(directory, exist_ok=True)
+    for worker_id in range(MAX_WORKER_ID + 1):
+        lock_file = open(os.path.join(directory, f'{worker_id}.lock'), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            continue
+        return worker_id, lock_file
+    raise RuntimeError(f"All {MAX_WORKER_ID + 1} transaction worker ids are leased in {directory}")
+
+
+def decode(transaction_id):
+    """
+    Split an ID from TransactionIdGenerator into its parts
+
+    Returns:
+        tuple: (created_at as UTC datetime, worker_id, sequence)
+    """
+    value = int(transaction_id[len(PREFIX):])
+    milliseconds = (value >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+    return (
+        datetime.fromtimestamp(milliseconds / 1000, timezone.utc),
+        (value >> SEQUENCE_BITS) & MAX_WORKER_ID,
+        value & SEQUENCE_MASK
+    )
+
+
+class TransactionIdGenerator:
+    """
+    Thread-safe, monotonic transaction ID source for one process
+
+    Args:
+        worker_id: 0 - 1023, distinct for every process issuing IDs
+            concurrently (default: leased from lease_dir, or
+            default_worker_id() without one)
+        clock: Returns the current time in nanoseconds (for tests)
+        lease_dir: Directory shared by all processes writing to the same
+            database to lease worker ids from (see lease_worker_id)
+    """
+
+    def __init__(self, worker_id=None, clock=time.time_ns, lease_dir=None):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._lease_dir = lease_dir
+        self._lease = None
+        self.reset(worker_id)
+
+    def reset(self, worker_id=None):
+        """Switch to another worker id (e.g. in a freshly forked worker)"""
+        if self._lease is not None:
+            # After fork this is the parent's lock file: closing our copy leaves its lease intact
+            self._lease.close()
+            self._lease = None
+        if worker_id is not None:
+            worker_id = int(worker_id)
+        elif self._lease_dir and fcntl is not None and 'TRANSACTION_WORKER_ID' not in os.environ:
+            worker_id, self._lease = lease_worker_id(self._lease_dir)
+        else:
+            worker_id = default_worker_id()
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}, got {worker_id}")
+        with self._lock:
+            self.worker_id = worker_id
+            self._worker_bits = worker_id << SEQUENCE_BITS
+            self._last_ms = -1
+            self._sequence = 0
+
+    def next_value(self):
+        """Next ID as an integer"""
+        now_ms = self._clock() // 1_000_000 - EPOCH_MS
+        with self._lock:
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                # Same millisecond or the clock stepped back: continue from the last one
+                self._sequence = (self._sequence + 1) & SEQUENCE_MASK
+                if self._sequence == 0:
+                    # Sequence exhausted: spend a real millisecond for every one moved ahead
+                    next_ms = now_ms
+                    while next_ms <= now_ms:
+                        next_ms = self._clock() // 1_000_000 - EPOCH_MS
+                    self._last_ms = max(self._last_ms + 1, next_ms)
+            return (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | self._worker_bits | self._sequence
+
+    def next_id(self):
+        """Next transaction ID string"""
+        return f'{PREFIX}{self.next_value():019d}'
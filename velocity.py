@@ -0,0 +1,322 @@
+"""
+Velocity Feature Store
+In-process sliding-window aggregates of recent payments per user, per
+merchant and per user->merchant pair, used as behavioral scoring features
+
+Each window is a ring of time buckets with running totals: recording a
+payment or reading a window touches one bucket plus the buckets that expired
+since the last access, so both are O(1) amortized and memory per key is
+fixed by the bucket count. Keys are kept in LRU order and the least recently
+active are dropped beyond max_keys.
+
+Features describe the history *before* a payment (observe() reads, then
+records), so a first payment sees zeros. The windows live in each process,
+but the transactions table is the shared record: the store is rebuilt from
+its last day at startup, and the app calls sync() before reading features
+to replay payments any worker committed since, so every worker scores from
+the same history. A payment counts once it is committed.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# Feature names in model column order (appended after the static features)
+VELOCITY_FEATURES = [
+    'user_txn_1m',        # Payments by this user in the last minute
+    'user_txn_1h',        # ... in the last hour
+    'user_amount_1h',     # Amount paid by this user in the last hour
+    'user_merchants_1h',  # Distinct merchants this user paid in the last hour
+    'merchant_txn_1h',    # Payments received by this merchant in the last hour
+    'merchant_amount_1d',  # Amount received by this merchant in the last day
+    'merchant_users_1d',  # Distinct users who paid this merchant in the last day
+    'pair_txn_1d',        # Payments from this user to this merchant in the last day
+    'pair_amount_1d'      # Amount from this user to this merchant in the last day
+]
+
+# (bucket seconds, buckets) per window: resolution vs memory per key
+WINDOW_1M = (5, 12)
+WINDOW_1H = (60, 60)
+WINDOW_1D = (900, 96)
+
+HISTORY_SECONDS = WINDOW_1D[0] * WINDOW_1D[1]
+
+SELECT_HISTORY_SQL = '''
+    SELECT id, user_id, merchant_id, amount, created_at
+    FROM transactions
+    WHERE created_at >= ? AND id <= ?
+    ORDER BY id
+'''
+
+SELECT_NEW_SQL = '''
+    SELECT id, user_id, merchant_id, amount, created_at
+    FROM transactions
+    WHERE id > ?
+    ORDER BY id
+'''
+
+SELECT_LAST_ID_SQL = 'SELECT COALESCE(MAX(id), 0) FROM transactions'
+
+
+def parse_timestamp(value):
+    """Epoch seconds of a SQLite CURRENT_TIMESTAMP value (UTC)"""
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def format_timestamp(epoch):
+    """SQLite CURRENT_TIMESTAMP text for epoch seconds"""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class SlidingWindow:
+    """
+    Count, amount and (optionally) distinct counterparties over a time window
+
+    Args:
+        bucket_seconds: Width of one bucket
+        num_buckets: Buckets kept; the window spans bucket_seconds * num_buckets
+        track_distinct: Also count distinct counterparties in the window
+    """
+
+    __slots__ = ('bucket_seconds', 'num_buckets', 'head', 'counts', 'sums', 'members',
+                 'seen', 'count', 'total')
+
+    def __init__(self, bucket_seconds, num_buckets, track_distinct=False):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = num_buckets
+        self.head = None  # Newest bucket number seen
+        self.counts = [0] * num_buckets
+        self.sums = [0.0] * num_buckets
+        # Per bucket set of counterparties: bounded by distinct counterparties, not payments
+        self.members = [set() for _ in range(num_buckets)] if track_distinct else None
+        self.seen = {} if track_distinct else None  # counterparty -> buckets it appears in
+        self.count = 0
+        self.total = 0.0
+
+    def _clear(self, slot):
+        self.count -= self.counts[slot]
+        self.total -= self.sums[slot]
+        self.counts[slot] = 0
+        self.sums[slot] = 0.0
+        if self.members is not None:
+            # self.seen counts the buckets each counterparty appears in
+            for member in self.members[slot]:
+                remaining = self.seen[member] - 1
+                if remaining:
+                    self.seen[member] = remaining
+                else:
+                    del self.seen[member]
+            self.members[slot] = set()
+
+    def _advance(self, now):
+        """Expire buckets that fell out of the window; returns now's bucket number"""
+        bucket = int(now // self.bucket_seconds)
+        if self.head is None:
+            self.head = bucket
+        elif bucket > self.head:
+            if bucket - self.head >= self.num_buckets:
+                for slot in range(self.num_buckets):
+                    self._clear(slot)
+                # Running float sums drift; reset exactly when the window empties
+                self.total = 0.0
+            else:
+                for expired in range(self.head + 1, bucket + 1):
+                    self._clear(expired % self.num_buckets)
+            self.head = bucket
+        return bucket
+
+    def add(self, now, amount, counterparty=None):
+        """Record one payment at `now` (ignored if older than the window)"""
+        bucket = self._advance(now)
+        if bucket <= self.head - self.num_buckets:
+            return
+        slot = bucket % self.num_buckets
+        self.counts[slot] += 1
+        self.sums[slot] += amount
+        self.count += 1
+        self.total += amount
+        if self.members is not None:
+            members = self.members[slot]
+            if counterparty not in members:
+                members.add(counterparty)
+                self.seen[counterparty] = self.seen.get(counterparty, 0) + 1
+
+    def read(self, now):
+        """(count, amount, distinct counterparties) in the window ending at `now`"""
+        self._advance(now)
+        return self.count, max(self.total, 0.0), len(self.seen) if self.seen is not None else 0
+
+
+class _UserWindows:
+    __slots__ = ('minute', 'hour')
+
+    def __init__(self):
+        self.minute = SlidingWindow(*WINDOW_1M)
+        self.hour = SlidingWindow(*WINDOW_1H, track_distinct=True)
+
+
+class _MerchantWindows:
+    __slots__ = ('hour', 'day')
+
+    def __init__(self):
+        self.hour = SlidingWindow(*WINDOW_1H)
+        self.day = SlidingWindow(*WINDOW_1D, track_distinct=True)
+
+
+class VelocityFeatureStore:
+    """
+    Sliding-window velocity features keyed by user, merchant and pair
+
+    Args:
+        max_keys: Keys kept per kind (users, merchants, pairs) before the
+            least recently active is evicted
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._users = OrderedDict()
+        self._merchants = OrderedDict()
+        self._pairs = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.last_id = None  # Newest transactions.id replayed into the store
+        self.recorded = 0
+        self.evictions = 0
+        self.synced = 0
+
+    def _entry(self, table, key, factory):
+        """Get or create a key's windows, keeping LRU order and the size bound"""
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = factory()
+            if len(table) > self.max_keys:
+                table.popitem(last=False)
+                self.evictions += 1
+        else:
+            table.move_to_end(key)
+        return entry
+
+    def _features(self, user, merchant, pair, now):
+        user_1m, _, _ = user.minute.read(now)
+        user_1h, user_amount_1h, user_merchants_1h = user.hour.read(now)
+        merchant_1h, _, _ = merchant.hour.read(now)
+        _, merchant_amount_1d, merchant_users_1d = merchant.day.read(now)
+        pair_1d, pair_amount_1d, _ = pair.read(now)
+        return {
+            'user_txn_1m': user_1m,
+            'user_txn_1h': user_1h,
+            'user_amount_1h': round(user_amount_1h, 2),
+            'user_merchants_1h': user_merchants_1h,
+            'merchant_txn_1h': merchant_1h,
+            'merchant_amount_1d': round(merchant_amount_1d, 2),
+            'merchant_users_1d': merchant_users_1d,
+            'pair_txn_1d': pair_1d,
+            'pair_amount_1d': round(pair_amount_1d, 2)
+        }
+
+    def _windows(self, user_id, merchant_id):
+        return (
+            self._entry(self._users, user_id, _UserWindows),
+            self._entry(self._merchants, merchant_id, _MerchantWindows),
+            self._entry(self._pairs, (user_id, merchant_id), lambda: SlidingWindow(*WINDOW_1D))
+        )
+
+    def _record(self, user, merchant, pair, user_id, merchant_id, amount, now):
+        user.minute.add(now, amount)
+        user.hour.add(now, amount, merchant_id)
+        merchant.hour.add(now, amount)
+        merchant.day.add(now, amount, user_id)
+        pair.add(now, amount)
+        self.recorded += 1
+
+    def observe(self, user_id, merchant_id, amount, now=None):
+        """
+        Features for a payment from the history before it, then record it
+
+        Returns:
+            dict: VELOCITY_FEATURES name -> value
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            user, merchant, pair = self._windows(user_id, merchant_id)
+            features = self._features(user, merchant, pair, now)
+            self._record(user, merchant, pair, user_id, merchant_id, amount, now)
+        return features
+
+    def features(self, user_id, merchant_id, now=None):
+        """Current features for a user->merchant payment without recording one"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._features(*self._windows(user_id, merchant_id), now)
+
+    def record(self, user_id, merchant_id, amount, now=None):
+        """Record a payment without reading features"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._record(*self._windows(user_id, merchant_id), user_id, merchant_id, amount, now)
+
+    def rebuild(self, conn, now=None, until_id=None):
+        """
+        Replay the last day of transactions (oldest first) into the store
+
+        Args:
+            conn: Database connection
+            now: End of the history to load (default: current time)
+            until_id: Only replay transactions with id <= until_id
+
+        Returns:
+            int: transactions replayed
+        """
+        now = time.time() if now is None else now
+        with self._sync_lock:
+            if until_id is None:
+                until_id = conn.execute(SELECT_LAST_ID_SQL).fetchone()[0]
+            cursor = conn.execute(SELECT_HISTORY_SQL, (format_timestamp(now - HISTORY_SECONDS), until_id))
+            replayed = self._replay(cursor)
+            self.last_id = until_id
+        return replayed
+
+    def sync(self, conn):
+        """
+        Replay transactions committed (by any process) since the last rebuild or sync
+
+        Without a prior rebuild() nothing is replayed; later payments are.
+
+        Returns:
+            int: transactions replayed
+        """
+        with self._sync_lock:
+            if self.last_id is None:
+                self.last_id = conn.execute(SELECT_LAST_ID_SQL).fetchone()[0]
+                return 0
+            replayed = self._replay(conn.execute(SELECT_NEW_SQL, (self.last_id,)))
+            self.synced += replayed
+        return replayed
+
+    def _replay(self, cursor):
+        """Record (id, user_id, merchant_id, amount, created_at) rows in id order"""
+        replayed = 0
+        for transaction_id, user_id, merchant_id, amount, created_at in cursor:
+            self.record(user_id, merchant_id, amount, parse_timestamp(created_at))
+            self.last_id = transaction_id
+            replayed += 1
+        return replayed
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._merchants.clear()
+            self._pairs.clear()
+
+    def stats(self):
+        return {
+            'users': len(self._users),
+            'merchants': len(self._merchants),
+            'pairs': len(self._pairs),
+            'max_keys': self.max_keys,
+            'recorded': self.recorded,
+            'synced': self.synced,
+            'last_id': self.last_id,
+            'evictions': self.evictions
+        }